@@ -0,0 +1,302 @@
+# autotune.py
+"""
+Picks a performance profile for this machine.
+
+Measures the host CPU, then runs every available detector backend at each
+candidate input size and thread count over a reference clip. For each
+detect stride the tracker is replayed on the cached detections and its
+output compared with a reference run (largest input size, every frame
+detected), counting the people it missed. The fastest-enough configuration
+with the fewest misses is saved to config/profile.json, which settings.py
+applies on later runs while PERFORMANCE_PROFILE is "auto".
+
+Example:
+    python -m benchmarks.autotune --video reference.mp4 --target-fps 10 --cameras 2
+    python -m benchmarks.autotune --video reference.mp4 --dry-run
+"""
+import argparse
+import os
+import platform
+import time
+from datetime import datetime
+import numpy as np
+from benchmarks.replay import synthetic_frames, video_frames, percentiles
+from config.profiles import save_profile
+from detectors.backends import BACKENDS, create_detector, default_model_path
+from utils.pipeline import SourcePipeline, DETECT
+from utils.tracker import iou_matrix
+from config.settings import DETECTOR_CONFIDENCE, PROFILE_FILE
+
+INPUT_SIZES = (320, 416, 512, 640)
+STRIDES = (1, 2, 3, 4)
+MATCH_IOU = 0.5  # a reference person counts as found at this IoU
+
+
+def host_info(seconds=0.5):
+    """
+    Describes the CPU and gives it a rough speed score.
+
+    Returns:
+        dict: platform, processor, cpu_count and gflops (float32 matmul)
+    """
+    a = np.random.default_rng(0).random((256, 256), dtype=np.float32)
+    runs = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        a @ a
+        runs += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "gflops": round(runs * 2 * 256 ** 3 / elapsed / 1e9, 1),
+    }
+
+
+def thread_options(cpu_count):
+    """
+    Returns:
+        list: Thread counts worth trying on a machine with cpu_count cores
+    """
+    cpu_count = cpu_count or 1
+    return sorted({n for n in (1, 2, 4, cpu_count) if n <= cpu_count})
+
+
+def available_backends(names=None):
+    """
+    Returns:
+        list: (backend, int8) pairs whose model files exist
+    """
+    found = []
+    for backend in names or BACKENDS:
+        for int8 in (False, True):
+            try:
+                path = default_model_path(backend, int8)
+            except ValueError:
+                continue  # no INT8 model for this backend
+            if os.path.exists(path):
+                found.append((backend, int8))
+    return found
+
+
+def measure(detector, frames, timing_frames):
+    """
+    Runs a detector over the clip.
+
+    Args:
+        detector (Detector): Backend to measure
+        frames (list): Reference clip
+        timing_frames (int): Leading frames that are timed; the rest only
+            collect detections
+
+    Returns:
+        tuple: (per-frame latencies in seconds, detections per frame)
+    """
+    detector.detect(frames[0])  # the first call allocates buffers and compiles
+    latencies = []
+    detections = []
+    for index, frame in enumerate(frames):
+        started = time.perf_counter()
+        detections.append(detector.detect(frame))
+        if index < timing_frames:
+            latencies.append(time.perf_counter() - started)
+    return latencies, detections
+
+
+def count_misses(detections, reference, stride):
+    """
+    Replays the tracker with the given stride and counts reference people
+    it did not report.
+
+    Args:
+        detections (list): (N, 5) detections per frame of the candidate
+        reference (list): (N, 5) reference detections per frame
+        stride (int): Detect stride to simulate
+
+    Returns:
+        int: Reference boxes without a tracked box of IoU >= MATCH_IOU
+    """
+    pipeline = SourcePipeline(motion_gate=False, tracking=True, stride=stride)
+    misses = 0
+    for frame_detections, expected in zip(detections, reference):
+        action = pipeline.plan(None)
+        people = pipeline.apply(action, frame_detections if action == DETECT else None)
+        if not len(expected):
+            continue
+        if not len(people):
+            misses += len(expected)
+            continue
+        best = iou_matrix(expected[:, :4], people[:, :4]).max(axis=1)
+        misses += int((best < MATCH_IOU).sum())
+    return misses
+
+
+def choose(candidates, target_fps):
+    """
+    Returns:
+        tuple: (candidate, met_target) - the fewest misses among those
+            reaching target_fps (ties go to the faster one), or the fastest
+            when none does
+    """
+    fast_enough = [c for c in candidates if c["fps_per_camera"] >= target_fps]
+    if fast_enough:
+        return min(fast_enough, key=lambda c: (c["misses"], -c["fps_per_camera"])), True
+    return max(candidates, key=lambda c: c["fps_per_camera"]), False
+
+
+def autotune(frames, backends, sizes=INPUT_SIZES, threads=None, strides=STRIDES,
+             cameras=1, timing_frames=20, conf=DETECTOR_CONFIDENCE):
+    """
+    Measures every backend / input size / thread count and derives the
+    accuracy of each detect stride.
+
+    Args:
+        frames (list): Reference clip
+        backends (list): (backend, int8) pairs to try
+        sizes, threads, strides (iterable): Candidate values
+        cameras (int): Cameras sharing the detector
+        timing_frames (int): Frames timed per thread count
+        conf (float): Detector confidence threshold
+
+    Returns:
+        tuple: (candidates, reference boxes) - candidates is a list of dicts
+    """
+    threads = threads or thread_options(os.cpu_count())
+    # Reference first: largest input, so its detections are the ground truth
+    sizes = sorted(sizes, reverse=True)
+    runs = []
+    for backend, int8 in backends:
+        for imgsz in sizes:
+            best = None
+            for thread_count in threads:
+                label = f"{backend}{' int8' if int8 else ''} imgsz={imgsz} threads={thread_count}"
+                try:
+                    detector = create_detector(backend, conf=conf, imgsz=imgsz,
+                                               threads=thread_count, int8=int8)
+                    # Detections do not depend on the thread count, so only the
+                    # fastest thread count runs the whole clip (below)
+                    latencies, _ = measure(detector, frames[:timing_frames], timing_frames)
+                except Exception as e:
+                    print(f"Error: Skipping {label}: {e}")
+                    break
+                if detector.imgsz != imgsz:
+                    print(f"Skipping {label}: the model only accepts imgsz={detector.imgsz}")
+                    break
+                latency = percentiles(latencies)["mean"] / 1000
+                print(f"{label}: {latency * 1000:.1f} ms")
+                if best is None or latency < best[1]:
+                    best = (detector, latency, thread_count)
+            if best is None:
+                continue
+            detector, latency, thread_count = best
+            _, detections = measure(detector, frames, 0)
+            runs.append(((backend, int8, imgsz, thread_count), latency, detections))
+
+    if not runs:
+        return [], 0
+    reference = runs[0][2]
+    reference_boxes = sum(len(d) for d in reference)
+    candidates = []
+    for (backend, int8, imgsz, thread_count), latency, detections in runs:
+        for stride in strides:
+            candidates.append({
+                "backend": backend, "int8": int8, "imgsz": imgsz,
+                "threads": thread_count, "stride": stride,
+                "latency_ms": latency * 1000,
+                # The detector runs on every stride-th frame of every camera
+                "fps_per_camera": stride / (latency * cameras) if latency > 0 else float("inf"),
+                "misses": count_misses(detections, reference, stride),
+            })
+    return candidates, reference_boxes
+
+
+def print_candidates(candidates, reference_boxes):
+    print(f"\n{'backend':<14} {'imgsz':>5} {'threads':>7} {'stride':>6} {'ms':>8} "
+          f"{'fps/cam':>8} {'missed':>10}")
+    for c in sorted(candidates, key=lambda c: (-c["fps_per_camera"], c["misses"])):
+        backend = c["backend"] + (" int8" if c["int8"] else "")
+        missed = f"{c['misses']}/{reference_boxes}"
+        print(f"{backend:<14} {c['imgsz']:>5} {c['threads']:>7} {c['stride']:>6} "
+              f"{c['latency_ms']:>8.1f} {c['fps_per_camera']:>8.1f} {missed:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pick a performance profile for this machine")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", action="append", help="reference video file (repeatable)")
+    source.add_argument("--synthetic", type=int, metavar="N",
+                        help="use N synthetic frames (only measures speed; nothing is detected)")
+    parser.add_argument("--frames", type=int, default=300, help="reference frames to use (default: 300)")
+    parser.add_argument("--target-fps", type=float, default=10.0,
+                        help="frames per second each camera must reach (default: 10)")
+    parser.add_argument("--cameras", type=int, default=1, help="cameras sharing the detector (default: 1)")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS),
+                        help="only try this backend (repeatable)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(INPUT_SIZES),
+                        help="input sizes to try")
+    parser.add_argument("--threads", type=int, nargs="+", help="thread counts to try")
+    parser.add_argument("--strides", type=int, nargs="+", default=list(STRIDES),
+                        help="detect strides to try")
+    parser.add_argument("--timing-frames", type=int, default=20,
+                        help="frames timed per configuration (default: 20)")
+    parser.add_argument("--output", default=PROFILE_FILE, help="where to save the profile")
+    parser.add_argument("--dry-run", action="store_true", help="print the choice without saving it")
+    args = parser.parse_args(argv)
+
+    host = host_info()
+    print(f"Host: {host['processor']}, {host['cpu_count']} CPUs, ~{host['gflops']} GFLOPS")
+
+    if args.video:
+        frames = list(video_frames(args.video, limit=args.frames))
+        source_name = ", ".join(os.path.basename(path) for path in args.video)
+    else:
+        frames = list(synthetic_frames(args.synthetic))
+        source_name = f"synthetic {args.synthetic}"
+    if not frames:
+        print("Error: No reference frames.")
+        return 1
+
+    backends = available_backends(args.backend)
+    if not backends:
+        print("Error: No detector models found; run `python -m detectors.export` first.")
+        return 1
+
+    candidates, reference_boxes = autotune(frames, backends, args.sizes, args.threads, args.strides,
+                                           max(1, args.cameras), args.timing_frames)
+    if not candidates:
+        print("Error: No detector configuration could be measured.")
+        return 1
+    print_candidates(candidates, reference_boxes)
+
+    chosen, met_target = choose(candidates, args.target_fps)
+    if not met_target:
+        print(f"Warning: No configuration reaches {args.target_fps} fps per camera; "
+              f"using the fastest ({chosen['fps_per_camera']:.1f} fps)")
+    print(f"\nChosen: {chosen['backend']}{' int8' if chosen['int8'] else ''}, imgsz={chosen['imgsz']}, "
+          f"threads={chosen['threads']}, stride={chosen['stride']} "
+          f"({chosen['fps_per_camera']:.1f} fps per camera, "
+          f"{chosen['misses']}/{reference_boxes} reference detections missed)")
+    if args.dry_run:
+        return 0
+
+    settings = {
+        "DETECTOR_BACKEND": chosen["backend"],
+        "DETECTOR_MODEL_PATH": None,
+        "DETECTOR_INT8": chosen["int8"],
+        "DETECTOR_INPUT_SIZE": chosen["imgsz"],
+        "DETECTOR_THREADS": chosen["threads"],
+        "DETECT_STRIDE": chosen["stride"],
+        "TRACKER_ENABLED": True,
+    }
+    save_profile(args.output, "auto", settings,
+                 created=datetime.now().isoformat(timespec="seconds"),
+                 host=host, source=source_name, target_fps=args.target_fps, cameras=args.cameras,
+                 met_target=met_target, reference_detections=reference_boxes,
+                 measured=chosen)
+    print(f"Saved to {args.output}; it is used while PERFORMANCE_PROFILE is \"auto\"")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,385 @@
+# replay.py
+"""
+Offline replay benchmark for the detection pipeline.
+
+Replays recorded videos (or synthetic frames) through the non-GUI stages
+(motion gate / detect stride, detect_humans, tracking, zone check,
+occupancy update, log_event and snapshot writing) and reports FPS, p50/p95/p99 latency per
+stage and peak RSS. Results are written as JSON and can be compared with
+a stored baseline; the exit code is 1 when a metric regressed.
+
+Example:
+    python -m benchmarks.replay --video clip.mp4 --output results.json
+    python -m benchmarks.replay --synthetic 300 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.replay --synthetic 300 --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import cv2
+import numpy as np
+from detectors.yolo_detector import configure_detector, detect_humans_array, warmup, close_detector
+from utils.intrusion import IntrusionMonitor
+from utils.logger import log_event
+from utils.occupancy import OccupancyMap
+from utils.pipeline import SourcePipeline, DETECT
+from utils.roi_crop import to_frame
+from utils.snapshot_writer import get_snapshot_writer, close_snapshot_writer
+from utils.zones import load_zones
+from config.settings import (MOTION_GATE_ENABLED, TRACKER_ENABLED, DETECT_STRIDE,
+                             ROI_INFERENCE_ENABLED, DETECTOR_INPUT_SIZE)
+
+STAGES = ["source", "plan", "detect", "track", "zones", "occupancy", "log_event", "frame"]
+
+# metric -> True when higher is better
+COMPARED_METRICS = {"fps": True, "peak_rss_mb": False}
+COMPARED_PERCENTILES = ("p50", "p95", "p99")
+
+
+def synthetic_frames(count, width=1280, height=720, people=2, seed=0):
+    """
+    Yields frames with person-sized blocks walking across a noisy background.
+
+    Args:
+        count (int): Number of frames
+        width, height (int): Frame size
+        people (int): Number of moving blocks
+        seed (int): Random seed, so runs are comparable
+
+    Yields:
+        numpy.ndarray: BGR frame
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 90, (height, width, 3), dtype=np.uint8)
+    box_w, box_h = max(8, width // 16), max(16, height // 4)
+    starts = rng.uniform(0, width, people)
+    rows = rng.uniform(0, height - box_h, people).astype(int)
+    speeds = rng.uniform(2, 8, people) * rng.choice((-1, 1), people)
+    for i in range(count):
+        frame = background.copy()
+        for start, row, speed in zip(starts, rows, speeds):
+            x = int((start + speed * i) % (width + box_w)) - box_w
+            cv2.rectangle(frame, (x, row), (x + box_w, row + box_h), (200, 180, 160), -1)
+        yield frame
+
+
+def video_frames(paths, limit=None):
+    """
+    Yields the frames of one or more video files in order.
+    """
+    produced = 0
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video {path}.")
+            continue
+        while limit is None or produced < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            produced += 1
+            yield frame
+        cap.release()
+
+
+def percentiles(samples):
+    """
+    Returns:
+        dict: count, mean and p50/p95/p99 of the samples in milliseconds
+    """
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+    return {"count": len(samples), "mean": float(ms.mean()),
+            "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def peak_rss_mb():
+    """
+    Returns:
+        float: Peak resident set size of this process in MiB, or None if unknown
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def run_benchmark(frames, zones, motion_gate=True, tracking=True, stride=1,
+                  log_every=0, warmup_frames=5, roi_inference=False, input_size=DETECTOR_INPUT_SIZE):
+    """
+    Runs frames through the pipeline stage by stage, timing each one.
+
+    Args:
+        frames (iterable): BGR frames
+        zones (ZoneSet): Zones to check
+        motion_gate, tracking (bool), stride (int), roi_inference (bool),
+            input_size (int): SourcePipeline options
+        log_every (int): Also log an event (with snapshot) every Nth frame, so
+            the logging stages are measured even when nobody is detected
+        warmup_frames (int): Leading frames left out of the statistics
+
+    Returns:
+        dict: Results, ready to be written as JSON
+    """
+    pipeline = SourcePipeline(zones, motion_gate=motion_gate, tracking=tracking, stride=stride,
+                              roi_inference=roi_inference, input_size=input_size)
+    monitor = IntrusionMonitor(zones)
+    occupancy = OccupancyMap("benchmark")  # kept in memory, never saved
+    samples = {stage: [] for stage in STAGES}
+    actions = {}
+    alerts = 0
+    measured = 0
+    iterator = iter(frames)
+    started = None
+
+    for index in range(sys.maxsize):
+        frame_started = time.perf_counter()
+        frame = next(iterator, None)
+        if frame is None:
+            break
+        timings = {"source": time.perf_counter() - frame_started}
+
+        t = time.perf_counter()
+        action = pipeline.plan(frame)
+        timings["plan"] = time.perf_counter() - t
+
+        detections = None
+        if action == DETECT:
+            t = time.perf_counter()
+            crop = pipeline.detector_input(frame)
+            detections = to_frame(detect_humans_array(crop.image, crop.imgsz), crop)
+            timings["detect"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        people = pipeline.apply(action, detections)
+        timings["track"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        result = monitor.check(people, frame.shape)
+        timings["zones"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        occupancy.update(people, frame.shape, result.membership, [zone.name for zone in zones.zones])
+        timings["occupancy"] = time.perf_counter() - t
+
+        forced = log_every and index % log_every == 0
+        if result.alerts or forced:
+            t = time.perf_counter()
+            log_event("Benchmark event" if not result.alerts else "Intrusion Detected", frame,
+                      camera="benchmark")
+            timings["log_event"] = time.perf_counter() - t
+            alerts += bool(result.alerts)
+        timings["frame"] = time.perf_counter() - frame_started
+
+        if index < warmup_frames:
+            continue
+        if started is None:
+            started = frame_started
+        measured += 1
+        actions[action] = actions.get(action, 0) + 1
+        for stage, elapsed in timings.items():
+            samples[stage].append(elapsed)
+
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    close_detector()
+    snapshot_writer = get_snapshot_writer()
+    close_snapshot_writer()  # waits for the queued snapshots
+    snapshot_stats = snapshot_writer.stats()
+
+    stages = {stage: percentiles(values) for stage, values in samples.items()}
+    stages["snapshot"] = {
+        "count": snapshot_stats["written"],
+        "mean": snapshot_stats["encode_ms_avg"],
+        "p50": snapshot_stats["encode_ms_p50"],
+        "p95": snapshot_stats["encode_ms_p95"],
+        "p99": snapshot_stats["encode_ms_p99"],
+    }
+    return {
+        "frames": measured,
+        "seconds": elapsed,
+        "fps": measured / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "alerts": alerts,
+        "actions": actions,
+        "snapshots_dropped": snapshot_stats["dropped"],
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, tolerance=0.1, min_delta_ms=0.5):
+    """
+    Compares results with a baseline run.
+
+    FPS may drop and latencies/memory may grow by at most `tolerance`
+    (relative) before counting as a regression. Latencies must also grow by
+    more than `min_delta_ms`, so jitter on sub-millisecond stages is ignored.
+
+    Returns:
+        list: (metric, baseline, current, relative change, regressed) rows
+    """
+    rows = []
+
+    def add(metric, old, new, higher_is_better, min_delta=0.0):
+        if old is None or new is None:
+            return
+        change = (new - old) / old if old else 0.0
+        if higher_is_better:
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance and new - old > min_delta
+        rows.append((metric, old, new, change, regressed))
+
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        add(metric, baseline.get(metric), results.get(metric), higher_is_better)
+    for stage, current in results["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old or not old.get("count") or not current["count"]:
+            continue
+        for key in COMPARED_PERCENTILES:
+            add(f"{stage}.{key}_ms", old[key], current[key], False, min_delta_ms)
+    return rows
+
+
+def print_results(results):
+    print(f"{results['frames']} frames in {results['seconds']:.2f} s: {results['fps']:.1f} FPS, "
+          f"peak RSS {results['peak_rss_mb'] or 0:.0f} MiB, alerts {results['alerts']}")
+    print(f"{'stage':<10} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    for stage, s in results["stages"].items():
+        print(f"{stage:<10} {s['count']:>7} {s['mean']:>9.2f} {s['p50']:>9.2f} "
+              f"{s['p95']:>9.2f} {s['p99']:>9.2f}")
+
+
+def print_comparison(rows):
+    print(f"{'metric':<22} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, old, new, change, regressed in rows:
+        print(f"{metric:<22} {old:>10.2f} {new:>10.2f} {change:>+8.1%}"
+              + ("  REGRESSION" if regressed else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for the detection pipeline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", action="append", help="video file to replay (repeatable)")
+    source.add_argument("--synthetic", type=int, metavar="N", help="replay N synthetic frames")
+    parser.add_argument("--size", default="1280x720", help="synthetic frame size (default: 1280x720)")
+    parser.add_argument("--frames", type=int, help="stop after this many video frames")
+    parser.add_argument("--warmup-frames", type=int, default=5,
+                        help="leading frames left out of the statistics (default: 5)")
+    parser.add_argument("--zones", default=os.path.join("config", "zones.example.json"),
+                        help="zone set JSON file (default: config/zones.example.json)")
+    parser.add_argument("--no-motion-gate", action="store_true", help="disable the motion gate")
+    parser.add_argument("--no-tracker", action="store_true", help="disable tracking")
+    parser.add_argument("--detect-stride", type=int, default=DETECT_STRIDE,
+                        help=f"run the detector on every Nth frame (default: {DETECT_STRIDE})")
+    parser.add_argument("--roi-inference", action=argparse.BooleanOptionalAction,
+                        default=ROI_INFERENCE_ENABLED,
+                        help="run the detector only on the zones' region plus a margin "
+                             f"(default: {'on' if ROI_INFERENCE_ENABLED else 'off'})")
+    parser.add_argument("--log-every", type=int, default=30,
+                        help="log an event with snapshot every N frames, 0 for alerts only (default: 30)")
+    parser.add_argument("--backend", choices=["torch", "onnx", "openvino"],
+                        help="inference backend (default: config.settings.DETECTOR_BACKEND)")
+    parser.add_argument("--model", help="model file or directory for the backend")
+    parser.add_argument("--int8", action="store_true", default=None, help="use the quantized INT8 model")
+    parser.add_argument("--threads", type=int, help="CPU threads per inference")
+    parser.add_argument("--imgsz", type=int, help="model input size in pixels")
+    parser.add_argument("--processes", type=int,
+                        help="run inference in this many worker processes (default: DETECTOR_PROCESSES)")
+    parser.add_argument("--workdir", help="directory for the events and snapshots written "
+                                          "(default: a temporary directory)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with the results stored in this JSON file")
+    parser.add_argument("--save-baseline", help="also store the results as a baseline here")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative change allowed before a metric counts as regressed (default: 0.1)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="latency growth ignored as noise, in ms (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    configure_detector(backend=args.backend, model_path=args.model, int8=args.int8,
+                       threads=args.threads, imgsz=args.imgsz, processes=args.processes)
+    zones = load_zones(args.zones)
+
+    # Resolve every input path, and load the model, before moving into the
+    # work directory so the benchmark never writes into the real logs/
+    videos = [os.path.abspath(path) for path in args.video or []]
+    outputs = [os.path.abspath(path) if path else None
+               for path in (args.output, args.baseline, args.save_baseline)]
+    warmup()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="htd_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    if videos:
+        frames = video_frames(videos, limit=args.frames)
+        source_name = ", ".join(os.path.basename(path) for path in videos)
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        frames = synthetic_frames(args.synthetic, width, height)
+        source_name = f"synthetic {args.synthetic}x{width}x{height}"
+
+    motion_gate = MOTION_GATE_ENABLED and not args.no_motion_gate
+    tracking = TRACKER_ENABLED and not args.no_tracker
+    results = run_benchmark(frames, zones, motion_gate=motion_gate, tracking=tracking,
+                            stride=args.detect_stride, log_every=args.log_every,
+                            warmup_frames=args.warmup_frames, roi_inference=args.roi_inference,
+                            input_size=args.imgsz or DETECTOR_INPUT_SIZE)
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": source_name,
+        "config": {
+            "backend": args.backend, "model": args.model, "int8": bool(args.int8),
+            "threads": args.threads, "imgsz": args.imgsz, "processes": args.processes,
+            "motion_gate": motion_gate,
+            "tracking": tracking, "detect_stride": args.detect_stride,
+            "roi_inference": args.roi_inference,
+            "log_every": args.log_every,
+        },
+        "system": {
+            "platform": platform.platform(), "python": platform.python_version(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(),
+        },
+        **results,
+    }
+    print_results(results)
+
+    output, baseline_path, save_baseline = outputs
+    for path in (output, save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    if baseline_path:
+        try:
+            with open(baseline_path, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read baseline {baseline_path}: {e}")
+            return 1
+        if baseline.get("source") != results["source"] or baseline.get("config") != results["config"]:
+            print("Warning: baseline was recorded with a different source or configuration")
+        rows = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        print_comparison(rows)
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+# roi_accuracy.py
+"""
+Accuracy check for ROI-cropped inference on recorded clips.
+
+Runs the detector on every sampled frame twice: on the full frame, as the
+reference, and on the zones' crop the way ROI inference would. It then
+compares which people each run places inside each zone, with a separate
+count for people whose center is near a zone edge - where a tight crop
+would cut them off. The exit code is 1 when the crop's recall falls below
+--min-recall (overall or near edges) or drops below a stored baseline.
+
+Example:
+    python -m benchmarks.roi_accuracy --video clip.mp4 --zones config/zones.example.json
+    python -m benchmarks.roi_accuracy --video clip.mp4 --zones zones.json --save-baseline roi.json
+    python -m benchmarks.roi_accuracy --video clip.mp4 --zones zones.json --baseline roi.json
+"""
+import argparse
+import json
+import os
+import time
+import cv2
+import numpy as np
+from benchmarks.replay import video_frames
+from detectors.yolo_detector import configure_detector, detect_humans_array, warmup, close_detector
+from utils.geometry import box_centers
+from utils.roi_crop import roi_crop, to_frame
+from utils.tracker import iou_matrix
+from utils.zones import load_zones
+from config.settings import ROI_INFERENCE_MARGIN, DETECTOR_INPUT_SIZE
+
+MATCH_IOU = 0.5
+
+
+def edge_distances(points, zones, shape):
+    """
+    Returns:
+        numpy.ndarray: (N,) distance in pixels from each point to the nearest zone edge
+    """
+    height, width = shape[:2]
+    distances = np.full(len(points), np.inf, dtype=np.float32)
+    for zone in zones.zones:
+        polygon = (np.asarray(zone.points) * (width, height)).astype(np.float32).reshape(-1, 1, 2)
+        for i, (x, y) in enumerate(points.tolist()):
+            distances[i] = min(distances[i], abs(cv2.pointPolygonTest(polygon, (x, y), True)))
+    return distances
+
+
+def compare_frame(reference, candidate, zones, shape, edge_px):
+    """
+    Counts the reference's in-zone people the candidate also places in the same zones.
+
+    Returns:
+        dict: in_zone, found, edge, edge_found and extra (candidate-only in-zone people)
+    """
+    counts = {"in_zone": 0, "found": 0, "edge": 0, "edge_found": 0, "extra": 0}
+    ref_members = zones.membership(box_centers(reference), shape) if len(reference) else None
+    cand_members = zones.membership(box_centers(candidate), shape) if len(candidate) else None
+    ref_inside = ref_members.any(axis=1) if ref_members is not None else np.zeros(0, dtype=bool)
+    cand_inside = cand_members.any(axis=1) if cand_members is not None else np.zeros(0, dtype=bool)
+
+    matched = set()
+    if ref_inside.any():
+        near_edge = edge_distances(box_centers(reference[ref_inside]), zones, shape) <= edge_px
+        iou = (iou_matrix(reference[ref_inside, :4], candidate[:, :4]) if len(candidate)
+               else np.zeros((int(ref_inside.sum()), 0)))
+        for row, ref_index in enumerate(np.flatnonzero(ref_inside)):
+            found = False
+            for cand_index in np.argsort(-iou[row]) if iou.shape[1] else []:
+                if iou[row, cand_index] < MATCH_IOU:
+                    break
+                if cand_index not in matched and (cand_members[cand_index] == ref_members[ref_index]).all():
+                    matched.add(cand_index)
+                    found = True
+                    break
+            counts["in_zone"] += 1
+            counts["found"] += found
+            counts["edge"] += bool(near_edge[row])
+            counts["edge_found"] += bool(near_edge[row]) and found
+    counts["extra"] = int(sum(1 for i in np.flatnonzero(cand_inside) if i not in matched))
+    return counts
+
+
+def run_check(frames, zones, every=1, margin=ROI_INFERENCE_MARGIN, input_size=DETECTOR_INPUT_SIZE,
+              edge=0.05):
+    """
+    Args:
+        frames (iterable): BGR frames of the recorded clips
+        zones (ZoneSet): Zones to crop to and check
+        every (int): Only check every Nth frame
+        margin (float): ROI_INFERENCE_MARGIN to test
+        input_size (int): Full-frame model input size
+        edge (float): "Near an edge" distance, as a fraction of the frame height
+
+    Returns:
+        dict: Counts, recalls and mean detect latency of both runs
+    """
+    totals = {"frames": 0, "in_zone": 0, "found": 0, "edge": 0, "edge_found": 0, "extra": 0}
+    full_seconds, crop_seconds = [], []
+    sizes = set()
+    for index, frame in enumerate(frames):
+        if index % every:
+            continue
+        started = time.perf_counter()
+        reference = detect_humans_array(frame, input_size)
+        full_seconds.append(time.perf_counter() - started)
+
+        crop = roi_crop(frame, zones, margin=margin, base_size=input_size)
+        started = time.perf_counter()
+        candidate = to_frame(detect_humans_array(crop.image, crop.imgsz or input_size), crop)
+        crop_seconds.append(time.perf_counter() - started)
+        sizes.add(crop.imgsz or input_size)
+
+        counts = compare_frame(reference, candidate, zones, frame.shape, edge * frame.shape[0])
+        totals["frames"] += 1
+        for key, value in counts.items():
+            totals[key] += value
+
+    return {
+        **totals,
+        "recall": totals["found"] / totals["in_zone"] if totals["in_zone"] else 1.0,
+        "edge_recall": totals["edge_found"] / totals["edge"] if totals["edge"] else 1.0,
+        "full_detect_ms": 1000 * float(np.mean(full_seconds)) if full_seconds else 0.0,
+        "crop_detect_ms": 1000 * float(np.mean(crop_seconds)) if crop_seconds else 0.0,
+        "crop_input_sizes": sorted(sizes),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy check for ROI-cropped inference")
+    parser.add_argument("--video", action="append", required=True, help="recorded clip (repeatable)")
+    parser.add_argument("--zones", required=True, help="zone set JSON file")
+    parser.add_argument("--frames", type=int, help="stop after this many video frames")
+    parser.add_argument("--every", type=int, default=1, help="check every Nth frame (default: 1)")
+    parser.add_argument("--margin", type=float, default=ROI_INFERENCE_MARGIN,
+                        help=f"crop margin as a fraction of the frame (default: {ROI_INFERENCE_MARGIN})")
+    parser.add_argument("--edge", type=float, default=0.05,
+                        help="near-edge distance as a fraction of the frame height (default: 0.05)")
+    parser.add_argument("--min-recall", type=float, default=0.95,
+                        help="fail below this recall, overall or near edges (default: 0.95)")
+    parser.add_argument("--backend", choices=["torch", "onnx", "openvino"],
+                        help="inference backend (default: config.settings.DETECTOR_BACKEND)")
+    parser.add_argument("--model", help="model file or directory for the backend")
+    parser.add_argument("--imgsz", type=int, help="full-frame model input size in pixels")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="fail if recall dropped below the results stored here")
+    parser.add_argument("--save-baseline", help="also store the results as a baseline here")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="allowed recall drop against the baseline (default: 0.01)")
+    args = parser.parse_args(argv)
+
+    configure_detector(backend=args.backend, model_path=args.model, imgsz=args.imgsz)
+    warmup()
+    zones = load_zones(args.zones)
+    results = run_check(video_frames(args.video, limit=args.frames), zones, every=args.every,
+                        margin=args.margin, input_size=args.imgsz or DETECTOR_INPUT_SIZE,
+                        edge=args.edge)
+    close_detector()
+    results = {"source": ", ".join(os.path.basename(path) for path in args.video),
+               "margin": args.margin, **results}
+
+    print(f"Frames checked: {results['frames']}, crop input size(s): {results['crop_input_sizes']}")
+    print(f"In-zone people: {results['found']}/{results['in_zone']} found (recall {results['recall']:.3f})")
+    print(f"Near zone edges: {results['edge_found']}/{results['edge']} found "
+          f"(recall {results['edge_recall']:.3f})")
+    print(f"Extra in-zone detections: {results['extra']}")
+    print(f"Detect: {results['full_detect_ms']:.1f} ms full frame, {results['crop_detect_ms']:.1f} ms cropped")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    failed = False
+    for key in ("recall", "edge_recall"):
+        if results[key] < args.min_recall:
+            print(f"FAIL: {key} {results[key]:.3f} is below {args.min_recall}")
+            failed = True
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read baseline {args.baseline}: {e}")
+            return 1
+        for key in ("recall", "edge_recall"):
+            if results[key] < baseline.get(key, 0.0) - args.tolerance:
+                print(f"FAIL: {key} {results[key]:.3f} regressed from {baseline[key]:.3f}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
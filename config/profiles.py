@@ -0,0 +1,81 @@
+# profiles.py
+import json
+import os
+
+# Settings a performance profile may override
+PROFILE_KEYS = {
+    "DETECTOR_BACKEND", "DETECTOR_MODEL_PATH", "DETECTOR_INT8", "DETECTOR_THREADS",
+    "DETECTOR_INPUT_SIZE", "DETECTOR_CONFIDENCE", "DETECTOR_PROCESSES", "DETECT_STRIDE",
+    "MOTION_GATE_ENABLED", "TRACKER_ENABLED", "ROI_INFERENCE_ENABLED",
+}
+
+AUTO = "auto"  # the profile saved by the autotuner, if there is one
+
+
+def load_profile_file(path):
+    """
+    Reads a profile saved by save_profile.
+
+    Returns:
+        dict: The file's contents, or None if it does not exist or is invalid
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read performance profile {path}: {e}")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("settings"), dict):
+        print(f"Error: {path} is not a performance profile")
+        return None
+    return data
+
+
+def save_profile(path, name, settings, **info):
+    """
+    Writes a profile, e.g. the autotuner's choice, as JSON.
+
+    Args:
+        path (str): Destination file
+        name (str): Profile name
+        settings (dict): Setting name -> value, keys from PROFILE_KEYS
+        **info: Extra fields stored alongside (host, measurements, ...)
+    """
+    unknown = set(settings) - PROFILE_KEYS
+    if unknown:
+        raise ValueError(f"Not profile settings: {', '.join(sorted(unknown))}")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"name": name, "settings": settings, **info}, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def resolve_profile(name, profiles, path):
+    """
+    Looks up the settings of a performance profile.
+
+    Args:
+        name (str): A key of `profiles`, AUTO for the saved profile at `path`,
+            or None for no profile
+        profiles (dict): Named profiles, name -> {setting: value}
+        path (str): File written by the autotuner
+
+    Returns:
+        dict: Settings to override; empty if there is nothing to apply
+    """
+    if not name:
+        return {}
+    if name == AUTO:
+        data = load_profile_file(path)
+        settings = data["settings"] if data else {}
+    elif name in profiles:
+        settings = profiles[name]
+    else:
+        print(f"Error: Unknown performance profile {name!r} (choose from {', '.join(profiles)}, {AUTO})")
+        return {}
+    return {key: value for key, value in settings.items() if key in PROFILE_KEYS}
@@ -1 +1,120 @@
 # settings.py
+import os
+from config.profiles import resolve_profile
+
+# Video sources shown in the main window, one tile each. Integers are webcam
+# indices, strings are video files or stream URLs.
+CAMERA_SOURCES = [0]
+
+# Motion gate: skip the detector on static scenes and reuse the last result
+MOTION_GATE_ENABLED = True
+MOTION_THRESHOLD = 0.005  # fraction of ROI pixels that must change
+MOTION_KEEPALIVE = 2.0  # seconds between forced detections
+MOTION_ROI_MARGIN = 0.15  # extra area around the ROI, as a fraction of its size
+
+# Snapshot writer: JPEG encoding and disk writes happen on background threads
+SNAPSHOT_WORKERS = 2  # encoder threads
+SNAPSHOT_QUEUE_SIZE = 32  # snapshots waiting to be encoded
+SNAPSHOT_DROP_POLICY = "drop_oldest"  # "drop_oldest", "drop_newest" or "block"
+SNAPSHOT_JPEG_QUALITY = 90
+SNAPSHOT_MAX_WIDTH = None  # downscale wider snapshots to this width (None keeps full size)
+SNAPSHOT_CROP = True  # save only the intruders plus some context instead of the whole frame
+SNAPSHOT_CROP_CONTEXT = 0.5  # context on each side, as a fraction of the intruders' extent
+SNAPSHOT_DEDUP_DISTANCE = 6  # perceptual hash bits; closer snapshots reuse the previous file (None disables)
+SNAPSHOT_DEDUP_WINDOW = 60.0  # seconds; a near-duplicate is still saved once this much later
+SNAPSHOT_MAX_MB = 2048  # oldest snapshots are deleted beyond this (None for no limit)
+SNAPSHOT_MAX_AGE_DAYS = 90  # snapshots older than this are deleted (None keeps them)
+SNAPSHOT_CLEANUP_INTERVAL = 600  # seconds between retention passes
+
+# Detector backend: "torch" (ultralytics), "onnx" (ONNX Runtime) or "openvino".
+# Export the ONNX/OpenVINO models first with `python -m detectors.export`.
+DETECTOR_BACKEND = "torch"
+DETECTOR_MODEL_PATH = None  # None uses the backend's default file in models/
+DETECTOR_INT8 = False  # use the quantized model (onnx/openvino only)
+DETECTOR_THREADS = 0  # CPU inference threads, 0 lets the runtime decide
+DETECTOR_INPUT_SIZE = 640  # model input size in pixels
+DETECTOR_CONFIDENCE = 0.4
+# Worker processes for inference, each with its own model copy; 0 runs the
+# model in the main process. With a pool, DETECTOR_THREADS is per process
+# (0 splits the CPU cores evenly between the processes).
+DETECTOR_PROCESSES = 0
+
+# Tracking: alert once per person entering a zone, and let the tracker
+# predict boxes so the detector only runs on every DETECT_STRIDE-th frame
+TRACKER_ENABLED = True
+DETECT_STRIDE = 2
+TRACK_HIGH_THRESHOLD = 0.5  # detections at or above this confidence start new tracks
+TRACK_MAX_AGE = 30  # frames a track is kept without a matching detection
+
+# ROI inference: run the detector only on the zones' region plus a margin, at
+# a proportionally smaller input size; people outside it are not detected
+ROI_INFERENCE_ENABLED = False
+ROI_INFERENCE_MARGIN = 0.1  # added on each side, as a fraction of the frame size
+ROI_INFERENCE_MAX_FRACTION = 0.6  # larger regions (e.g. spread-out zones) use the full frame
+ROI_INFERENCE_MIN_SIZE = 256  # smallest model input size for a crop
+
+# Event clips: the seconds before and after each alert are saved as video
+CLIP_ENABLED = True
+CLIP_PRE_SECONDS = 5.0  # seconds kept in memory before an alert
+CLIP_POST_SECONDS = 5.0  # seconds recorded after the intruder was last seen
+CLIP_MAX_SECONDS = 120.0  # longest clip, however long the intruder stays
+CLIP_FPS = 10  # frames per second sampled for clips
+CLIP_MAX_WIDTH = 640  # clips are downscaled to this width
+CLIP_JPEG_QUALITY = 70  # compression of the buffered frames
+CLIP_BUFFER_MAX_MB = 32  # memory cap of the pre-event buffer, per camera
+
+# Occupancy analytics: a per-camera heatmap of where people stand and
+# per-zone dwell times, updated with every processed frame and saved to
+# logs/analytics/ as compact snapshots
+OCCUPANCY_ENABLED = True
+OCCUPANCY_GRID_WIDTH = 64  # heatmap cells across the frame; rows follow the aspect ratio
+OCCUPANCY_MAX_GAP = 1.0  # seconds; longer pauses between frames are not counted
+OCCUPANCY_SAVE_INTERVAL = 60  # seconds between snapshots
+OCCUPANCY_OVERLAY = False  # draw the heatmap on the video (also under the View menu)
+
+# Alerts: bursts of alerts are merged into one on-screen notification
+ALERT_COALESCE_WINDOW = 3.0  # seconds; alerts closer together join the same notification
+ALERT_SOUND_DURATION = 5.0  # seconds the alert sound loops, unless dismissed earlier
+ALERT_NOTIFICATION_TIMEOUT = 15.0  # seconds a notification stays up after its last alert
+
+# Metrics: per-stage latency histograms and counters for the hot path
+METRICS_ENABLED = True
+METRICS_HISTOGRAM_SIZE = 1024  # latency samples kept per stage for percentiles
+METRICS_OVERLAY = False  # draw FPS/latency on the video (also under the View menu)
+METRICS_DUMP_INTERVAL = 10  # seconds between metrics file writes
+METRICS_FILE = None  # e.g. "logs/metrics.prom" (Prometheus text format)
+METRICS_HTTP_PORT = None  # e.g. 9108 to serve http://127.0.0.1:9108/metrics
+
+# Live view over HTTP: annotated MJPEG streams for viewers on other
+# machines, at http://<host>:<port>/. Each frame is encoded once per stream
+# and the same bytes go to every client; slow clients skip frames
+MJPEG_HTTP_PORT = None  # e.g. 8081; None disables the server
+MJPEG_HOST = "0.0.0.0"  # all interfaces, so the LAN can connect; "127.0.0.1" for local only
+MJPEG_FPS = 10  # frames per second encoded per stream, at most
+MJPEG_QUALITY = 70  # JPEG quality of the streams
+MJPEG_MAX_WIDTH = 960  # wider frames are downscaled before encoding
+MJPEG_STREAM_LIMITS = {}  # per-camera overrides, e.g. {"Camera 1": {"fps": 5, "quality": 50}}
+MJPEG_MAX_CLIENTS = 16  # concurrent viewers over all streams
+MJPEG_CLIENT_TIMEOUT = 10.0  # seconds a client may stall a send before it is dropped
+
+# Log viewer: events are fetched a page at a time and shown with small
+# thumbnails, generated on first view into a size-capped on-disk cache
+LOG_PAGE_SIZE = 100  # events fetched per page
+THUMBNAIL_WIDTH = 160  # pixels
+THUMBNAIL_CACHE_MB = 64  # least recently viewed thumbnails are evicted beyond this
+
+# Performance profiles: named sets of the detector/tracking knobs above,
+# applied over them. "auto" uses the profile saved by
+# `python -m benchmarks.autotune` in PROFILE_FILE, if there is one; None
+# keeps the values above. The HTD_PROFILE environment variable overrides
+# PERFORMANCE_PROFILE.
+PERFORMANCE_PROFILES = {
+    "low-power": {"DETECTOR_INPUT_SIZE": 320, "DETECT_STRIDE": 3, "DETECTOR_THREADS": 2},
+    "balanced": {"DETECTOR_INPUT_SIZE": 480, "DETECT_STRIDE": 2},
+    "accuracy": {"DETECTOR_INPUT_SIZE": 640, "DETECT_STRIDE": 1},
+}
+PERFORMANCE_PROFILE = "auto"
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profile.json")
+
+globals().update(resolve_profile(os.environ.get("HTD_PROFILE", PERFORMANCE_PROFILE),
+                                 PERFORMANCE_PROFILES, PROFILE_FILE))
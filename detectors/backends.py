@@ -0,0 +1,54 @@
+# backends.py
+import importlib
+import os
+
+MODELS_DIR = "models"
+
+# backend name -> (module, class)
+BACKENDS = {
+    "torch": ("detectors.torch_backend", "TorchDetector"),
+    "onnx": ("detectors.onnx_backend", "OnnxDetector"),
+    "openvino": ("detectors.openvino_backend", "OpenVINODetector"),
+}
+
+# Files written by `python -m detectors.export`; (fp32, int8) per backend
+DEFAULT_MODELS = {
+    "torch": ("yolov8n.pt", None),
+    "onnx": ("yolov8n.onnx", "yolov8n.int8.onnx"),
+    "openvino": ("yolov8n_openvino_model", "yolov8n_int8_openvino_model"),
+}
+
+
+def default_model_path(backend, int8=False):
+    fp32, quantized = DEFAULT_MODELS[backend]
+    if int8:
+        if quantized is None:
+            raise ValueError(f"The {backend} backend has no INT8 model")
+        return os.path.join(MODELS_DIR, quantized)
+    return os.path.join(MODELS_DIR, fp32)
+
+
+def create_detector(backend="torch", model_path=None, conf=0.4, imgsz=640, threads=0, int8=False):
+    """
+    Builds a detector for the given backend.
+
+    The backend's runtime is imported here, so unused runtimes never load.
+
+    Args:
+        backend (str): "torch", "onnx" or "openvino"
+        model_path (str, optional): Defaults to the backend's model in models/
+        conf (float): Minimum detection confidence
+        imgsz (int): Model input size (fixed-size exports override it)
+        threads (int): CPU inference threads, 0 for the runtime's default
+        int8 (bool): Use the quantized model when model_path is not given
+
+    Returns:
+        Detector: The backend instance
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend} (choose from {', '.join(BACKENDS)})")
+    if model_path is None:
+        model_path = default_model_path(backend, int8)
+    module_name, class_name = BACKENDS[backend]
+    detector_class = getattr(importlib.import_module(module_name), class_name)
+    return detector_class(model_path, conf=conf, imgsz=imgsz, threads=threads)
@@ -0,0 +1,48 @@
+# base.py
+import numpy as np
+
+
+def empty_detections():
+    return np.zeros((0, 5), dtype=np.float32)
+
+
+class Detector:
+    """
+    Interface shared by all inference backends.
+
+    Every backend returns person detections as an (N, 5) float32 array of
+    rows (x1, y1, x2, y2, confidence) in pixel coordinates of the input frame,
+    so callers do not care which runtime produced them.
+    """
+
+    name = "base"
+    # Whether several threads may call detect_batch at once. In-process
+    # runtimes (an Ultralytics model, an OpenVINO compiled model's implicit
+    # infer request) are not, and callers are serialized.
+    thread_safe = False
+
+    def __init__(self, model_path, conf=0.4, imgsz=640, threads=0):
+        self.model_path = model_path
+        self.conf = conf  # minimum confidence of a detection
+        self.imgsz = imgsz  # square model input size in pixels
+        self.threads = threads  # CPU threads for inference, 0 lets the runtime decide
+
+    def detect(self, frame, imgsz=None):
+        """
+        Returns:
+            numpy.ndarray: (N, 5) detections for one BGR frame
+        """
+        return self.detect_batch([frame], imgsz)[0]
+
+    def detect_batch(self, frames, imgsz=None):
+        """
+        Args:
+            frames (list): BGR frames, shapes may differ
+            imgsz (int, optional): Model input size for this call, e.g.
+                smaller for ROI crops; models exported with a fixed size
+                ignore it
+
+        Returns:
+            List[numpy.ndarray]: (N, 5) detections per frame, in order
+        """
+        raise NotImplementedError
@@ -0,0 +1,55 @@
+# export.py
+"""
+Exports the PyTorch model for the faster CPU backends.
+
+Examples:
+    python -m detectors.export --format onnx --imgsz 640
+    python -m detectors.export --format onnx --int8
+    python -m detectors.export --format openvino --int8
+"""
+import argparse
+import os
+import shutil
+from detectors.backends import default_model_path
+
+
+def export(fmt, imgsz=640, int8=False, source=None):
+    from ultralytics import YOLO
+
+    source = source or default_model_path("torch")
+    model = YOLO(source)
+    target = default_model_path(fmt, int8)
+
+    if fmt == "onnx":
+        # A dynamic batch axis lets the inference worker batch several cameras
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        if int8:
+            # Dynamic quantization needs no calibration data; weights become INT8
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+            return target
+    elif fmt == "openvino":
+        # INT8 uses ultralytics' post-training quantization on its calibration set
+        exported = model.export(format="openvino", imgsz=imgsz, int8=int8)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if os.path.abspath(exported) != os.path.abspath(target):
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        shutil.move(exported, target)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the detector for ONNX Runtime or OpenVINO")
+    parser.add_argument("--format", choices=["onnx", "openvino"], required=True)
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size (default: 640)")
+    parser.add_argument("--int8", action="store_true", help="write a quantized INT8 model")
+    parser.add_argument("--source", help="PyTorch model to export (default: models/yolov8n.pt)")
+    args = parser.parse_args(argv)
+    print(f"Exported {export(args.format, args.imgsz, args.int8, args.source)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# onnx_backend.py
+from detectors.base import Detector
+from detectors.yolo_common import preprocess, postprocess
+from utils import startup_profiler
+
+
+class OnnxDetector(Detector):
+    """An exported YOLOv8 ONNX graph (FP32 or INT8) on ONNX Runtime's CPU provider."""
+
+    name = "onnx"
+
+    def __init__(self, model_path, conf=0.4, imgsz=640, threads=0):
+        super().__init__(model_path, conf, imgsz, threads)
+        with startup_profiler.phase("import onnxruntime"):
+            import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        with startup_profiler.phase("load model"):
+            self.session = ort.InferenceSession(model_path, sess_options=options,
+                                                providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Exports with a fixed batch of 1 have to be run frame by frame
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.fixed_size = isinstance(model_input.shape[2], int)
+        if self.fixed_size:
+            self.imgsz = model_input.shape[2]  # static graphs only accept their export size
+
+    def detect_batch(self, frames, imgsz=None):
+        if not frames:
+            return []
+        size = self.imgsz if self.fixed_size or not imgsz else imgsz
+        if self.dynamic_batch:
+            return self._run(frames, size)
+        return [self._run([frame], size)[0] for frame in frames]
+
+    def _run(self, frames, size):
+        blob, transforms = preprocess(frames, size)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return [postprocess(prediction, ratio, pad, frame.shape, self.conf)
+                for prediction, (ratio, pad), frame in zip(output, transforms, frames)]
@@ -0,0 +1,51 @@
+# openvino_backend.py
+import os
+from detectors.base import Detector
+from detectors.yolo_common import preprocess, postprocess
+from utils import startup_profiler
+
+
+class OpenVINODetector(Detector):
+    """An exported YOLOv8 OpenVINO IR (FP32/FP16 or INT8) on the CPU plugin."""
+
+    name = "openvino"
+
+    def __init__(self, model_path, conf=0.4, imgsz=640, threads=0):
+        super().__init__(model_path, conf, imgsz, threads)
+        with startup_profiler.phase("import openvino"):
+            import openvino as ov
+
+        # ultralytics exports a directory holding <name>.xml and <name>.bin
+        if os.path.isdir(model_path):
+            xml_files = [f for f in os.listdir(model_path) if f.endswith(".xml")]
+            if not xml_files:
+                raise FileNotFoundError(f"No OpenVINO .xml model in {model_path}")
+            model_path = os.path.join(model_path, xml_files[0])
+
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        with startup_profiler.phase("load model"):
+            model = core.read_model(model_path)
+            self.dynamic_batch = model.inputs[0].get_partial_shape()[0].is_dynamic
+            spatial = model.inputs[0].get_partial_shape()[2]
+            self.fixed_size = spatial.is_static
+            if self.fixed_size:
+                self.imgsz = spatial.get_length()
+            self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.output(0)
+
+    def detect_batch(self, frames, imgsz=None):
+        if not frames:
+            return []
+        size = self.imgsz if self.fixed_size or not imgsz else imgsz
+        if self.dynamic_batch:
+            return self._run(frames, size)
+        return [self._run([frame], size)[0] for frame in frames]
+
+    def _run(self, frames, size):
+        blob, transforms = preprocess(frames, size)
+        output = self.compiled(blob)[self.output]
+        return [postprocess(prediction, ratio, pad, frame.shape, self.conf)
+                for prediction, (ratio, pad), frame in zip(output, transforms, frames)]
@@ -0,0 +1,274 @@
+# process_pool.py
+import collections
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from detectors.base import Detector, empty_detections
+from detectors.backends import create_detector
+
+MAX_RETRIES = 1  # a frame that crashed a worker is tried once more, then skipped
+MAX_RESTART_DELAY = 60.0  # seconds; restarts of a crash-looping worker back off up to this
+
+
+def _worker_main(factory, options, tasks, results):
+    """
+    Entry point of a worker process: builds its own detector, then runs it
+    on frames read straight from shared memory until told to stop.
+    """
+    try:
+        detector = factory(**options)
+    except Exception as e:
+        results.put((None, None, f"could not create detector: {e}"))
+        return
+
+    attached = {}  # slot name -> SharedMemory
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, name, shape, imgsz = task
+        try:
+            shm = attached.get(name)
+            if shm is None:
+                if len(attached) > 64:  # slots were reallocated; drop stale mappings
+                    for old in attached.values():
+                        old.close()
+                    attached.clear()
+                # Workers share the parent's resource tracker, so attaching
+                # here does not make the segment outlive the parent's unlink
+                shm = attached[name] = shared_memory.SharedMemory(name=name)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            detections = detector.detect(frame, imgsz)
+            del frame  # release the buffer export before the slot may be closed
+            results.put((task_id, np.ascontiguousarray(detections, dtype=np.float32), None))
+        except Exception as e:
+            results.put((task_id, None, str(e)))
+    for shm in attached.values():
+        shm.close()
+
+
+class _Slot:
+    """A shared memory block a frame is copied into for one worker task."""
+
+    def __init__(self):
+        self.shm = None
+
+    def store(self, frame):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.shm is None or self.shm.size < frame.nbytes:
+            self.release()
+            self.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)[...] = frame
+        return self.shm.name, frame.shape
+
+    def release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class _Task:
+    def __init__(self, task_id, slot, message):
+        self.id = task_id
+        self.slot = slot
+        self.message = message  # (task_id, slot name, shape, imgsz), all a worker receives
+        self.worker = None
+        self.retries = 0
+        self.done = threading.Event()
+        self.result = None
+
+
+class ProcessPoolDetector(Detector):
+    """
+    Runs a detector backend in a pool of worker processes.
+
+    Each worker process loads its own copy of the model, so inference scales
+    across cores instead of being bound by one interpreter's GIL. Frames are
+    copied into shared memory ring slots and only the slot name and shape
+    travel through the task queue; workers send back just the small (N, 5)
+    detection arrays. A worker that dies is restarted and its in-flight
+    frames are handed to the replacement.
+    """
+
+    name = "process-pool"
+    thread_safe = True  # each call gets its own slots and tasks
+
+    def __init__(self, processes, factory=create_detector, slots_per_process=2, **options):
+        """
+        Args:
+            processes (int): Number of worker processes
+            factory (callable): Builds the detector inside each worker; must
+                be importable by the worker (a module-level function)
+            slots_per_process (int): Frames that can be queued per worker
+            **options: Passed to factory, e.g. backend, model_path, threads
+        """
+        super().__init__(options.get("model_path"), options.get("conf", 0.4),
+                         options.get("imgsz", 640), options.get("threads", 0))
+        self.processes = max(1, processes)
+        self.factory = factory
+        self.options = options
+        # spawn: the parent runs Qt/torch threads, which fork would copy in a broken state
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._workers = [None] * self.processes  # (process, task queue)
+        self._inflight = [dict() for _ in range(self.processes)]  # per worker: task id -> _Task
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._restart_delay = [0.0] * self.processes  # grows while a worker keeps dying
+        self._restart_at = [0.0] * self.processes
+        self.restarts = 0
+
+        self._free_slots = queue.Queue()
+        self._slots = [_Slot() for _ in range(self.processes * max(1, slots_per_process))]
+        for slot in self._slots:
+            self._free_slots.put(slot)
+
+        for index in range(self.processes):
+            self._start_worker(index)
+        self._collector = threading.Thread(target=self._collect, name="detector-pool", daemon=True)
+        self._collector.start()
+
+    def _start_worker(self, index):
+        tasks = self._context.Queue()
+        process = self._context.Process(target=_worker_main, name=f"detector-{index}",
+                                        args=(self.factory, self.options, tasks, self._results),
+                                        daemon=True)
+        process.start()
+        self._workers[index] = (process, tasks)
+
+    def detect_batch(self, frames, imgsz=None):
+        if not frames:
+            return []
+        results = []
+        pending = collections.deque()
+        for frame in frames:
+            # Batches can be larger than the ring: collect our own earlier
+            # frames to free a slot, and only block on the ring while holding
+            # none, so concurrent callers cannot starve each other either
+            while True:
+                try:
+                    slot = self._free_slots.get_nowait()
+                    break
+                except queue.Empty:
+                    if not pending:
+                        slot = self._free_slots.get()
+                        break
+                    results.append(self._wait(pending.popleft()))
+            pending.append(self._submit(slot, frame, imgsz))
+        results.extend(self._wait(task) for task in pending)
+        return results
+
+    def _submit(self, slot, frame, imgsz=None):
+        name, shape = slot.store(frame)
+        task_id = next(self._ids)
+        task = _Task(task_id, slot, (task_id, name, shape, imgsz))
+        with self._lock:
+            # Least-loaded worker, so one slow frame does not hold up the others
+            index = min(range(self.processes), key=lambda i: len(self._inflight[i]))
+            self._dispatch(task, index)
+        return task
+
+    def _dispatch(self, task, index):
+        task.worker = index
+        self._inflight[index][task.id] = task
+        self._workers[index][1].put(task.message)
+
+    def _wait(self, task):
+        while not task.done.wait(0.5):
+            if self._closed:
+                self._free_slots.put(task.slot)
+                return empty_detections()
+        self._free_slots.put(task.slot)
+        return task.result
+
+    def _finish(self, task, detections):
+        task.result = detections
+        task.done.set()
+
+    def _collect(self):
+        """Routes results to their tasks and restarts dead workers."""
+        while not self._closed:
+            try:
+                task_id, detections, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            except (EOFError, OSError):
+                return
+
+            if task_id is None:
+                print(f"Error: detector worker failed: {error}")
+                continue
+            with self._lock:
+                task = None
+                for inflight in self._inflight:
+                    task = inflight.pop(task_id, None)
+                    if task:
+                        break
+            if task is None:
+                continue  # answered by a worker that was already replaced
+            self._restart_delay[task.worker] = 0.0  # the worker is healthy
+            if error:
+                print(f"Error: detection failed in worker {task.worker}: {error}")
+                detections = empty_detections()
+            self._finish(task, detections)
+            self._check_workers()
+
+    def _check_workers(self):
+        with self._lock:
+            if self._closed:
+                return
+            now = time.monotonic()
+            for index, (process, _) in enumerate(self._workers):
+                if process.is_alive():
+                    continue
+                if not self._restart_at[index]:
+                    delay = self._restart_delay[index]
+                    print(f"Error: detector worker {index} exited with code {process.exitcode}, "
+                          f"restarting in {delay:.0f} s")
+                    self._restart_at[index] = now + delay
+                    self._restart_delay[index] = min(MAX_RESTART_DELAY, max(1.0, 2 * delay))
+                if now < self._restart_at[index]:
+                    continue
+                self._restart_at[index] = 0.0
+                self.restarts += 1
+                orphans = list(self._inflight[index].values())
+                self._inflight[index].clear()
+                self._start_worker(index)
+                for task in orphans:
+                    if task.retries >= MAX_RETRIES:
+                        print(f"Error: skipping a frame that crashed detector workers {task.retries + 1} times")
+                        self._finish(task, empty_detections())
+                        continue
+                    task.retries += 1
+                    self._dispatch(task, index)
+
+    def close(self):
+        """Stops the workers and frees the shared memory."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for process, tasks in workers:
+            tasks.put(None)
+        for process, _ in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._collector.join()
+        for slot in self._slots:
+            slot.release()
+
+
+def default_threads(processes):
+    """
+    Returns:
+        int: CPU threads per worker so the pool does not oversubscribe the cores
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, processes))
@@ -0,0 +1,36 @@
+# torch_backend.py
+import numpy as np
+from detectors.base import Detector, empty_detections
+from utils import startup_profiler
+
+
+class TorchDetector(Detector):
+    """The ultralytics PyTorch model, run eagerly."""
+
+    name = "torch"
+
+    def __init__(self, model_path, conf=0.4, imgsz=640, threads=0):
+        super().__init__(model_path, conf, imgsz, threads)
+        with startup_profiler.phase("import ultralytics"):
+            import torch
+            from ultralytics import YOLO
+        if threads:
+            torch.set_num_threads(threads)
+        with startup_profiler.phase("load model"):
+            self.model = YOLO(model_path)
+
+    def detect_batch(self, frames, imgsz=None):
+        if not frames:
+            return []
+        # Detect only 'person' class (class ID 0 in COCO)
+        results = self.model.predict(source=list(frames), conf=self.conf, classes=[0],
+                                     imgsz=imgsz or self.imgsz, verbose=False)
+        return [self._array_from_result(result) for result in results]
+
+    @staticmethod
+    def _array_from_result(result):
+        # boxes.data rows are (x1, y1, x2, y2, conf, cls); keep the first five
+        data = result.boxes.data
+        if len(data) == 0:
+            return empty_detections()
+        return np.ascontiguousarray(data[:, :5].cpu().numpy(), dtype=np.float32)
@@ -0,0 +1,86 @@
+# yolo_common.py
+# Pre/post-processing shared by the backends that run an exported YOLOv8
+# graph directly (ONNX Runtime, OpenVINO), matching what ultralytics does.
+import cv2
+import numpy as np
+from detectors.base import empty_detections
+
+PERSON_CLASS = 0
+NMS_IOU = 0.45
+
+
+def letterbox(frame, size):
+    """
+    Resizes a frame to fit a size x size square, keeping aspect ratio and
+    padding with gray.
+
+    Returns:
+        tuple: (padded image, scale ratio, (pad_left, pad_top))
+    """
+    h, w = frame.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_w, pad_h = size - new_w, size - new_h
+    left, top = pad_w // 2, pad_h // 2
+    padded = cv2.copyMakeBorder(frame, top, pad_h - top, left, pad_w - left,
+                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return padded, ratio, (left, top)
+
+
+def preprocess(frames, size):
+    """
+    Letterboxes frames into one NCHW float32 RGB blob scaled to 0..1.
+
+    Returns:
+        tuple: (blob, [(ratio, pad), ...] per frame)
+    """
+    images, transforms = [], []
+    for frame in frames:
+        padded, ratio, pad = letterbox(frame, size)
+        images.append(padded)
+        transforms.append((ratio, pad))
+    blob = cv2.dnn.blobFromImages(images, scalefactor=1 / 255.0, swapRB=True)
+    return blob, transforms
+
+
+def postprocess(prediction, ratio, pad, frame_shape, conf):
+    """
+    Decodes one image's raw YOLOv8 output into person detections.
+
+    Args:
+        prediction (numpy.ndarray): (4 + classes, anchors) raw output
+        ratio (float), pad (tuple): Letterbox transform of the frame
+        frame_shape (tuple): Shape of the original frame
+        conf (float): Minimum confidence
+
+    Returns:
+        numpy.ndarray: (N, 5) detections in original frame pixels
+    """
+    if prediction.shape[0] > prediction.shape[1]:
+        prediction = prediction.T  # some exports emit (anchors, 4 + classes)
+
+    scores = prediction[4 + PERSON_CLASS]
+    keep = scores >= conf
+    if not keep.any():
+        return empty_detections()
+    cx, cy, w, h = prediction[:4, keep]
+    scores = scores[keep]
+
+    boxes_xywh = np.stack((cx - w / 2, cy - h / 2, w, h), axis=1)
+    indices = cv2.dnn.NMSBoxes(boxes_xywh.tolist(), scores.tolist(), conf, NMS_IOU)
+    if len(indices) == 0:
+        return empty_detections()
+    indices = np.asarray(indices).reshape(-1)
+
+    left, top = pad
+    height, width = frame_shape[:2]
+    boxes = boxes_xywh[indices]
+    x1 = np.clip((boxes[:, 0] - left) / ratio, 0, width)
+    y1 = np.clip((boxes[:, 1] - top) / ratio, 0, height)
+    x2 = np.clip((boxes[:, 0] + boxes[:, 2] - left) / ratio, 0, width)
+    y2 = np.clip((boxes[:, 1] + boxes[:, 3] - top) / ratio, 0, height)
+    return np.ascontiguousarray(
+        np.stack((x1, y1, x2, y2, scores[indices]), axis=1), dtype=np.float32
+    )
@@ -1,32 +1,136 @@
 # yolo_detector.py
-from ultralytics import YOLO
-import cv2
+import threading
+from contextlib import nullcontext
 import numpy as np
-import os
+from detectors.backends import create_detector
+from utils.metrics import get_metrics
+from config import settings
 
-# Load the model once at module level
-MODEL_PATH = os.path.join("models", "yolov8n.pt")  # Ensure this model is present
-model = YOLO(MODEL_PATH)
+# The detector (and its runtime, e.g. torch) is created on first use, so
+# importing this module stays cheap
+_detector = None
+_detector_lock = threading.Lock()
+_inference_lock = threading.Lock()  # one call at a time into detectors that are not thread-safe
+_overrides = {}
 
-# Detect only 'person' class (class ID 0 in COCO)
-def detect_humans(frame):
+def configure_detector(**options):
+    """
+    Overrides config.settings for the detector before it is created.
+
+    Args:
+        **options: backend, model_path, conf, imgsz, threads, int8, processes
+    """
+    global _detector
+    with _detector_lock:
+        _overrides.update({k: v for k, v in options.items() if v is not None})
+        if _detector is not None and hasattr(_detector, "close"):
+            _detector.close()
+        _detector = None
+
+def get_detector():
+    """
+    Returns the configured detector, creating it on first call (thread-safe).
+    """
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                options = {
+                    "backend": settings.DETECTOR_BACKEND,
+                    "model_path": settings.DETECTOR_MODEL_PATH,
+                    "conf": settings.DETECTOR_CONFIDENCE,
+                    "imgsz": settings.DETECTOR_INPUT_SIZE,
+                    "threads": settings.DETECTOR_THREADS,
+                    "int8": settings.DETECTOR_INT8,
+                    "processes": settings.DETECTOR_PROCESSES,
+                }
+                options.update(_overrides)
+                processes = options.pop("processes")
+                if processes:
+                    # Imported here so the multiprocessing machinery only
+                    # loads when a pool is configured
+                    from detectors.process_pool import ProcessPoolDetector, default_threads
+                    options["threads"] = options["threads"] or default_threads(processes)
+                    _detector = ProcessPoolDetector(processes, **options)
+                else:
+                    _detector = create_detector(**options)
+    return _detector
+
+def close_detector():
     """
-    Runs YOLOv8 on the given frame and returns a list of person detections.
+    Shuts down worker processes of a process-pool detector, if one was started.
+    """
+    global _detector
+    with _detector_lock:
+        detector, _detector = _detector, None
+    if detector is not None and hasattr(detector, "close"):
+        detector.close()
+
+def warmup():
+    """
+    Creates the detector and runs one dummy inference so the first real frame
+    does not pay for lazy initialization inside the runtime.
+    """
+    from utils import startup_profiler
+    detector = get_detector()
+    with startup_profiler.phase("model warm-up"):
+        detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+def _serialized(detector):
+    return nullcontext() if detector.thread_safe else _inference_lock
+
+def detect_humans_array(frame, imgsz=None):
+    """
+    Runs the detector on the given frame and returns person detections as an array.
+
+    Args:
+        frame (numpy.ndarray): BGR frame (or ROI crop)
+        imgsz (int, optional): Model input size, defaults to the configured one
 
     Returns:
-        List[Dict]: [{ "box": (x1, y1, x2, y2), "confidence": 0.85 }, ...]
+        numpy.ndarray: (N, 5) float32 array of rows (x1, y1, x2, y2, confidence)
+    """
+    detector = get_detector()
+    metrics = get_metrics()
+    with _serialized(detector), metrics.timer("detect"):
+        detections = detector.detect(frame, imgsz)
+    metrics.inc("inferences")
+    return detections
+
+def detect_humans_array_batch(frames, imgsz=None):
     """
-    results = model.predict(source=frame, conf=0.4, classes=[0], verbose=False)
+    Runs the detector once on a batch of frames (e.g. one per camera).
+
+    Args:
+        frames (list): Frames to run the model on, shapes may differ
+        imgsz (int, optional): Model input size, defaults to the configured one
 
-    boxes = []
-    if results:
-        for result in results:
-            for box in result.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                confidence = float(box.conf[0].item())
-                boxes.append({
-                    "box": (x1, y1, x2, y2),
-                    "confidence": confidence
-                })
+    Returns:
+        List[numpy.ndarray]: (N, 5) detections per frame, in the order of `frames`
+    """
+    if not frames:
+        return []
+    detector = get_detector()
+    metrics = get_metrics()
+    with _serialized(detector), metrics.timer("detect"):
+        results = detector.detect_batch(list(frames), imgsz)
+    metrics.inc("inferences", len(results))
+    return results
 
-    return boxes
+def detections_to_dicts(detections):
+    """
+    Converts an (N, 5) detection array to the list-of-dicts format.
+    """
+    return [
+        {"box": (int(x1), int(y1), int(x2), int(y2)), "confidence": float(conf)}
+        for x1, y1, x2, y2, conf in detections.tolist()
+    ]
+
+def detect_humans(frame):
+    """
+    Runs the detector on the given frame and returns a list of person detections.
+
+    Returns:
+        List[Dict]: [{ "box": (x1, y1, x2, y2), "confidence": 0.85 }, ...]
+    """
+    return detections_to_dicts(detect_humans_array(frame))
@@ -1,10 +1,99 @@
 # alert_popup.py
-from PyQt5.QtWidgets import QMessageBox
-
-def show_alert_popup(title, message):
-    msg = QMessageBox()
-    msg.setIcon(QMessageBox.Warning)
-    msg.setWindowTitle(title)
-    msg.setText(message)
-    msg.setStandardButtons(QMessageBox.Ok)
-    msg.exec_()
+from PyQt5.QtWidgets import QFrame, QLabel, QPushButton, QHBoxLayout, QVBoxLayout
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from config.settings import ALERT_NOTIFICATION_TIMEOUT
+
+
+class AlertBridge(QObject):
+    """Forwards notifications from the dispatcher thread to the GUI thread."""
+
+    notified = pyqtSignal(object)  # Notification
+
+
+class AlertNotification(QFrame):
+    """
+    Non-modal alert banner shown in the corner of its parent window.
+
+    Unlike a QMessageBox it runs no event loop of its own, so video and
+    detection keep running while it is visible. Repeated alerts of the same
+    burst update the banner's count instead of stacking new windows; it hides
+    itself once the burst has been quiet for `timeout` seconds.
+    """
+
+    dismissed = pyqtSignal()
+
+    def __init__(self, parent, timeout=ALERT_NOTIFICATION_TIMEOUT):
+        super().__init__(parent)
+        self.setObjectName("alertNotification")
+        self.setStyleSheet("""
+            QFrame#alertNotification {
+                background-color: #c62828;
+                border-radius: 8px;
+            }
+            QLabel {
+                color: white;
+                background: transparent;
+            }
+            QPushButton {
+                background-color: rgba(255, 255, 255, 0.2);
+                color: white;
+                padding: 4px 12px;
+                min-width: 0;
+            }
+        """)
+        self.title_label = QLabel()
+        self.title_label.setStyleSheet("font-weight: bold; font-size: 15px;")
+        self.detail_label = QLabel()
+
+        dismiss_button = QPushButton("Dismiss")
+        dismiss_button.clicked.connect(self.dismiss)
+
+        text_layout = QVBoxLayout()
+        text_layout.addWidget(self.title_label)
+        text_layout.addWidget(self.detail_label)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(16, 10, 12, 10)
+        layout.addLayout(text_layout, 1)
+        layout.addWidget(dismiss_button)
+        self.setLayout(layout)
+
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.timeout.connect(self.hide)
+        self.timeout = timeout
+        self.hide()
+
+    def show_notification(self, notification):
+        """
+        Shows a new burst or updates the count of the one on screen.
+
+        Args:
+            notification (Notification): From the alert dispatcher
+        """
+        if notification.count > 1:
+            self.title_label.setText(f"ALERT! {notification.count} intrusions")
+        else:
+            self.title_label.setText("ALERT! Human entered restricted area!")
+        where = ", ".join(c for c in notification.cameras if c)
+        if notification.zones:
+            where += (" - " if where else "") + ", ".join(notification.zones)
+        self.detail_label.setText(where)
+
+        self.adjustSize()
+        self.reposition()
+        self.show()
+        self.raise_()
+        self.hide_timer.start(int(self.timeout * 1000))
+
+    def reposition(self):
+        """Keeps the banner in the parent's top-right corner."""
+        parent = self.parentWidget()
+        if parent is not None:
+            menu = parent.menuWidget() if hasattr(parent, "menuWidget") else None
+            top = (menu.height() if menu is not None else 0) + 12
+            self.move(parent.width() - self.width() - 20, top)
+
+    def dismiss(self):
+        self.hide_timer.stop()
+        self.hide()
+        self.dismissed.emit()
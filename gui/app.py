@@ -1,23 +1,25 @@
 # app.py
-from PyQt5.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, 
-                            QWidget, QLabel, QSizePolicy, QAction, QMenuBar, QMessageBox, QFileDialog)
+from PyQt5.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, QGridLayout,
+                            QWidget, QLabel, QSizePolicy, QAction, QMenuBar, QMessageBox, QFileDialog,
+                            QProgressDialog)
 from gui.camera_widget import CameraWidget
-from PyQt5.QtCore import Qt, QUrl
-import os
-from utils.logger import IMAGES_DIR
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
-
-class CustomWebPage(QWebEnginePage):
-    def __init__(self, parent, main_window):
-        super().__init__(parent)
-        self.main_window = main_window
-
-    def acceptNavigationRequest(self, url, _type, isMainFrame):
-        if url.scheme() == 'download':
-            self.main_window.download_data(IMAGES_DIR)
-            return False
-        return super().acceptNavigationRequest(url, _type, isMainFrame)
-    
+from gui.workers import InferenceWorker, ExportWorker
+from gui.export_dialog import ExportDialog
+from gui.roi_selector import save_zones_dialog, load_zones_dialog
+from gui.alert_popup import AlertBridge, AlertNotification
+from gui.log_viewer import LogViewer
+from PyQt5.QtCore import Qt, QTimer
+import math
+from datetime import datetime
+from config.settings import CAMERA_SOURCES, METRICS_OVERLAY, OCCUPANCY_ENABLED, OCCUPANCY_OVERLAY
+from utils.event_store import get_event_store
+from utils.snapshot_writer import get_snapshot_writer, close_snapshot_writer
+from utils.metrics import get_metrics, MetricsExporter
+from utils.alert import get_alert_dispatcher, stop_alert_sound
+from utils.occupancy import close_occupancy
+from utils.mjpeg_server import MjpegServer
+from detectors.yolo_detector import close_detector
+
 class MainApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -53,14 +55,33 @@ class MainApp(QMainWindow):
         }
         """)
 
-        self.camera_widget = CameraWidget()
-        self.camera_widget.setSizePolicy(
-            QSizePolicy.Expanding, 
-            QSizePolicy.Expanding
-        )
-        self.camera_widget.setMinimumSize(640, 480)
+        # One inference thread batches the frames of all cameras
+        self.inference_worker = InferenceWorker()
+        self.inference_worker.start()
+
+        # One tile per camera, laid out in a near-square grid
+        self.camera_widgets = []
+        camera_grid = QGridLayout()
+        camera_grid.setContentsMargins(0, 0, 0, 0)
+        camera_grid.setSpacing(10)
+        columns = math.ceil(math.sqrt(len(CAMERA_SOURCES)))
+        for i, source in enumerate(CAMERA_SOURCES):
+            title = f"Camera {i + 1}" if len(CAMERA_SOURCES) > 1 else "Video Feed"
+            camera_widget = CameraWidget(self.inference_worker, source=source, title=title)
+            camera_widget.setSizePolicy(
+                QSizePolicy.Expanding, 
+                QSizePolicy.Expanding
+            )
+            camera_grid.addWidget(camera_widget, i // columns, i % columns)
+            self.camera_widgets.append(camera_widget)
+
+        camera_container = QWidget()
+        camera_container.setLayout(camera_grid)
+        camera_container.setMinimumSize(640, 480)
         
         self.draw_menu = None
+        self.export_worker = None
+        self.log_window = None
         self.menubar = self.menuBar()
         self.menubar.setStyleSheet("""
             QMenuBar {
@@ -115,13 +136,13 @@ class MainApp(QMainWindow):
         button_container.setLayout(button_layout)
 
         start_button.clicked.connect(self.on_start_detection)
-        stop_button.clicked.connect(self.camera_widget.stop)
+        stop_button.clicked.connect(self.on_stop_detection)
 
         # Main layout with margins
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
-        layout.addWidget(self.camera_widget, stretch=1)
+        layout.addWidget(camera_container, stretch=1)
         layout.addWidget(button_container)
 
         container = QWidget()
@@ -130,11 +151,71 @@ class MainApp(QMainWindow):
         
         self.create_menu()
 
+        # Snapshot writer health in the status bar
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.update_status)
+        self.status_timer.start(2000)
+
+        # Periodic metrics file / localhost endpoint, if configured
+        self.metrics_exporter = MetricsExporter(get_metrics()).start()
+
+        # Annotated live views for viewers on other machines, if configured
+        self.mjpeg_server = MjpegServer()
+        for camera_widget in self.camera_widgets:
+            self.mjpeg_server.add_stream(camera_widget.title, camera_widget.stream_frame)
+        self.mjpeg_server.start()
+
+        # Alerts arrive from the dispatcher thread and show as a non-modal banner
+        self.alert_notification = AlertNotification(self)
+        self.alert_notification.dismissed.connect(stop_alert_sound)
+        self.alert_bridge = AlertBridge(self)
+        self.alert_bridge.notified.connect(self.alert_notification.show_notification)
+        get_alert_dispatcher().add_listener(self.alert_bridge.notified.emit)
+
+    def update_status(self):
+        stats = get_snapshot_writer().stats()
+        message = (f"Snapshots: {stats['written']} written, {stats['queue_depth']} queued, "
+                   f"{stats['dropped']} dropped, encode {stats['encode_ms_avg']:.1f} ms avg")
+        metrics = get_metrics()
+        gate = {name: sum(metrics.counter(f"motion_gate_{name}", camera_widget.title)
+                          for camera_widget in self.camera_widgets)
+                for name in ("hits", "keepalives", "skips")}
+        total = sum(gate.values())
+        if total:
+            message += (f"  |  Motion gate: {gate['hits']} motion, {gate['keepalives']} keep-alive, "
+                        f"{gate['skips']} skipped ({100 * gate['skips'] / total:.0f}%)")
+        self.statusBar().showMessage(message)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.alert_notification.reposition()
+
+    def closeEvent(self, event):
+        if self.log_window is not None:
+            self.log_window.close()
+        self.mjpeg_server.stop()
+        for camera_widget in self.camera_widgets:
+            camera_widget.shutdown()
+        self.inference_worker.stop()
+        close_detector()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+        close_snapshot_writer()
+        close_occupancy()
+        self.metrics_exporter.stop()
+        stop_alert_sound()
+        super().closeEvent(event)
+
     def create_menu(self):
 
         # File menu
         file_menu = self.menubar.addMenu("File")
 
+        download_action = QAction("Download Intrusion Data...", self)
+        download_action.triggered.connect(lambda: self.download_data())
+        file_menu.addAction(download_action)
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -145,6 +226,17 @@ class MainApp(QMainWindow):
         log_action.triggered.connect(self.show_intruders_log)
         view_menu.addAction(log_action)
 
+        overlay_action = QAction("Performance Overlay", self, checkable=True)
+        overlay_action.setChecked(METRICS_OVERLAY)
+        overlay_action.toggled.connect(self.set_performance_overlay)
+        view_menu.addAction(overlay_action)
+
+        heatmap_action = QAction("Occupancy Heatmap", self, checkable=True)
+        heatmap_action.setChecked(OCCUPANCY_OVERLAY)
+        heatmap_action.setEnabled(OCCUPANCY_ENABLED)
+        heatmap_action.toggled.connect(self.set_occupancy_heatmap)
+        view_menu.addAction(heatmap_action)
+
         # Help menu
         help_menu = self.menubar.addMenu("Help")
 
@@ -152,135 +244,137 @@ class MainApp(QMainWindow):
         about_action.triggered.connect(self.show_about_dialog)
         help_menu.addAction(about_action)
         
+    def set_performance_overlay(self, enabled):
+        for camera_widget in self.camera_widgets:
+            camera_widget.set_overlay(enabled)
+
+    def set_occupancy_heatmap(self, enabled):
+        for camera_widget in self.camera_widgets:
+            camera_widget.set_heatmap(enabled)
+
     def add_draw_menu(self):
         if not self.draw_menu:
             self.draw_menu = self.menubar.addMenu("Draw")
-            draw_action = QAction("Draw ROI", self)
-            draw_action.triggered.connect(self.camera_widget.enable_drawing)
-            self.draw_menu.addAction(draw_action)
+            for i, camera_widget in enumerate(self.camera_widgets):
+                if len(self.camera_widgets) == 1:
+                    menu = self.draw_menu
+                else:
+                    menu = self.draw_menu.addMenu(f"Camera {i + 1}")
+
+                draw_action = QAction("Draw ROI", self)
+                draw_action.triggered.connect(camera_widget.enable_drawing)
+                menu.addAction(draw_action)
+
+                polygon_action = QAction("Draw Polygon Zone", self)
+                polygon_action.triggered.connect(camera_widget.enable_polygon_drawing)
+                menu.addAction(polygon_action)
+
+                menu.addSeparator()
+
+                clear_action = QAction("Clear Zones", self)
+                clear_action.triggered.connect(camera_widget.clear_zones)
+                menu.addAction(clear_action)
+
+                save_action = QAction("Save Zones...", self)
+                save_action.triggered.connect(
+                    lambda _, w=camera_widget: save_zones_dialog(self, w.zones))
+                menu.addAction(save_action)
+
+                load_action = QAction("Load Zones...", self)
+                load_action.triggered.connect(
+                    lambda _, w=camera_widget: self.load_zones_into(w))
+                menu.addAction(load_action)
+
+    def load_zones_into(self, camera_widget):
+        zone_set = load_zones_dialog(self)
+        if zone_set is not None:
+            camera_widget.set_zones(zone_set.zones)
 
     def on_start_detection(self):
-        self.camera_widget.start()
+        for camera_widget in self.camera_widgets:
+            camera_widget.start()
         self.add_draw_menu()
+
+    def on_stop_detection(self):
+        for camera_widget in self.camera_widgets:
+            camera_widget.stop()
         
     def show_intruders_log(self):
         try:
-            log_path = os.path.join("logs", "alert_log.html")
-            if os.path.exists(log_path):
-                self.log_window = QWidget()
-                self.log_window.setWindowTitle("Intruders Log")
-                self.log_window.setGeometry(200, 200, 1000, 700)
+            if get_event_store().count() > 0:
+                if self.log_window is not None:
+                    self.log_window.close()
+                self.log_window = LogViewer(self)
                 self.log_window.setStyleSheet("""
                     QWidget {
                         background-color: #f0f2f5;
                     }
+                    QTableView {
+                        background-color: white;
+                    }
                 """)
-
-                # Create web view with custom page
-                web_view = QWebEngineView()
-                custom_page = CustomWebPage(web_view, self)
-                web_view.setPage(custom_page)
-                web_view.setUrl(QUrl.fromLocalFile(os.path.abspath(log_path)))
-
-                # Add padding around the web view
-                layout = QVBoxLayout()
-                layout.setContentsMargins(20, 20, 20, 20)
-                layout.addWidget(web_view)
-                self.log_window.setLayout(layout)
                 self.log_window.show()
             else:
                 QMessageBox.information(self, "Intruders Log", "No intrusions detected yet.")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Could not open log: {str(e)}")
-            
-    def handle_url_change(self, url):
-        if url.toString().startswith('download://'):
-            self.download_data(IMAGES_DIR)
-            
-    def handle_download(self, download):
-        """Handle downloads from the WebEngine"""
-        download.accept()
-
-    def download_data(self, images_dir):
-        """Downloads all intrusion data including CSV and images"""
-        try:
-            import shutil
-            import tempfile
-            import csv
-            from datetime import datetime
-            from bs4 import BeautifulSoup
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            zip_name = f"intrusion_data_{timestamp}.zip"
-            
-            with tempfile.TemporaryDirectory() as temp_dir:
-                export_dir = os.path.join(temp_dir, "intrusion_data")
-                os.makedirs(export_dir)
-                
-                # Create CSV from HTML table
-                log_path = os.path.join("logs", "alert_log.html")
-                csv_path = os.path.join(export_dir, "intrusion_log.csv")
-                
-                with open(log_path, 'r', encoding='utf-8') as f:
-                    soup = BeautifulSoup(f.read(), 'html.parser')
-                    table = soup.find('table')
-                    
-                    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile)
-                        
-                        # Write header
-                        header_row = table.find('tr')
-                        headers = [th.text.strip() for th in header_row.find_all('th')]
-                        headers[-1] = 'Image File'  # Change last header from 'Evidence' to 'Image File'
-                        writer.writerow(headers)
-                        
-                        # Write data rows
-                        for row in table.find_all('tr')[1:]:  # Skip header row
-                            cols = row.find_all('td')
-                            if cols:  # If row has data
-                                # Get text from first 4 columns
-                                row_data = [col.text.strip() for col in cols[:-1]]
-                                
-                                # Get image filename from the img tag if it exists
-                                img_tag = cols[-1].find('img')
-                                if img_tag and 'src' in img_tag.attrs:
-                                    img_filename = os.path.basename(img_tag['src'])
-                                    row_data.append(img_filename)
-                                else:
-                                    row_data.append('No image')
-                                    
-                                writer.writerow(row_data)
-                    
-                # Copy images
-                images_export_dir = os.path.join(export_dir, "images")
-                if os.path.exists(images_dir):
-                    shutil.copytree(images_dir, images_export_dir)
-                
-                # Create zip file
-                zip_path = os.path.join(temp_dir, zip_name)
-                shutil.make_archive(zip_path[:-4], 'zip', export_dir)
-                
-                # Show save file dialog
-                save_path, _ = QFileDialog.getSaveFileName(
-                    self,
-                    "Save Intrusion Data",
-                    zip_name,
-                    "ZIP Files (*.zip)"
-                )
-                
-                if save_path:
-                    shutil.copy2(zip_path, save_path)
-                    QMessageBox.information(
-                        self, 
-                        "Success", 
-                        "Intrusion data downloaded successfully!\n\n"
-                        "The ZIP file contains:\n"
-                        "- CSV file with intrusion data including image references\n"
-                        "- Folder with captured images"
-                    )
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Could not download data: {str(e)}")
+    def download_data(self):
+        """Exports intrusion data (CSV and images) to a ZIP in the background"""
+        if self.export_worker is not None:
+            QMessageBox.information(self, "Download", "A download is already running.")
+            return
+
+        dialog = ExportDialog(self)
+        if dialog.exec_() != ExportDialog.Accepted:
+            return
+        options = dialog.export_options()
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        zip_name = f"intrusion_data_{timestamp}.zip"
+        save_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Intrusion Data",
+            zip_name,
+            "ZIP Files (*.zip)"
+        )
+        if not save_path:
+            return
+
+        self.export_progress = QProgressDialog("Exporting intrusion data...", "Cancel", 0, 100, self)
+        self.export_progress.setWindowTitle("Download")
+        self.export_progress.setMinimumDuration(500)
+
+        self.export_worker = ExportWorker(save_path, options)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.succeeded.connect(self.on_export_succeeded)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_worker.start()
+
+    def on_export_progress(self, done, total):
+        if total:
+            self.export_progress.setValue(int(100 * done / total))
+
+    def on_export_succeeded(self, result):
+        self.export_progress.reset()
+        QMessageBox.information(
+            self, 
+            "Success", 
+            "Intrusion data downloaded successfully!\n\n"
+            "The ZIP file contains:\n"
+            f"- CSV file with {result.events} intrusion events including image references\n"
+            f"- Folder with {result.images} captured images\n"
+            f"- Folder with {result.clips} event video clips"
+        )
+
+    def on_export_failed(self, message):
+        self.export_progress.reset()
+        QMessageBox.warning(self, "Error", f"Could not download data: {message}")
+
+    def on_export_finished(self):
+        self.export_worker = None
 
     def show_about_dialog(self):
         QMessageBox.information(
@@ -1,36 +1,67 @@
 # camera_widget.py
+import time
+from collections import deque
 import cv2
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QSizePolicy
-from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import QTimer, Qt, QPoint, QEvent
-from detectors.yolo_detector import detect_humans
-from utils.geometry import is_inside_roi
-from utils.alert import trigger_alert
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
+from PyQt5.QtGui import QImage
+from PyQt5.QtCore import Qt, QPoint, QEvent
+from gui.workers import CaptureWorker
+from gui.display_transform import DisplayTransform
+from gui.video_label import VideoLabel
+from utils.frame_slot import LatestFrameSlot
+from utils.intrusion import IntrusionMonitor
+from utils.zones import Zone, ZoneSet
+from utils.alert import get_alert_dispatcher
 from utils.logger import log_event
-from PyQt5 import QtCore
-from time import time
+from utils.metrics import get_metrics
+from utils.clip_recorder import ClipRecorder
+from utils.occupancy import get_occupancy, format_duration
+from utils.annotate import draw_detections
+from config.settings import METRICS_OVERLAY, CLIP_ENABLED, OCCUPANCY_OVERLAY
+
+BGR888 = getattr(QImage, "Format_BGR888", None)  # Qt 5.14+
 
 class CameraWidget(QWidget):
-    def __init__(self):
+    def __init__(self, inference_worker, source=0, title="Video Feed"):
         super().__init__()
         
+        self.source = source
+        self.title = title
         self.cap = None
-        self.timer = QTimer()
+        self.frame_slot = LatestFrameSlot()
+        self.capture_worker = None
+        self.clip_recorder = None  # pre/post-event clips, started with the capture
+        self.inference_worker = inference_worker
+        self.source_index = None  # index of this camera in the shared inference worker
+        self.frame_size = None  # (width, height) of the source frames
+        self.transform = DisplayTransform()  # source <-> label mapping, updated on resize
+        self.last_detections = None  # (detections, inside mask) from the latest inference
+        self.metrics = get_metrics()
+        self.show_overlay = METRICS_OVERLAY  # FPS/latency text on the video
+        self.occupancy = get_occupancy(title)  # heatmap and zone dwell times, None if disabled
+        self.show_heatmap = OCCUPANCY_OVERLAY
+        self._display_times = deque(maxlen=30)  # when recent frames were shown, for FPS
+        self._image = None  # last rendered frame, wrapping _image_buffer
+        self._image_buffer = None
+        self._rendered_key = None  # (seq, display size) of _image
         
-        self.roi = None  # ROI will be set by user
+        self.zones = ZoneSet()  # restricted zones, set by the user or loaded from file
+        self.monitor = IntrusionMonitor(self.zones)
+        self.draw_mode = None  # None, "rect" or "polygon"
         self.drawing = False
-        self.allow_drawing = False
-        self.start_point = None
+        self.start_point = None  # points below are in normalized frame coordinates
         self.end_point = None
+        self.polygon_points = []
         self.detection_enabled = False
-        self.last_alert_time = 0
         
-        self.video_label = QLabel("Video Feed")
+        self.video_label = VideoLabel(title)
+        self.video_label.renderer = self.render_frame
+        self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setSizePolicy(
             QSizePolicy.Expanding,
             QSizePolicy.Expanding
         )
-        self.video_label.setMinimumSize(640, 480)
+        self.video_label.setMinimumSize(320, 240)
         self.video_label.setStyleSheet("""
             QLabel {
                 background-color: black;
@@ -45,132 +76,313 @@ class CameraWidget(QWidget):
         layout.addWidget(self.video_label)
         self.setLayout(layout)
         
-        self.timer.timeout.connect(self.update_frame)
-        
         
 
     def start(self):
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            print("Error: Could not open video capture.")
-            return
+        if self.capture_worker is None:
+            self.cap = cv2.VideoCapture(self.source)
+            if not self.cap.isOpened():
+                print(f"Error: Could not open video capture {self.source}.")
+                return
+            live = isinstance(self.source, int)
+            self.capture_worker = CaptureWorker(self.cap, self.frame_slot, live=live, camera=self.title)
+            self.capture_worker.frame_ready.connect(self.update_frame)
+            self.capture_worker.start()
+            if CLIP_ENABLED and self.clip_recorder is None:
+                self.clip_recorder = ClipRecorder(self.frame_slot, self.title)
+
+        if self.source_index is None:
+            self.inference_worker.detections_ready.connect(self.handle_detections)
+            self.source_index = self.inference_worker.add_source(self.frame_slot, self.zones,
+                                                                camera=self.title)
+        else:
+            self.inference_worker.set_enabled(self.source_index, True)
         self.detection_enabled = True
-        self.timer.start(30)
 
     def stop(self):
         if self.cap:
             self.detection_enabled = False
-            self.roi = None  
             self.drawing = False
-            self.allow_drawing = False
+            self.draw_mode = None
+            self.polygon_points = []
+            self.last_detections = None
+            self.monitor.reset()
+            if self.occupancy:
+                self.occupancy.pause()
+            if self.source_index is not None:
+                self.inference_worker.set_enabled(self.source_index, False)
+
+    def shutdown(self):
+        """Stops the capture thread and releases the capture device."""
+        self.stop()
+        self.frame_slot.close()
+        if self.capture_worker:
+            self.capture_worker.stop()
+            self.capture_worker = None
+        if self.clip_recorder:
+            self.clip_recorder.close()
+            self.clip_recorder = None
+        self.cap = None
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_transform()
+
+    def _update_transform(self):
+        if self.frame_size:
+            label_size = self.video_label.size()
+            self.transform.update(self.frame_size, (label_size.width(), label_size.height()))
             
     def enable_drawing(self):
-        self.allow_drawing = True
+        """Lets the user drag a rectangular zone on the video."""
+        self.draw_mode = "rect"
 
-    def eventFilter(self, source, event):
-        if source is self.video_label and self.allow_drawing:
-            if event.type() in [QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.MouseButtonRelease]:
-                label_size = self.video_label.size()
-                if self.cap:
-                    ret, frame = self.cap.read()
-                    if not ret:
-                        return super().eventFilter(source, event)
-                    frame_height, frame_width = frame.shape[:2]
-                    scale = min(label_size.width() / frame_width, label_size.height() / frame_height)
-                    new_width = int(frame_width * scale)
-                    new_height = int(frame_height * scale)
-                    x_offset = (label_size.width() - new_width) // 2
-                    y_offset = (label_size.height() - new_height) // 2
+    def enable_polygon_drawing(self):
+        """Lets the user click polygon vertices; double or right click closes the zone."""
+        self.draw_mode = "polygon"
+        self.polygon_points = []
+
+    def set_zones(self, zones):
+        """Replaces all zones of this camera."""
+        self.zones.replace(zones)
+        self.monitor.reset()
+
+    def clear_zones(self):
+        self.zones.clear()
+        self.monitor.reset()
 
+    def _add_zone(self, points):
+        zone = Zone(f"Zone {len(self.zones) + 1}", points)
+        try:
+            self.zones.add(zone)
+        except ValueError as e:
+            print(f"Error: {e}")
+
+    def eventFilter(self, source, event):
+        if source is self.video_label and self.draw_mode:
+            if event.type() in [QEvent.MouseButtonPress, QEvent.MouseMove,
+                                QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick]:
+                if self.transform.valid:
                     pos = event.pos()
-                    # Clamp to displayed video area
-                    x = int(max(0, min(new_width - 1, pos.x() - x_offset)))
-                    y = int(max(0, min(new_height - 1, pos.y() - y_offset)))
-
-                    if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
-                        self.drawing = True
-                        self.start_point = (x, y)
-                        self.end_point = self.start_point
-                        return True
-                    elif event.type() == QEvent.MouseMove and self.drawing:
-                        self.end_point = (x, y)
-                        return True
-                    elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
-                        self.drawing = False
-                        x1, y1 = self.start_point
-                        x2, y2 = self.end_point
-                        self.roi = [(min(x1, x2), min(y1, y2)), (max(x1, x2), max(y1, y2))]
-                        self.allow_drawing = False
-                        return True
+                    # Clamp to displayed video area and normalize
+                    x, y = self.transform.label_to_normalized(pos.x(), pos.y())
+
+                    if self.draw_mode == "rect":
+                        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+                            self.drawing = True
+                            self.start_point = (x, y)
+                            self.end_point = self.start_point
+                            return True
+                        elif event.type() == QEvent.MouseMove and self.drawing:
+                            self.end_point = (x, y)
+                            return True
+                        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+                            self.drawing = False
+                            self.draw_mode = None
+                            if self.start_point != self.end_point:
+                                rect = Zone.from_rect("", self.start_point, self.end_point)
+                                self._add_zone(rect.points)
+                            return True
+                    else:
+                        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+                            self.drawing = True
+                            self.polygon_points.append((x, y))
+                            self.end_point = (x, y)
+                            return True
+                        elif event.type() == QEvent.MouseMove and self.drawing:
+                            self.end_point = (x, y)
+                            return True
+                        elif (event.type() == QEvent.MouseButtonDblClick or
+                              (event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton)):
+                            if len(self.polygon_points) >= 3:
+                                self._add_zone(self.polygon_points)
+                            self.drawing = False
+                            self.draw_mode = None
+                            self.polygon_points = []
+                            return True
         return super().eventFilter(source, event)
 
-    def update_frame(self):
-        if self.cap:
-            ret, frame = self.cap.read()
-            if not ret:
-                return
-            
-            # Get current label size for proper scaling
-            label_size = self.video_label.size()
-            frame_height, frame_width = frame.shape[:2]
-            
-            # Calculate scaling to maintain aspect ratio
-            scale = min(label_size.width() / frame_width, 
-                    label_size.height() / frame_height)
-            new_width = int(frame_width * scale)
-            new_height = int(frame_height * scale)
-            
-            # Resize frame while maintaining aspect ratio
-            frame = cv2.resize(frame, (new_width, new_height))
-
-            # Detection
-            if self.detection_enabled:
-                humans = detect_humans(frame)
-                current_time = time()
-                for person in humans:
-                    x1, y1, x2, y2 = person["box"]
-                    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-
-                    if self.roi and is_inside_roi((cx, cy), self.roi):
-                        # Check if 1 second has passed since last alert
-                        if current_time - self.last_alert_time >= 1.0:
-                            # Create a copy of the frame for logging
-                            log_frame = frame.copy()
-                            
-                            # Handle alert in non-blocking way
-                            QtCore.QTimer.singleShot(0, lambda: trigger_alert())
-                            QtCore.QTimer.singleShot(0, lambda f=log_frame: log_event("Intrusion Detected", f))
-                            
-                            # Update last alert time
-                            self.last_alert_time = current_time
-                        
-                        # Add visual indicator on display frame
-                        cv2.putText(frame, "INTRUDER!", (x1, y1 - 10),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
-
-                    # Always draw bounding box
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
-
-                # Draw ROI
-                if self.roi:
-                    cv2.rectangle(frame, self.roi[0], self.roi[1], (0, 255, 0), 2)
-                elif self.drawing and self.start_point and self.end_point:
-                    cv2.rectangle(frame, self.start_point, self.end_point, (0, 255, 255), 2)
-
-            # Convert to RGB and create QPixmap
+    def handle_detections(self, index, frame, detections):
+        """Receives inference results from the worker thread and raises alerts."""
+        if index != self.source_index or not self.detection_enabled:
+            return
+
+        with self.metrics.timer("zones", self.title):
+            result = self.monitor.check(detections, frame.shape)
+        if self.occupancy:
+            self.occupancy.update(detections, frame.shape, result.membership,
+                                  [zone.name for zone in self.zones.zones])
+        if result.alerts:
+            self.metrics.inc("alerts", camera=self.title)
+            event = "Intrusion Detected ({})".format(", ".join(zone.name for zone in result.alerts))
+
+            # Frames are never modified once published, so the snapshot writer
+            # can encode this one in the background without a copy
+            event_id = log_event(event, frame, camera=self.title, boxes=detections[result.inside])
+            if self.clip_recorder:
+                self.clip_recorder.trigger(event_id)
+
+            # Only queues the alert; sound and notification never block this thread
+            get_alert_dispatcher().post(self.title, [zone.name for zone in result.alerts])
+        elif self.clip_recorder and result.inside.any():
+            # Keep recording while the intruder stays
+            self.clip_recorder.keep_alive()
+
+        self.last_detections = (detections, result.inside)
+
+    def update_frame(self, seq):
+        """Schedules a repaint; Qt merges requests that arrive before the next paint."""
+        self.video_label.update()
+
+    def render_frame(self):
+        """
+        Renders the newest frame for the label, called from its paintEvent.
+
+        Returns:
+            tuple: (QImage, (x, y) offset in the label), or (None, None) before
+                the first frame
+        """
+        seq, frame = self.frame_slot.latest()
+        if frame is None:
+            return None, None
+
+        frame_height, frame_width = frame.shape[:2]
+        if self.frame_size != (frame_width, frame_height):
+            self.frame_size = (frame_width, frame_height)
+            self._update_transform()
+
+        # Repaints without a new frame (expose, overlapping windows) reuse the last image
+        key = (seq, self.transform.display_size)
+        if key == self._rendered_key:
+            return self._image, self.transform.offset
+        self._rendered_key = key
+        started = time.perf_counter()
+
+        # The only resize on the display path; it also gives us a private
+        # buffer to draw on, so the shared source frame stays untouched
+        display_width, display_height = self.transform.display_size
+        if (display_width, display_height) == self.frame_size:
+            frame = frame.copy()
+        else:
+            frame = cv2.resize(frame, (display_width, display_height), interpolation=cv2.INTER_AREA)
+        resized = time.perf_counter()
+
+        self.annotate(frame, self.transform.scale)
+        if self.detection_enabled:
+            # Draw the zone being edited
+            if self.draw_mode == "rect" and self.drawing and self.start_point and self.end_point:
+                rect = Zone.from_rect("", self.start_point, self.end_point)
+                cv2.polylines(frame, [rect.pixel_points(display_width, display_height)], True, (0, 255, 255), 2)
+            elif self.draw_mode == "polygon" and self.polygon_points:
+                preview = Zone("", self.polygon_points + [self.end_point])
+                cv2.polylines(frame, [preview.pixel_points(display_width, display_height)], False, (0, 255, 255), 2)
+
+        if self.show_overlay:
+            self._draw_overlay(frame)
+        drawn = time.perf_counter()
+
+        # Wrap the BGR buffer as is; the QImage does not own the memory, so the
+        # array is kept alive alongside it until the next frame replaces both
+        h, w, ch = frame.shape
+        if BGR888 is not None:
+            self._image = QImage(frame.data, w, h, ch * w, BGR888)
+            self._image_buffer = frame
+        else:
+            # Qt before 5.14 has no BGR888
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            
-            # Scale pixmap to fit label while maintaining aspect ratio
-            scaled_pixmap = pixmap.scaled(
-                label_size, 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            )
-            
-            # Update the display
-            self.video_label.setAlignment(Qt.AlignCenter)
-            self.video_label.setPixmap(scaled_pixmap)
\ No newline at end of file
+            self._image = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
+            self._image_buffer = rgb
+        finished = time.perf_counter()
+
+        self._display_times.append(finished)
+        metrics = self.metrics
+        metrics.observe("display.resize", resized - started, self.title)
+        metrics.observe("display.draw", drawn - resized, self.title)
+        metrics.observe("display.convert", finished - drawn, self.title)
+        metrics.observe("display.frame", finished - started, self.title)
+        metrics.inc("frames_displayed", camera=self.title)
+        return self._image, self.transform.offset
+
+    def annotate(self, frame, scale):
+        """
+        Draws the heatmap, people and zones; shared by the window and the MJPEG stream.
+
+        Args:
+            frame (numpy.ndarray): Private BGR copy of the source frame to draw on
+            scale (float): Size of frame relative to the source frame
+        """
+        if self.show_heatmap and self.occupancy:
+            self._draw_heatmap(frame)
+        if self.detection_enabled:
+            # Read once; the GUI thread replaces the tuple with every result
+            last_detections = self.last_detections
+            detections, inside = last_detections if last_detections is not None else (None, ())
+            draw_detections(frame, detections, inside, self.zones, scale)
+
+    def stream_frame(self, max_width=None):
+        """
+        Renders the annotated frame for the MJPEG stream; called from its encoder thread.
+
+        Args:
+            max_width (int, optional): Frames wider than this are downscaled
+
+        Returns:
+            tuple: (seq, BGR frame), frame is None before the first frame
+        """
+        seq, frame = self.frame_slot.latest()
+        if frame is None:
+            return seq, None
+        width = frame.shape[1]
+        scale = min(1.0, max_width / width) if max_width else 1.0
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            frame = frame.copy()
+        self.annotate(frame, scale)
+        return seq, frame
+
+    def display_fps(self):
+        """
+        Returns:
+            float: Frames shown per second over the last second or so
+        """
+        times = self._display_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def set_overlay(self, enabled):
+        self.show_overlay = enabled
+
+    def set_heatmap(self, enabled):
+        self.show_heatmap = enabled
+        self._rendered_key = None
+        self.video_label.update()
+
+    def _draw_heatmap(self, frame):
+        """Blends the occupancy heatmap into the frame and lists zone dwell times at the bottom."""
+        height, width = frame.shape[:2]
+        self.occupancy.heatmap_image(width, height, base=frame)
+        lines = [f"{name}: {format_duration(dwell.person_seconds)} dwell, {dwell.visits} visits, "
+                 f"longest {format_duration(dwell.longest)}"
+                 for name, dwell in self.occupancy.dwell().items()]
+        for i, line in enumerate(reversed(lines)):
+            origin = (8, height - 10 - 18 * i)
+            cv2.putText(frame, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3)
+            cv2.putText(frame, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def _draw_overlay(self, frame):
+        """Draws display FPS and inference latency in the top-left corner."""
+        lines = [f"Display {self.display_fps():.1f} FPS"]
+        detect = self.metrics.summary("detect")
+        if detect:
+            lines.append(f"Detect p50 {1000 * detect[0.5]:.0f} ms  p95 {1000 * detect[0.95]:.0f} ms")
+        shown = self.metrics.summary("display.frame", self.title)
+        if shown:
+            lines.append(f"Render p95 {1000 * shown[0.95]:.1f} ms")
+        dropped = self.metrics.counter("frames_dropped", self.title)
+        lines.append(f"Dropped {dropped}")
+        for i, line in enumerate(lines):
+            origin = (8, 20 + 18 * i)
+            cv2.putText(frame, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3)
+            cv2.putText(frame, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
@@ -0,0 +1,52 @@
+# display_transform.py
+
+class DisplayTransform:
+    """
+    Maps between source frame pixels and the label showing them.
+
+    The frame is fitted into the label keeping its aspect ratio and centered.
+    The mapping only changes when the label is resized or the source changes
+    resolution, so it is computed once per change and cached.
+    """
+
+    def __init__(self):
+        self.source_size = None  # (width, height) of the source frames
+        self.label_size = None  # (width, height) of the label
+        self.scale = 1.0
+        self.display_size = (0, 0)  # size of the fitted frame inside the label
+        self.offset = (0, 0)  # top-left corner of the fitted frame in the label
+
+    def update(self, source_size, label_size):
+        """
+        Recomputes the mapping if either size changed.
+
+        Returns:
+            bool: True if the mapping changed
+        """
+        if source_size == self.source_size and label_size == self.label_size:
+            return False
+        self.source_size = source_size
+        self.label_size = label_size
+
+        source_width, source_height = source_size
+        label_width, label_height = label_size
+        self.scale = min(label_width / source_width, label_height / source_height)
+        display_width = max(1, int(source_width * self.scale))
+        display_height = max(1, int(source_height * self.scale))
+        self.display_size = (display_width, display_height)
+        self.offset = ((label_width - display_width) // 2, (label_height - display_height) // 2)
+        return True
+
+    @property
+    def valid(self):
+        return self.source_size is not None
+
+    def label_to_normalized(self, x, y):
+        """
+        Converts a label position (e.g. the mouse) to normalized frame
+        coordinates, clamped to the visible frame.
+        """
+        display_width, display_height = self.display_size
+        x = max(0, min(display_width - 1, x - self.offset[0]))
+        y = max(0, min(display_height - 1, y - self.offset[1]))
+        return x / max(1, display_width - 1), y / max(1, display_height - 1)
@@ -0,0 +1,58 @@
+# export_dialog.py
+from datetime import datetime, time, timedelta
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QRadioButton, QDateEdit,
+                             QLabel, QDialogButtonBox)
+from PyQt5.QtCore import QDate
+
+class ExportDialog(QDialog):
+    """Lets the user pick which intrusion events to export."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Download Intrusion Data")
+
+        self.all_radio = QRadioButton("All events")
+        self.since_radio = QRadioButton("Events since last download")
+        self.range_radio = QRadioButton("Events in date range")
+        self.all_radio.setChecked(True)
+
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(today.addDays(-7))
+        self.to_date = QDateEdit(today)
+        for date_edit in (self.from_date, self.to_date):
+            date_edit.setCalendarPopup(True)
+            date_edit.setEnabled(False)
+        self.range_radio.toggled.connect(self.from_date.setEnabled)
+        self.range_radio.toggled.connect(self.to_date.setEnabled)
+
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("From"))
+        range_layout.addWidget(self.from_date)
+        range_layout.addWidget(QLabel("To"))
+        range_layout.addWidget(self.to_date)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.all_radio)
+        layout.addWidget(self.since_radio)
+        layout.addWidget(self.range_radio)
+        layout.addLayout(range_layout)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    def export_options(self):
+        """
+        Returns:
+            dict: Keyword arguments for utils.exporter.export_events
+        """
+        if self.since_radio.isChecked():
+            return {"since_last_export": True}
+        if self.range_radio.isChecked():
+            start = datetime.combine(self.from_date.date().toPyDate(), time.min)
+            # The "To" day is inclusive
+            end = datetime.combine(self.to_date.date().toPyDate(), time.min) + timedelta(days=1)
+            return {"start": start, "end": end}
+        return {}
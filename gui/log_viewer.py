@@ -0,0 +1,298 @@
+# log_viewer.py
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, time, timedelta
+from PyQt5.QtWidgets import (QWidget, QTableView, QHeaderView, QAbstractItemView, QComboBox,
+                             QCheckBox, QDateEdit, QLabel, QPushButton, QHBoxLayout, QVBoxLayout)
+from PyQt5.QtCore import (Qt, QThread, QAbstractTableModel, QModelIndex, QDate, QSize, QUrl,
+                          pyqtSignal)
+from PyQt5.QtGui import QImage, QPixmap, QDesktopServices
+from utils.event_store import get_event_store
+from utils.thumbnail_cache import get_thumbnail_cache, LOG_DIR
+from config.settings import LOG_PAGE_SIZE, THUMBNAIL_WIDTH
+
+COLUMNS = ["S.No", "Date", "Time", "Camera", "Event", "Evidence", "Clip"]
+EVIDENCE_COLUMN = COLUMNS.index("Evidence")
+CLIP_COLUMN = COLUMNS.index("Clip")
+THUMBNAIL_SIZE = QSize(THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 9 // 16)
+
+
+class ThumbnailLoader(QThread):
+    """
+    Loads thumbnails through the thumbnail cache off the GUI thread.
+
+    Requests are served newest first and only the most recent ones are kept,
+    so after fast scrolling the rows now on screen load before the ones that
+    scrolled past.
+    """
+
+    loaded = pyqtSignal(str, QImage)  # image path, thumbnail (null if unavailable)
+
+    def __init__(self, cache=None, max_pending=200, parent=None):
+        super().__init__(parent)
+        self.cache = cache or get_thumbnail_cache()
+        self._pending = deque()
+        self._queued = set()
+        self._max_pending = max_pending
+        self._condition = threading.Condition()
+
+    def request(self, image_path):
+        with self._condition:
+            if image_path in self._queued:
+                return
+            self._pending.append(image_path)
+            self._queued.add(image_path)
+            while len(self._pending) > self._max_pending:
+                self._queued.discard(self._pending.popleft())
+            self._condition.notify()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._condition:
+                while not self._pending and not self.isInterruptionRequested():
+                    self._condition.wait(0.5)
+                if self.isInterruptionRequested():
+                    return
+                image_path = self._pending.pop()
+                self._queued.discard(image_path)
+            path = self.cache.get(image_path)
+            # QImage, unlike QPixmap, may be created outside the GUI thread
+            self.loaded.emit(image_path, QImage(path) if path else QImage())
+
+    def stop(self):
+        self.requestInterruption()
+        with self._condition:
+            self._condition.notify()
+        self.wait()
+
+
+class EventTableModel(QAbstractTableModel):
+    """
+    Table of logged events that reads the event store a page at a time.
+
+    The view asks for more rows (canFetchMore/fetchMore) only when it is
+    scrolled near the end, and for a thumbnail only when its row is painted,
+    so opening the log costs one page however many events there are.
+    """
+
+    def __init__(self, loader, store=None, page_size=LOG_PAGE_SIZE, max_pixmaps=512, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.store = store or get_event_store()
+        self.page_size = page_size
+        self.filters = {}
+        self.total = 0
+        self._events = []
+        self._exhausted = True
+        self._rows = {}  # image path -> rows showing it; deduplicated events share a snapshot
+        self._pixmaps = OrderedDict()  # image path -> QPixmap or None, least recently used first
+        self._max_pixmaps = max_pixmaps
+        loader.loaded.connect(self._on_loaded)
+
+    def set_filters(self, **filters):
+        """
+        Restarts the table from the newest matching event.
+
+        Args:
+            **filters: start, end (datetime), camera (str), as for EventStore.query
+        """
+        self.beginResetModel()
+        self.filters = filters
+        self.total = self.store.count(**filters)
+        self._events = []
+        self._rows = {}
+        self._exhausted = False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def event_at(self, row):
+        return self._events[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._events)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        # Keyset pagination: continue below the last loaded ID
+        until_id = self._events[-1].id - 1 if self._events else None
+        page = self.store.query(limit=self.page_size, until_id=until_id, **self.filters)
+        self._exhausted = len(page) < self.page_size
+        if not page:
+            return
+        first = len(self._events)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        for row, event in enumerate(page, first):
+            if event.image_path:
+                self._rows.setdefault(event.image_path, []).append(row)
+        self._events.extend(page)
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        event = self._events[index.row()]
+        column = index.column()
+        if column == EVIDENCE_COLUMN:
+            return self._evidence(event, role)
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return event.id
+            if column == 1:
+                return event.timestamp.strftime("%Y-%m-%d")
+            if column == 2:
+                return event.timestamp.strftime("%H:%M:%S")
+            if column == 3:
+                return event.camera or ""
+            if column == 4:
+                return event.event
+            if column == CLIP_COLUMN:
+                return "Play clip" if event.clip_path else ""
+        if role == Qt.ForegroundRole and column == CLIP_COLUMN and event.clip_path:
+            return Qt.blue
+        return None
+
+    def _evidence(self, event, role):
+        if not event.image_path:
+            return "No image" if role == Qt.DisplayRole else None
+        if event.image_path not in self._pixmaps:
+            if role == Qt.DecorationRole:
+                # The row is being painted, so it is on screen
+                self.loader.request(event.image_path)
+            return "Loading..." if role == Qt.DisplayRole else None
+        self._pixmaps.move_to_end(event.image_path)
+        pixmap = self._pixmaps[event.image_path]
+        if role == Qt.DecorationRole:
+            return pixmap
+        if role == Qt.DisplayRole and pixmap is None:
+            return "Image missing"
+        return None
+
+    def _on_loaded(self, image_path, image):
+        self._pixmaps[image_path] = QPixmap.fromImage(image) if not image.isNull() else None
+        while len(self._pixmaps) > self._max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        for row in self._rows.get(image_path, ()):
+            index = self.index(row, EVIDENCE_COLUMN)
+            self.dataChanged.emit(index, index)
+
+
+class LogViewer(QWidget):
+    """Intruders log window: filterable, paginated event table with thumbnails."""
+
+    def __init__(self, main_window=None, store=None):
+        super().__init__()
+        self.main_window = main_window
+        self.store = store or get_event_store()
+        self.setWindowTitle("Intruders Log")
+        self.setGeometry(200, 200, 1000, 700)
+
+        self.camera_combo = QComboBox()
+        self.camera_combo.addItem("All cameras", None)
+        for camera in self.store.cameras():
+            self.camera_combo.addItem(camera, camera)
+
+        self.date_check = QCheckBox("Dates")
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(today.addDays(-7))
+        self.to_date = QDateEdit(today)
+        for date_edit in (self.from_date, self.to_date):
+            date_edit.setCalendarPopup(True)
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.apply_filters)
+        self.date_check.toggled.connect(self.from_date.setEnabled)
+        self.date_check.toggled.connect(self.to_date.setEnabled)
+        self.date_check.toggled.connect(self.apply_filters)
+        self.camera_combo.currentIndexChanged.connect(self.apply_filters)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.apply_filters)
+        download_button = QPushButton("Download")
+        download_button.setEnabled(main_window is not None)
+        if main_window is not None:
+            download_button.clicked.connect(main_window.download_data)
+        self.total_label = QLabel()
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Camera"))
+        filter_layout.addWidget(self.camera_combo)
+        filter_layout.addWidget(self.date_check)
+        filter_layout.addWidget(self.from_date)
+        filter_layout.addWidget(QLabel("to"))
+        filter_layout.addWidget(self.to_date)
+        filter_layout.addStretch(1)
+        filter_layout.addWidget(self.total_label)
+        filter_layout.addWidget(refresh_button)
+        filter_layout.addWidget(download_button)
+
+        self.loader = ThumbnailLoader(parent=self)
+        self.loader.start()
+        self.model = EventTableModel(self.loader, self.store, parent=self)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setIconSize(THUMBNAIL_SIZE)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.table.verticalHeader().hide()
+        # Fixed row heights, so the view never measures rows it does not show
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE.height() + 8)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(COLUMNS.index("Event"), QHeaderView.Stretch)
+        for column, width in zip(range(4), (70, 120, 90, 120)):
+            self.table.setColumnWidth(column, width)
+        self.table.setColumnWidth(EVIDENCE_COLUMN, THUMBNAIL_SIZE.width() + 16)
+        self.table.doubleClicked.connect(self.open_evidence)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+        self.apply_filters()
+
+    def filters(self):
+        """
+        Returns:
+            dict: Event store filters for the current camera and date selection
+        """
+        filters = {}
+        camera = self.camera_combo.currentData()
+        if camera is not None:
+            filters["camera"] = camera
+        if self.date_check.isChecked():
+            filters["start"] = datetime.combine(self.from_date.date().toPyDate(), time.min)
+            # The "to" day is inclusive
+            filters["end"] = datetime.combine(self.to_date.date().toPyDate(), time.min) + timedelta(days=1)
+        return filters
+
+    def apply_filters(self, *_):
+        self.model.set_filters(**self.filters())
+        self.total_label.setText(f"Total Detections: {self.model.total}")
+
+    def open_evidence(self, index):
+        """Opens the full snapshot, or the clip, in the system viewer."""
+        event = self.model.event_at(index.row())
+        path = event.clip_path if index.column() == CLIP_COLUMN else event.image_path
+        if path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(os.path.join(LOG_DIR, path))))
+
+    def closeEvent(self, event):
+        self.loader.stop()
+        super().closeEvent(event)
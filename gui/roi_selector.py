@@ -1,4 +1,36 @@
 # roi_selector.py
-# Placeholder - future support for interactive ROI selection
-def get_default_roi():
-    return (200, 150), (800, 500)
+from PyQt5.QtWidgets import QFileDialog, QMessageBox
+from utils.zones import save_zones, load_zones
+
+def save_zones_dialog(parent, zone_set):
+    """
+    Asks for a file name and saves the zone set to it.
+
+    Returns:
+        bool: True if the zones were saved
+    """
+    path, _ = QFileDialog.getSaveFileName(parent, "Save Zones", "zones.json", "Zone Files (*.json)")
+    if not path:
+        return False
+    try:
+        save_zones(zone_set, path)
+    except OSError as e:
+        QMessageBox.warning(parent, "Error", f"Could not save zones: {str(e)}")
+        return False
+    return True
+
+def load_zones_dialog(parent):
+    """
+    Asks for a zone file and loads it.
+
+    Returns:
+        ZoneSet: The loaded zones, or None if cancelled or unreadable
+    """
+    path, _ = QFileDialog.getOpenFileName(parent, "Load Zones", "", "Zone Files (*.json)")
+    if not path:
+        return None
+    try:
+        return load_zones(path)
+    except (OSError, ValueError, KeyError) as e:
+        QMessageBox.warning(parent, "Error", f"Could not load zones: {str(e)}")
+        return None
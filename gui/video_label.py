@@ -0,0 +1,34 @@
+# video_label.py
+from PyQt5.QtWidgets import QLabel, QStyle, QStyleOption
+from PyQt5.QtGui import QPainter
+
+
+class VideoLabel(QLabel):
+    """
+    Label that paints video frames straight from a QImage.
+
+    Frames are pulled from a render callback when Qt actually paints the
+    label, instead of being pushed as a QPixmap on every captured frame:
+    any number of update() calls between two paints costs one render, and
+    hidden or minimized tiles do not render at all. The QImage is drawn
+    without the QPixmap conversion (a full-frame copy) that setPixmap needs.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.renderer = None  # callable returning (QImage, (x, y) offset) or (None, None)
+
+    def paintEvent(self, event):
+        image, offset = self.renderer() if self.renderer else (None, None)
+        if image is None:
+            # Nothing rendered yet, show the title
+            super().paintEvent(event)
+            return
+
+        painter = QPainter(self)
+        # Background from the style sheet, then the frame on top
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+        painter.drawImage(offset[0], offset[1], image)
+        painter.end()
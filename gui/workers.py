@@ -0,0 +1,187 @@
+# workers.py
+import threading
+import time
+import cv2
+from PyQt5.QtCore import QThread, pyqtSignal
+from detectors.yolo_detector import detect_humans_array_batch
+from utils.pipeline import SourcePipeline, DETECT
+from utils.roi_crop import to_frame
+from utils.exporter import export_events, ExportCancelled
+from utils.metrics import get_metrics
+
+
+class CaptureWorker(QThread):
+    """
+    Reads frames from a capture device and publishes them to a frame slot.
+
+    Frames are published at native resolution; the detector resizes them to
+    its input size and the widget scales them once for display.
+    """
+
+    frame_ready = pyqtSignal(int)  # sequence number of the published frame
+
+    def __init__(self, cap, slot, live=True, camera=None, parent=None):
+        super().__init__(parent)
+        self.cap = cap
+        self.slot = slot
+        self.camera = camera  # label for the metrics
+
+        # Video files are read at their native rate instead of as fast as possible
+        self.frame_interval = 0
+        if not live:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if fps and fps > 0:
+                self.frame_interval = 1.0 / fps
+
+    def run(self):
+        metrics = get_metrics()
+        next_time = time.monotonic()
+        while not self.isInterruptionRequested():
+            if self.frame_interval:
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_time = max(next_time + self.frame_interval, time.monotonic())
+
+            started = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self.msleep(10)
+                continue
+            metrics.observe("capture.read", time.perf_counter() - started, self.camera)
+
+            # A frame the inference worker never took counts as dropped
+            dropped = self.slot.dropped
+            seq = self.slot.put(frame)
+            metrics.inc("frames_captured", camera=self.camera)
+            metrics.inc("frames_dropped", self.slot.dropped - dropped, camera=self.camera)
+            self.frame_ready.emit(seq)
+
+        self.cap.release()
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+
+class InferenceWorker(QThread):
+    """
+    Runs the detector for any number of frame slots.
+
+    Whenever new frames arrive, the newest frame of every enabled source is
+    handed to that source's SourcePipeline. Frames that need the model are
+    collected into one batched call and the results are split back per
+    source; the rest are served by the tracker's prediction or, on static
+    scenes, the previous result. Stale frames are dropped by the slots.
+    """
+
+    detections_ready = pyqtSignal(int, object, object)  # source index, frame, (N, 6) tracks
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._slots = []
+        self._enabled = []
+        self._pipelines = []
+
+    def add_source(self, slot, zones=None, camera=None):
+        """
+        Registers a frame slot to run detection on.
+
+        Args:
+            slot (LatestFrameSlot): Frames of the source
+            zones (ZoneSet, optional): Zones the motion gate measures
+            camera (str, optional): Label of the source's metrics
+
+        Returns:
+            int: Source index reported with detections_ready
+        """
+        with self._lock:
+            self._slots.append(slot)
+            self._enabled.append(True)
+            self._pipelines.append(SourcePipeline(zones, camera=camera))
+            slot.add_listener(self._wakeup)
+            return len(self._slots) - 1
+
+    def set_enabled(self, index, enabled):
+        with self._lock:
+            self._enabled[index] = enabled
+            if not enabled:
+                self._pipelines[index].reset()
+        self._wakeup.set()
+
+    def gate_stats(self, index):
+        """
+        Returns:
+            dict: Motion gate counters of a source, empty if gating is disabled
+        """
+        with self._lock:
+            return self._pipelines[index].gate_stats()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            if not self._wakeup.wait(0.1):
+                continue
+            self._wakeup.clear()
+
+            with self._lock:
+                sources = [(index, slot, self._pipelines[index])
+                           for index, slot in enumerate(self._slots)
+                           if self._enabled[index]]
+
+            batches = {}  # model input size -> [(index, frame, pipeline, crop)]
+            for index, slot, pipeline in sources:
+                seq, frame = slot.take(timeout=0)
+                if frame is None:
+                    continue
+                action = pipeline.plan(frame)
+                if action == DETECT:
+                    crop = pipeline.detector_input(frame)
+                    batches.setdefault(crop.imgsz, []).append((index, frame, pipeline, crop))
+                else:
+                    self.detections_ready.emit(index, frame, pipeline.apply(action))
+
+            # One call per input size; without ROI inference that is one call
+            for imgsz, batch in batches.items():
+                results = detect_humans_array_batch([crop.image for _, _, _, crop in batch], imgsz)
+                for (index, frame, pipeline, crop), detections in zip(batch, results):
+                    self.detections_ready.emit(index, frame,
+                                               pipeline.apply(DETECT, to_frame(detections, crop)))
+
+    def stop(self):
+        self.requestInterruption()
+        self._wakeup.set()
+        self.wait()
+
+
+class ExportWorker(QThread):
+    """Runs utils.exporter.export_events off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # done, total
+    succeeded = pyqtSignal(object)  # ExportResult
+    failed = pyqtSignal(str)
+
+    def __init__(self, zip_path, options, parent=None):
+        super().__init__(parent)
+        self.zip_path = zip_path
+        self.options = options
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            result = export_events(
+                self.zip_path,
+                progress=self.progress.emit,
+                should_cancel=lambda: self._cancelled,
+                **self.options
+            )
+        except ExportCancelled:
+            self.failed.emit("Download cancelled.")
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(result)
@@ -0,0 +1,295 @@
+# headless.py
+"""
+Display-less entry point for server nodes.
+
+Runs capture -> detect_humans -> zone check -> alert/log without PyQt. Nothing
+from gui.* may be imported here (directly or through a utils module), so the
+daemon starts fast and stays small.
+
+Example:
+    python headless.py --source 0 --zones config/zones.example.json --fps 10 --workers 2
+"""
+import argparse
+import threading
+from collections import deque
+import time
+import cv2
+from detectors.yolo_detector import detect_humans_array, configure_detector, close_detector
+from utils.frame_slot import LatestFrameSlot
+from utils.intrusion import IntrusionMonitor
+from utils.logger import log_event
+from utils.snapshot_writer import get_snapshot_writer, close_snapshot_writer
+from utils.pipeline import SourcePipeline, DETECT
+from utils.roi_crop import to_frame
+from utils.metrics import get_metrics, MetricsExporter
+from utils.clip_recorder import ClipRecorder
+from utils.occupancy import get_occupancy, close_occupancy, format_duration
+from utils.annotate import draw_detections
+from utils.mjpeg_server import MjpegServer
+from utils.zones import load_zones
+from config.settings import (MOTION_GATE_ENABLED, TRACKER_ENABLED, DETECT_STRIDE,
+                             METRICS_FILE, METRICS_HTTP_PORT, CLIP_ENABLED, ROI_INFERENCE_ENABLED,
+                             DETECTOR_INPUT_SIZE, MJPEG_HTTP_PORT)
+
+
+def parse_source(value):
+    # Webcam indices are plain integers, anything else is a file or URL
+    return int(value) if value.isdigit() else value
+
+
+class HeadlessRunner:
+    def __init__(self, source, zones, fps=0, workers=1, motion_gate=True,
+                 tracking=True, stride=DETECT_STRIDE, clips=CLIP_ENABLED,
+                 roi_inference=ROI_INFERENCE_ENABLED, input_size=DETECTOR_INPUT_SIZE):
+        self.source = source
+        self.zones = zones
+        self.fps = fps
+        self.workers = max(1, workers)
+        self.slot = LatestFrameSlot()
+        self.monitor = IntrusionMonitor(zones)
+        self.stop_event = threading.Event()
+        self.metrics = get_metrics()
+        self.camera = str(source)
+        self.clips = clips
+        self.clip_recorder = None
+        self.occupancy = get_occupancy(self.camera)
+
+        self.pipeline = SourcePipeline(zones, motion_gate=motion_gate, tracking=tracking,
+                                       stride=stride, roi_inference=roi_inference,
+                                       input_size=input_size, camera=self.camera)
+        self._plan_lock = threading.Lock()
+
+        # Results can finish out of order with several workers; they wait
+        # here until every earlier frame is handled, so the tracker, zone
+        # check and alerts see frames in capture order
+        self._monitor_lock = threading.Lock()
+        self._planned = deque()  # seqs in plan order, not handled yet
+        self._finished = {}  # seq -> (frame, action, detections) waiting for earlier frames
+        self.last_detections = None  # (people, inside mask) of the newest handled frame
+
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.alerts = 0
+
+    def capture_loop(self, cap):
+        live = isinstance(self.source, int)
+        source_fps = cap.get(cv2.CAP_PROP_FPS)
+        read_interval = 1.0 / source_fps if not live and source_fps and source_fps > 0 else 0
+        publish_interval = 1.0 / self.fps if self.fps > 0 else 0
+
+        next_read = time.monotonic()
+        last_publish = 0
+        while not self.stop_event.is_set():
+            if read_interval:
+                delay = next_read - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_read = max(next_read + read_interval, time.monotonic())
+
+            started = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                if live:
+                    time.sleep(0.01)
+                    continue
+                break  # end of video file
+            self.metrics.observe("capture.read", time.perf_counter() - started, self.camera)
+            self.frames_captured += 1
+            self.metrics.inc("frames_captured", camera=self.camera)
+
+            now = time.monotonic()
+            if now - last_publish >= publish_interval:
+                last_publish = now
+                dropped = self.slot.dropped
+                self.slot.put(frame)
+                self.metrics.inc("frames_dropped", self.slot.dropped - dropped, camera=self.camera)
+
+        cap.release()
+        self.slot.close()
+
+    def inference_loop(self):
+        while True:
+            with self._plan_lock:
+                seq, frame = self.slot.take()
+                if frame is None:
+                    return  # slot closed
+                action = self.pipeline.plan(frame)
+                self._planned.append(seq)
+            detections = None
+            if action == DETECT:
+                try:
+                    crop = self.pipeline.detector_input(frame)
+                    detections = to_frame(detect_humans_array(crop.image, crop.imgsz), crop)
+                except Exception as e:
+                    # Still hand the frame on, or every later result would wait for it
+                    print(f"Error: Detection failed: {e}")
+                    action = None
+
+            # Only the model call runs in parallel; results are handled in
+            # seq order, whichever worker finishes first
+            with self._monitor_lock:
+                self._finished[seq] = (frame, action, detections)
+                while self._planned and self._planned[0] in self._finished:
+                    frame, action, detections = self._finished.pop(self._planned.popleft())
+                    if action is not None:
+                        self.handle_result(frame, action, detections)
+
+    def handle_result(self, frame, action, detections):
+        """Tracks, checks zones and alerts for one frame; called in seq order."""
+        self.frames_processed += 1
+        people = self.pipeline.apply(action, detections)
+        with self.metrics.timer("zones", self.camera):
+            result = self.monitor.check(people, frame.shape)
+        self.last_detections = (people, result.inside)
+        if self.occupancy:
+            self.occupancy.update(people, frame.shape, result.membership,
+                                  [zone.name for zone in self.zones.zones])
+
+        if result.alerts:
+            self.alerts += 1
+            self.metrics.inc("alerts", camera=self.camera)
+            event = "Intrusion Detected ({})".format(", ".join(zone.name for zone in result.alerts))
+            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {event}, "
+                  f"{int(result.inside.sum())} intruder(s)")
+            event_id = log_event(event, frame, camera=self.camera, boxes=people[result.inside])
+            if self.clip_recorder:
+                self.clip_recorder.trigger(event_id)
+        elif self.clip_recorder and result.inside.any():
+            self.clip_recorder.keep_alive()
+
+    def stream_frame(self, max_width=None):
+        """
+        Renders the annotated frame for the MJPEG stream; called from its encoder thread.
+
+        Returns:
+            tuple: (seq, BGR frame), frame is None before the first frame
+        """
+        seq, frame = self.slot.latest()
+        if frame is None:
+            return seq, None
+        scale = min(1.0, max_width / frame.shape[1]) if max_width else 1.0
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            frame = frame.copy()
+        last_detections = self.last_detections
+        detections, inside = last_detections if last_detections is not None else (None, ())
+        draw_detections(frame, detections, inside, self.zones, scale)
+        return seq, frame
+
+    def run(self, metrics_file=METRICS_FILE, metrics_port=METRICS_HTTP_PORT, mjpeg_port=MJPEG_HTTP_PORT):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            print(f"Error: Could not open video capture {self.source}.")
+            return 1
+        exporter = MetricsExporter(self.metrics, path=metrics_file, port=metrics_port).start()
+        live_view = MjpegServer(port=mjpeg_port)
+        live_view.add_stream(self.camera, self.stream_frame)
+        live_view.start()
+        if self.clips:
+            self.clip_recorder = ClipRecorder(self.slot, self.camera)
+
+        threads = [threading.Thread(target=self.inference_loop, daemon=True)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        started = time.monotonic()
+        try:
+            self.capture_loop(cap)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            cap.release()
+            self.slot.close()
+        for thread in threads:
+            thread.join()
+        live_view.stop()
+        close_detector()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"Captured {self.frames_captured} frames, processed {self.frames_processed} "
+              f"({self.frames_processed / elapsed:.1f} FPS), dropped {self.slot.dropped}, "
+              f"alerts {self.alerts}")
+        if self.clip_recorder:
+            self.clip_recorder.close()
+        snapshot_stats = get_snapshot_writer().stats()
+        close_snapshot_writer()
+        exporter.stop()
+        print(f"Snapshots: {snapshot_stats['written']} written, {snapshot_stats['dropped']} dropped, "
+              f"encode {snapshot_stats['encode_ms_avg']:.1f} ms avg / "
+              f"{snapshot_stats['encode_ms_max']:.1f} ms max")
+        if self.occupancy:
+            for name, dwell in self.occupancy.dwell().items():
+                print(f"Dwell in {name}: {format_duration(dwell.person_seconds)}, "
+                      f"occupied {format_duration(dwell.occupied_seconds)}, {dwell.visits} visits, "
+                      f"longest {format_duration(dwell.longest)}")
+            close_occupancy()
+        gate_stats = self.pipeline.gate_stats()
+        if gate_stats:
+            print("Motion gate: " + ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                              for k, v in gate_stats.items()))
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless human trespass detection")
+    parser.add_argument("--source", default="0",
+                        help="webcam index or path/URL of a video (default: 0)")
+    parser.add_argument("--zones", "--roi-config", dest="zones", required=True,
+                        help="zone set JSON file, e.g. config/zones.example.json")
+    parser.add_argument("--fps", type=float, default=0,
+                        help="maximum frames per second to analyse (default: unlimited)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of inference threads; model calls only overlap with "
+                             "--processes, in-process detectors run one call at a time (default: 1)")
+    parser.add_argument("--no-motion-gate", action="store_true",
+                        help="run the model on every frame, even on static scenes")
+    parser.add_argument("--no-clips", action="store_true",
+                        help="do not record pre/post-event video clips")
+    parser.add_argument("--no-tracker", action="store_true",
+                        help="alert on zone occupancy instead of per-person zone entry")
+    parser.add_argument("--detect-stride", type=int, default=DETECT_STRIDE,
+                        help="run the detector on every Nth frame and track in between "
+                             f"(default: {DETECT_STRIDE})")
+    parser.add_argument("--roi-inference", action=argparse.BooleanOptionalAction,
+                        default=ROI_INFERENCE_ENABLED,
+                        help="run the detector only on the zones' region plus a margin "
+                             f"(default: {'on' if ROI_INFERENCE_ENABLED else 'off'})")
+    parser.add_argument("--backend", choices=["torch", "onnx", "openvino"],
+                        help="inference backend (default: config.settings.DETECTOR_BACKEND)")
+    parser.add_argument("--model", help="model file or directory for the backend")
+    parser.add_argument("--int8", action="store_true", default=None,
+                        help="use the quantized INT8 model")
+    parser.add_argument("--threads", type=int, help="CPU threads per inference")
+    parser.add_argument("--imgsz", type=int, help="model input size in pixels")
+    parser.add_argument("--processes", type=int,
+                        help="run inference in this many worker processes (default: DETECTOR_PROCESSES)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="periodically write metrics in Prometheus text format to this file")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_HTTP_PORT,
+                        help="serve metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--mjpeg-port", type=int, default=MJPEG_HTTP_PORT,
+                        help="serve the annotated live view as MJPEG on http://HOST:PORT/")
+    args = parser.parse_args(argv)
+
+    configure_detector(backend=args.backend, model_path=args.model, int8=args.int8,
+                       threads=args.threads, imgsz=args.imgsz, processes=args.processes)
+
+    runner = HeadlessRunner(
+        parse_source(args.source),
+        load_zones(args.zones),
+        fps=args.fps,
+        workers=args.workers,
+        motion_gate=MOTION_GATE_ENABLED and not args.no_motion_gate,
+        tracking=TRACKER_ENABLED and not args.no_tracker,
+        stride=args.detect_stride,
+        clips=CLIP_ENABLED and not args.no_clips,
+        roi_inference=args.roi_inference,
+        input_size=args.imgsz or DETECTOR_INPUT_SIZE,
+    )
+    return runner.run(metrics_file=args.metrics_file, metrics_port=args.metrics_port,
+                      mjpeg_port=args.mjpeg_port)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
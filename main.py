@@ -1,12 +1,41 @@
 # main.py
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui.app import MainApp
+import threading
+from utils import startup_profiler
+
+def warm_up():
+    """Loads the model and audio after the window is up, off the GUI thread."""
+    from detectors.yolo_detector import warmup
+    from utils.alert import init_audio
+    try:
+        warmup()
+    except Exception as e:
+        print(f"Warning: model warm-up failed: {e}")
+    init_audio()
+    startup_profiler.mark("warm-up done")
+    startup_profiler.report()
 
 def main():
-    app = QApplication(sys.argv)
-    window = MainApp()
-    window.show()
+    # --profile-startup (or HTD_PROFILE_STARTUP=1) prints time per import/init phase
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        startup_profiler.enable()
+
+    with startup_profiler.phase("import PyQt5"):
+        from PyQt5.QtWidgets import QApplication
+    with startup_profiler.phase("import gui.app"):
+        from gui.app import MainApp
+
+    with startup_profiler.phase("create QApplication"):
+        app = QApplication(sys.argv)
+    with startup_profiler.phase("create MainApp"):
+        window = MainApp()
+    with startup_profiler.phase("show window"):
+        window.show()
+        app.processEvents()
+    startup_profiler.mark("window shown")
+
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -1,38 +1,154 @@
 import os
-import time
+import queue
 import threading
-from playsound import playsound
-from utils.logger import log_event
-from gui.alert_popup import show_alert_popup
-import pygame  # Add this import
+import time
+from collections import namedtuple
+from utils import startup_profiler
+from config.settings import ALERT_COALESCE_WINDOW, ALERT_SOUND_DURATION
+
+SOUND_FILE = os.path.join("assets", "alert.wav")
+
+# pygame is imported, its mixer initialized and the alert sound decoded into
+# memory on first use (or by init_audio() from a background thread at
+# startup), not when this module is imported
+_mixer = None
+_sound = None
+_mixer_lock = threading.Lock()
 
-# Initialize pygame mixer for better sound control
-pygame.mixer.init()
+# One intrusion reported to the dispatcher
+AlertEvent = namedtuple("AlertEvent", ["time", "camera", "zones"])
 
-last_alert_time = 0
-alert_cooldown = 5  # seconds
+# A burst of alerts merged into one notification. The burst ID stays the
+# same while more alerts are merged in, so a notification can be updated in
+# place; count is the number of alerts so far.
+Notification = namedtuple("Notification", ["burst_id", "count", "cameras", "zones", "first_time", "last_time"])
 
-def play_alert_sound():
-    sound_path = os.path.join("assets", "alert.wav")
-    if os.path.exists(sound_path):
-        pygame.mixer.music.load(sound_path)
-        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+def init_audio():
+    """
+    Imports pygame, initializes its mixer and preloads the alert sound once.
+
+    Returns:
+        module: pygame.mixer, or None if audio is unavailable
+    """
+    global _mixer, _sound
+    with _mixer_lock:
+        if _mixer is None:
+            try:
+                with startup_profiler.phase("init audio"):
+                    import pygame
+                    pygame.mixer.init()
+                    if os.path.exists(SOUND_FILE):
+                        _sound = pygame.mixer.Sound(SOUND_FILE)
+                _mixer = pygame.mixer
+            except Exception as e:
+                print(f"Warning: audio unavailable: {e}")
+                _mixer = False
+    return _mixer or None
+
+def play_alert_sound(duration=ALERT_SOUND_DURATION):
+    """
+    Loops the preloaded alert sound for `duration` seconds (until stopped if
+    None). Playback runs on the mixer's own thread; this returns immediately.
+    """
+    if init_audio() and _sound is not None:
+        _sound.stop()
+        _sound.play(loops=-1, maxtime=int(duration * 1000) if duration else 0)
 
 def stop_alert_sound():
-    pygame.mixer.music.stop()
+    if init_audio() and _sound is not None:
+        _sound.stop()
+
+
+class AlertDispatcher:
+    """
+    Turns intrusion alerts into notifications without blocking the caller.
+
+    post() only enqueues the alert. A background thread merges alerts that
+    arrive within `window` seconds of the previous one into the same burst,
+    starts the sound once per burst and passes a Notification with the
+    running count to every listener. Listeners are called from that thread;
+    GUI code has to forward them to its own thread (e.g. via a Qt signal).
+    """
+
+    def __init__(self, window=ALERT_COALESCE_WINDOW, sound=True):
+        self.window = window
+        self.sound = sound
+        self._queue = queue.Queue()
+        self._listeners = []
+        self._burst = None  # Notification of the current burst
+        self._next_burst_id = 1
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def add_listener(self, callback):
+        """Registers callback(notification)."""
+        self._listeners.append(callback)
+
+    def post(self, camera=None, zones=()):
+        """
+        Reports an intrusion; never blocks.
+
+        Args:
+            camera (str, optional): Camera that saw it
+            zones (iterable): Names of the zones that raised the alert
+        """
+        self._queue.put(AlertEvent(time.time(), camera, tuple(zones)))
+
+    def _merge(self, event):
+        burst = self._burst
+        if burst is None or event.time - burst.last_time > self.window:
+            self._burst = Notification(self._next_burst_id, 1, (event.camera,), event.zones,
+                                       event.time, event.time)
+            self._next_burst_id += 1
+            return True  # a new burst started
+        self._burst = burst._replace(
+            count=burst.count + 1,
+            cameras=burst.cameras + tuple(c for c in (event.camera,) if c not in burst.cameras),
+            zones=burst.zones + tuple(z for z in event.zones if z not in burst.zones),
+            last_time=event.time,
+        )
+        return False
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            new_burst = self._merge(event)
+
+            # Alerts that queued up meanwhile go into the same notification
+            while True:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    return
+                new_burst = self._merge(event) or new_burst
 
-def trigger_alert():
-    global last_alert_time
-    current_time = time.time()
+            if new_burst and self.sound:
+                play_alert_sound()
+            for listener in self._listeners:
+                try:
+                    listener(self._burst)
+                except Exception as e:
+                    print(f"Error: alert listener failed: {e}")
 
-    if current_time - last_alert_time >= alert_cooldown:
-        last_alert_time = current_time
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        stop_alert_sound()
 
-        log_event("Intrusion Detected")
 
-        # Play sound in a non-blocking way
-        threading.Thread(target=play_alert_sound, daemon=True).start()
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
 
-        # Show GUI popup and stop sound when closed
-        show_alert_popup("ALERT!", "Human entered restricted area!")
-        stop_alert_sound()
\ No newline at end of file
+def get_alert_dispatcher():
+    """
+    Returns the process-wide alert dispatcher, starting it on first use.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+        return _dispatcher
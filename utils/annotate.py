@@ -0,0 +1,35 @@
+# annotate.py
+import cv2
+
+
+def draw_detections(frame, detections, inside, zones, scale=1.0):
+    """
+    Draws people and zones the way the live view shows them.
+
+    Shared by the PyQt window and the MJPEG streams, so remote viewers see
+    the same annotations as the local operator.
+
+    Args:
+        frame (numpy.ndarray): BGR image to draw on, in place
+        detections (numpy.ndarray): (N, 5+) rows (x1, y1, x2, y2, conf[, track id])
+            in source frame pixels, or None
+        inside (numpy.ndarray): (N,) bool, person inside an alerting zone
+        zones (ZoneSet): Zones, drawn in green if they alert, gray otherwise
+        scale (float): Size of frame relative to the source frame
+    """
+    height, width = frame.shape[:2]
+    if detections is not None and len(detections):
+        boxes = (detections[:, :4] * scale).astype(int).tolist()
+        track_ids = detections[:, 5].astype(int).tolist() if detections.shape[1] > 5 else []
+        for i, ((x1, y1, x2, y2), is_inside) in enumerate(zip(boxes, inside)):
+            if i < len(track_ids):
+                cv2.putText(frame, f"#{track_ids[i]}", (x1 + 4, y2 - 6),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
+            if is_inside:
+                cv2.putText(frame, "INTRUDER!", (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+
+    for zone in zones:
+        color = (0, 255, 0) if zone.alert else (160, 160, 160)
+        cv2.polylines(frame, [zone.pixel_points(width, height)], True, color, 2)
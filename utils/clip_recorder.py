@@ -0,0 +1,223 @@
+# clip_recorder.py
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import cv2
+import numpy as np
+from utils.event_store import get_event_store
+from utils.metrics import get_metrics
+from config.settings import (CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_MAX_SECONDS, CLIP_FPS,
+                             CLIP_MAX_WIDTH, CLIP_JPEG_QUALITY, CLIP_BUFFER_MAX_MB)
+
+CLIPS_DIR = os.path.join("logs", "clips")
+
+
+class ClipRecorder:
+    """
+    Records pre/post-event video clips for one camera.
+
+    A background thread samples the camera's frame slot at CLIP_FPS, scales
+    the frames down and keeps them JPEG-compressed in a ring buffer bounded
+    by both time (pre_seconds) and memory (max_bytes). trigger() starts a
+    clip with the buffered frames and keeps writing new frames until
+    post_seconds after the last trigger() or keep_alive(), so the clip
+    extends while an intruder stays in view. Finished clips are linked to
+    their events in the event store.
+
+    The capture and video threads only ever call trigger()/keep_alive(),
+    which just update a deadline; all encoding happens on the recorder's
+    own thread.
+    """
+
+    def __init__(self, slot, camera, pre_seconds=CLIP_PRE_SECONDS, post_seconds=CLIP_POST_SECONDS,
+                 max_seconds=CLIP_MAX_SECONDS, fps=CLIP_FPS, max_width=CLIP_MAX_WIDTH,
+                 quality=CLIP_JPEG_QUALITY, max_bytes=CLIP_BUFFER_MAX_MB * 1024 * 1024,
+                 clips_dir=CLIPS_DIR, store=None):
+        self.slot = slot
+        self.camera = camera
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_seconds = max_seconds  # longest clip, however long the intruder stays
+        self.fps = fps
+        self.max_width = max_width
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.clips_dir = clips_dir
+        self.store = store
+
+        self._buffer = deque()  # (timestamp, JPEG bytes), oldest first
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+        self._event_ids = []  # events waiting for the current clip
+        self._end_time = 0.0  # record until then, 0 when idle
+        # Only touched by the recorder thread
+        self._writer = None
+        self._clip = None  # (path, started) of the clip being written
+        self._size = None
+        self.clips_written = 0
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        slot.add_listener(self._wakeup)
+        self._thread = threading.Thread(target=self._run, name=f"clip-recorder-{camera}", daemon=True)
+        self._thread.start()
+
+    def trigger(self, event_id=None, now=None):
+        """
+        Starts a clip, or extends the current one, around an event.
+
+        Args:
+            event_id (int, optional): Event the clip is linked to once written
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if event_id is not None:
+                self._event_ids.append(event_id)
+            self._end_time = max(self._end_time, now + self.post_seconds)
+        self._wakeup.set()
+
+    def keep_alive(self, now=None):
+        """Extends a running clip, e.g. while an intruder is still inside a zone."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._end_time:
+                self._end_time = max(self._end_time, now + self.post_seconds)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Buffered frames and bytes, whether a clip is being written, clips written
+        """
+        with self._lock:
+            return {
+                "buffered_frames": len(self._buffer),
+                "buffer_bytes": self._buffer_bytes,
+                "recording": self._end_time > 0,
+                "clips_written": self.clips_written,
+            }
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        last_seq = None
+        last_sample = 0.0
+        while not self._stop.is_set():
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+            now = time.time()
+            seq, frame = self.slot.latest()
+            if frame is not None and seq != last_seq and now - last_sample >= interval * 0.9:
+                last_seq = seq
+                last_sample = now
+                self._sample(frame, now)
+
+            with self._lock:
+                recording = self._end_time > 0
+                finished = recording and (now >= self._end_time or
+                                          (self._clip and now - self._clip[1] >= self.max_seconds))
+            if finished:
+                self._finish()
+        self._finish()
+
+    def _sample(self, frame, now):
+        started = time.perf_counter()
+        if self.max_width and frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        data = data.tobytes()
+        get_metrics().observe("clip.encode", time.perf_counter() - started, self.camera)
+
+        with self._lock:
+            recording = self._end_time > 0
+            self._buffer.append((now, data))
+            self._buffer_bytes += len(data)
+            # Bounded by time and memory; the newest frame always stays
+            while len(self._buffer) > 1 and (self._buffer_bytes > self.max_bytes or
+                                             self._buffer[0][0] < now - self.pre_seconds):
+                _, old = self._buffer.popleft()
+                self._buffer_bytes -= len(old)
+            pre_roll = list(self._buffer) if recording and self._clip is None else None
+            first_event = self._event_ids[0] if self._event_ids else None
+
+        if not recording:
+            return
+        if pre_roll is not None:
+            # A new clip starts with everything still in the buffer
+            if not self._open(pre_roll, frame.shape, first_event):
+                return
+            for _, jpeg in pre_roll[:-1]:
+                self._writer.write(self._fit(cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8),
+                                                          cv2.IMREAD_COLOR)))
+        if self._writer is not None:
+            self._writer.write(self._fit(frame))
+
+    def _open(self, pre_roll, shape, event_id):
+        started = pre_roll[0][0]
+        # Play back at the rate frames were actually sampled; slow cameras
+        # deliver fewer than CLIP_FPS
+        fps = self.fps
+        if len(pre_roll) > 1 and pre_roll[-1][0] > started:
+            fps = min(self.fps, max(1.0, (len(pre_roll) - 1) / (pre_roll[-1][0] - started)))
+        os.makedirs(self.clips_dir, exist_ok=True)
+        stamp = datetime.fromtimestamp(started).strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.clips_dir, f"clip_{event_id or 0}_{_safe(self.camera)}_{stamp}.avi")
+        self._size = (shape[1], shape[0])
+        # VideoWriter picks the container from the extension, so keep ".avi" last
+        self._writer = cv2.VideoWriter(_part_path(path), cv2.VideoWriter_fourcc(*"MJPG"),
+                                       fps, self._size)
+        if not self._writer.isOpened():
+            print(f"Error: Could not open clip {path} for writing.")
+            self._writer = None
+            with self._lock:
+                self._end_time = 0.0
+                self._event_ids = []
+            return False
+        self._clip = (path, started)
+        return True
+
+    def _fit(self, frame):
+        if (frame.shape[1], frame.shape[0]) != self._size:
+            frame = cv2.resize(frame, self._size)
+        return frame
+
+    def _finish(self):
+        with self._lock:
+            event_ids, self._event_ids = self._event_ids, []
+            self._end_time = 0.0
+        writer, self._writer = self._writer, None
+        clip, self._clip = self._clip, None
+        if writer is None or clip is None:
+            return
+        writer.release()
+        path = clip[0]
+        try:
+            os.replace(_part_path(path), path)
+        except OSError as e:
+            print(f"Error: Could not save clip {path}: {e}")
+            return
+        self.clips_written += 1
+        if event_ids:
+            # Relative to the logs directory, like image paths
+            clip_path = os.path.relpath(path, os.path.dirname(self.clips_dir)).replace(os.sep, "/")
+            (self.store or get_event_store()).set_clip(event_ids, clip_path)
+
+    def close(self):
+        """Stops sampling and finishes the clip being written, if any."""
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+
+
+def _part_path(path):
+    root, ext = os.path.splitext(path)
+    return root + ".part" + ext
+
+
+def _safe(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(name))
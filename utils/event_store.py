@@ -0,0 +1,254 @@
+# event_store.py
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+DB_FILE = os.path.join("logs", "events.db")
+
+# image_path and clip_path are relative to the logs directory,
+# e.g. "images/intrusion_12_....jpg" and "clips/clip_12_....avi"
+Event = namedtuple("Event", ["id", "timestamp", "event", "image_path", "camera", "clip_path"])
+
+COLUMNS = "id, timestamp, event, image_path, camera, clip_path"
+
+
+class EventStore:
+    """
+    Append-only intrusion event log backed by SQLite in WAL mode.
+
+    Each append is a single indexed insert, event IDs are persistent and
+    monotonic across restarts (AUTOINCREMENT), and one connection guarded by a
+    lock makes the store safe to use from several threads.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    image_path TEXT,
+                    camera TEXT,
+                    clip_path TEXT
+                )
+            """)
+            # Databases created before clips were recorded lack the column
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(events)")}
+            if "clip_path" not in columns:
+                self._conn.execute("ALTER TABLE events ADD COLUMN clip_path TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp)"
+            )
+            # Evicting a snapshot unlinks every event that shares it
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_image_path ON events (image_path)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.commit()
+
+    def append(self, event, timestamp=None, image_path=None, camera=None):
+        """
+        Stores a new event.
+
+        Returns:
+            int: The event's persistent ID
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO events (timestamp, event, image_path, camera) VALUES (?, ?, ?, ?)",
+                (timestamp.isoformat(sep=" ", timespec="seconds"), event, image_path, camera),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def set_image(self, event_id, image_path):
+        """Links an image (path relative to the logs directory) to an event."""
+        with self._lock:
+            self._conn.execute("UPDATE events SET image_path = ? WHERE id = ?", (image_path, event_id))
+            self._conn.commit()
+
+    def oldest_images(self, limit=100, after_id=0, end=None):
+        """
+        Fetches the oldest events that still have an image.
+
+        Args:
+            limit (int): Maximum number of events
+            after_id (int): Only events with a higher ID, to continue a scan
+            end (datetime, optional): Only events logged before this time
+
+        Returns:
+            List[tuple]: (id, image_path) pairs, oldest first
+        """
+        sql = "SELECT id, image_path FROM events WHERE id > ? AND image_path IS NOT NULL"
+        params = [after_id]
+        if end is not None:
+            sql += " AND timestamp < ?"
+            params.append(end.isoformat(sep=" ", timespec="seconds"))
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def clear_images(self, image_paths):
+        """
+        Unlinks images, e.g. deleted snapshots, from every event referring to them.
+
+        Returns:
+            int: Number of events changed
+        """
+        with self._lock:
+            cursor = self._conn.executemany("UPDATE events SET image_path = NULL WHERE image_path = ?",
+                                            [(path,) for path in image_paths])
+            self._conn.commit()
+            return cursor.rowcount
+
+    def set_clip(self, event_ids, clip_path):
+        """Links a video clip (path relative to the logs directory) to events."""
+        with self._lock:
+            self._conn.executemany("UPDATE events SET clip_path = ? WHERE id = ?",
+                                   [(clip_path, event_id) for event_id in event_ids])
+            self._conn.commit()
+
+    def get_meta(self, key, default=None):
+        """Reads a small persistent value, e.g. the ID of the last exported event."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+            )
+            self._conn.commit()
+
+    def _where(self, start=None, end=None, since_id=None, until_id=None, camera=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.isoformat(sep=" ", timespec="seconds"))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end.isoformat(sep=" ", timespec="seconds"))
+        if since_id is not None:
+            clauses.append("id > ?")
+            params.append(since_id)
+        if until_id is not None:
+            clauses.append("id <= ?")
+            params.append(until_id)
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(camera)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        """
+        Args:
+            **filters: start, end (datetime), since_id, until_id (int), camera (str)
+
+        Returns:
+            int: Number of matching events
+        """
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events" + where, params).fetchone()[0]
+
+    def last_id(self):
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def cameras(self):
+        """
+        Returns:
+            List[str]: Names of the cameras that logged events, sorted
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT camera FROM events WHERE camera IS NOT NULL ORDER BY camera"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def query(self, limit=None, offset=0, newest_first=True, **filters):
+        """
+        Fetches one page of events.
+
+        Args:
+            limit (int, optional): Maximum number of events
+            offset (int): Number of matching events to skip
+            newest_first (bool): Sort order by ID
+            **filters: start, end (datetime), since_id, until_id (int), camera (str)
+
+        Returns:
+            List[Event]: Matching events
+        """
+        where, params = self._where(**filters)
+        sql = ("SELECT " + COLUMNS + " FROM events" + where +
+               " ORDER BY id " + ("DESC" if newest_first else "ASC"))
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_to_event(row) for row in rows]
+
+    def iter_events(self, batch_size=500, newest_first=True, **filters):
+        """
+        Yields all matching events, reading them from disk in batches.
+        """
+        last_id = None
+        while True:
+            where, params = self._where(**filters)
+            if last_id is not None:
+                # Keyset pagination keeps every batch an index range scan
+                where += (" AND " if where else " WHERE ") + ("id < ?" if newest_first else "id > ?")
+                params.append(last_id)
+            sql = ("SELECT " + COLUMNS + " FROM events" + where +
+                   " ORDER BY id " + ("DESC" if newest_first else "ASC") + " LIMIT ?")
+            params.append(batch_size)
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _to_event(row)
+            last_id = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _to_event(row):
+    return Event(row[0], datetime.fromisoformat(row[1]), *row[2:])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_event_store():
+    """
+    Returns the process-wide event store, opening it on first use.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore()
+        return _store
@@ -0,0 +1,110 @@
+# exporter.py
+import csv
+import io
+import os
+import zipfile
+from collections import namedtuple
+from utils.event_store import get_event_store
+from utils.logger import LOG_DIR
+
+LAST_EXPORT_KEY = "last_export_id"
+
+ExportResult = namedtuple("ExportResult", ["events", "images", "last_id", "clips"])
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_events(zip_path, store=None, since_last_export=False, start=None, end=None,
+                  progress=None, should_cancel=None):
+    """
+    Streams intrusion events, their images and video clips into a ZIP file.
+
+    CSV rows are written straight into the archive from the event store and
+    every image is read once, directly into the archive, with nothing staged
+    in temporary directories. The ZIP is written under a temporary name and
+    only moved into place when complete.
+
+    Args:
+        zip_path (str): Destination file
+        store (EventStore, optional): Defaults to the process-wide store
+        since_last_export (bool): Only export events newer than the last
+            export. Every export not limited to a date range moves that mark.
+        start, end (datetime, optional): Only export events in [start, end)
+        progress (callable, optional): Called as progress(done, total)
+        should_cancel (callable, optional): Returns True to abort the export
+
+    Returns:
+        ExportResult: Number of events, images and clips written, last exported ID
+    """
+    store = store or get_event_store()
+
+    # Pin the upper bound so events logged during the export do not change it
+    filters = {"until_id": store.last_id(), "start": start, "end": end}
+    if since_last_export:
+        filters["since_id"] = int(store.get_meta(LAST_EXPORT_KEY, 0))
+
+    count = store.count(**filters)
+    total = 2 * count  # one step per CSV row, one per image/clip lookup
+    done = 0
+
+    def step():
+        nonlocal done
+        done += 1
+        if should_cancel and should_cancel():
+            raise ExportCancelled()
+        if progress and (done % 50 == 0 or done == total):
+            progress(done, total)
+
+    tmp_path = zip_path + ".part"
+    images = set()  # near-duplicate events share a snapshot
+    clips = set()  # one clip can cover several events
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            with zf.open("intrusion_log.csv", "w") as raw:
+                with io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                    writer = csv.writer(text)
+                    writer.writerow(["S.No", "Date", "Time", "Event", "Camera", "Image File", "Clip File"])
+                    for record in store.iter_events(newest_first=False, **filters):
+                        image_file = os.path.basename(record.image_path) if record.image_path else "No image"
+                        writer.writerow([
+                            record.id,
+                            record.timestamp.strftime("%Y-%m-%d"),
+                            record.timestamp.strftime("%H:%M:%S"),
+                            record.event,
+                            record.camera or "",
+                            image_file,
+                            os.path.basename(record.clip_path) if record.clip_path else "",
+                        ])
+                        step()
+
+            for record in store.iter_events(newest_first=False, **filters):
+                if record.image_path and record.image_path not in images:
+                    image_path = os.path.join(LOG_DIR, record.image_path)
+                    if os.path.exists(image_path):
+                        # JPEGs are already compressed; store them as-is
+                        zf.write(image_path, "images/" + os.path.basename(record.image_path),
+                                 compress_type=zipfile.ZIP_STORED)
+                        images.add(record.image_path)
+                if record.clip_path and record.clip_path not in clips:
+                    clip_path = os.path.join(LOG_DIR, record.clip_path)
+                    if os.path.exists(clip_path):
+                        zf.write(clip_path, "clips/" + os.path.basename(record.clip_path),
+                                 compress_type=zipfile.ZIP_STORED)
+                        clips.add(record.clip_path)
+                step()
+
+        os.replace(tmp_path, zip_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if progress:
+        progress(total, total)
+
+    last_id = filters["until_id"]
+    if start is None and end is None:
+        store.set_meta(LAST_EXPORT_KEY, last_id)
+    return ExportResult(count, len(images), last_id, len(clips))
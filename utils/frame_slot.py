@@ -0,0 +1,85 @@
+# frame_slot.py
+import threading
+
+
+class LatestFrameSlot:
+    """
+    Single-entry hand-off between a frame producer and its consumers.
+
+    Every put() overwrites the previous frame, so a slow consumer always gets
+    the newest frame instead of working through a backlog of stale ones.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._taken_seq = 0
+        self._closed = False
+        self._listeners = []
+        self.dropped = 0
+
+    def add_listener(self, event):
+        """
+        Registers a threading.Event that is set whenever a frame is put.
+
+        Lets one consumer wait on several slots at once.
+        """
+        with self._cond:
+            self._listeners.append(event)
+
+    def put(self, frame):
+        """
+        Stores a frame, replacing whatever was there.
+
+        Returns:
+            int: Sequence number assigned to the frame
+        """
+        with self._cond:
+            if self._seq > self._taken_seq:
+                # The previous frame was never taken by a consumer
+                self.dropped += 1
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+            for event in self._listeners:
+                event.set()
+            return self._seq
+
+    def latest(self):
+        """
+        Returns the newest frame without consuming it.
+
+        Returns:
+            tuple: (seq, frame), frame is None if nothing was put yet
+        """
+        with self._cond:
+            return self._seq, self._frame
+
+    def take(self, timeout=None):
+        """
+        Waits for a frame that no consumer has taken yet and consumes it.
+
+        Args:
+            timeout (float, optional): Seconds to wait before giving up
+
+        Returns:
+            tuple: (seq, frame), or (None, None) on timeout, or once the
+                slot is closed and its last frame was taken
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._closed or self._seq > self._taken_seq, timeout
+            )
+            if not ready or self._seq == self._taken_seq:
+                return None, None
+            self._taken_seq = self._seq
+            return self._seq, self._frame
+
+    def close(self):
+        """Wakes up all waiting consumers; take() no longer blocks afterwards."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            for event in self._listeners:
+                event.set()
@@ -1,16 +1,19 @@
 # geometry.py
-def is_inside_roi(center, roi):
+import numpy as np
+
+def box_centers(detections):
     """
-    Check if a point lies within a rectangular ROI.
+    Computes the center point of every box.
 
     Args:
-        center (tuple): (x, y) coordinates of point (e.g. person's center)
-        roi (tuple): ((x1, y1), (x2, y2)) coordinates of the ROI
+        detections (numpy.ndarray): (N, 4+) array whose first columns are x1, y1, x2, y2
 
     Returns:
-        bool: True if point is inside ROI
+        numpy.ndarray: (N, 2) array of (cx, cy)
     """
-    x, y = center
-    (x1, y1), (x2, y2) = roi
-
-    return x1 <= x <= x2 and y1 <= y <= y2
+    detections = np.asarray(detections, dtype=np.float32)
+    return np.stack(
+        ((detections[:, 0] + detections[:, 2]) * 0.5,
+         (detections[:, 1] + detections[:, 3]) * 0.5),
+        axis=1,
+    ) if len(detections) else np.zeros((0, 2), dtype=np.float32)
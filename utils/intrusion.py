@@ -0,0 +1,91 @@
+# intrusion.py
+from collections import namedtuple
+from time import time
+import numpy as np
+from utils.geometry import box_centers
+from utils.zones import ZoneSet
+
+# membership: (N, M) bool, person i inside zone j
+# inside:     (N,) bool, person inside any zone that raises alerts
+# alerts:     zones whose alert is due on this frame
+IntrusionResult = namedtuple("IntrusionResult", ["membership", "inside", "alerts"])
+
+
+class IntrusionMonitor:
+    """
+    Decides which people are intruders and when an alert is due.
+
+    Holds no GUI state so the same logic backs the PyQt window and the
+    headless daemon. With tracked input (a track ID in column 5) a zone
+    alerts once when a track enters it, however long that person stays;
+    the zone's cooldown then only merges entries that happen close together.
+    Untracked input falls back to alerting on occupancy, throttled by the
+    cooldown alone.
+    """
+
+    def __init__(self, zones=None, forget_after=10.0):
+        self.zones = zones if zones is not None else ZoneSet()
+        self.forget_after = forget_after  # seconds before an unseen track is forgotten
+        self.last_alert_time = {}  # zone -> time of its last alert
+        self._track_zones = {}  # track id -> (zone bit mask, last seen time)
+
+    def check(self, people, frame_shape, now=None):
+        """
+        Tests people against the zones.
+
+        Args:
+            people (numpy.ndarray): (N, 6) tracks (x1, y1, x2, y2, score, id)
+                or (N, 5) untracked detections
+            frame_shape (tuple): Shape of the frame the boxes belong to
+            now (float, optional): Current time, defaults to time()
+
+        Returns:
+            IntrusionResult: Zone membership, intruder mask and due alerts
+        """
+        if now is None:
+            now = time()
+
+        zones = self.zones.zones
+        if zones and len(people):
+            membership = self.zones.membership(box_centers(people), frame_shape)
+        else:
+            membership = np.zeros((len(people), len(zones)), dtype=bool)
+
+        alerting = np.array([zone.alert for zone in zones], dtype=bool)
+        inside = (membership & alerting).any(axis=1) if zones else np.zeros(len(people), dtype=bool)
+
+        if people.shape[1] >= 6:
+            triggered = self._entries(people[:, 5].astype(int), membership, now)
+        else:
+            triggered = membership.any(axis=0) if len(people) else np.zeros(len(zones), dtype=bool)
+
+        alerts = []
+        for zone, is_triggered in zip(zones, triggered):
+            if not (zone.alert and is_triggered):
+                continue
+            if now - self.last_alert_time.get(zone, 0) >= zone.cooldown:
+                self.last_alert_time[zone] = now
+                alerts.append(zone)
+
+        return IntrusionResult(membership, inside, alerts)
+
+    def _entries(self, track_ids, membership, now):
+        # Returns per zone whether some track entered it since the last check
+        entered = np.zeros(membership.shape[1], dtype=bool)
+        weights = np.uint64(1) << np.arange(membership.shape[1], dtype=np.uint64)
+        for track_id, row in zip(track_ids.tolist(), membership):
+            bits = int((row.astype(np.uint64) * weights).sum())
+            previous, _ = self._track_zones.get(track_id, (0, now))
+            new_bits = bits & ~previous
+            if new_bits:
+                entered |= ((new_bits >> np.arange(membership.shape[1])) & 1).astype(bool)
+            self._track_zones[track_id] = (bits, now)
+
+        stale = [tid for tid, (_, seen) in self._track_zones.items() if now - seen > self.forget_after]
+        for track_id in stale:
+            del self._track_zones[track_id]
+        return entered
+
+    def reset(self):
+        self.last_alert_time = {}
+        self._track_zones = {}
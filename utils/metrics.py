@@ -0,0 +1,239 @@
+# metrics.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from config.settings import (METRICS_ENABLED, METRICS_HISTOGRAM_SIZE, METRICS_DUMP_INTERVAL,
+                             METRICS_FILE, METRICS_HTTP_PORT)
+
+PREFIX = "htd"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Latency samples in a fixed-size ring buffer.
+
+    observe() is a single array store, so it is cheap enough for the per-frame
+    path; percentiles are computed over the most recent samples on demand.
+    count and total cover every sample ever observed.
+    """
+
+    def __init__(self, size=METRICS_HISTOGRAM_SIZE):
+        self._values = np.zeros(size, dtype=np.float64)
+        self._index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self._values[self._index] = seconds
+        self._index = (self._index + 1) % len(self._values)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, sum, mean (s) and 0.5/0.95/0.99 quantiles (s) of the recent samples
+        """
+        recent = self._values[:min(self.count, len(self._values))]
+        if not len(recent):
+            quantiles = [0.0] * len(QUANTILES)
+            mean = 0.0
+        else:
+            quantiles = np.quantile(recent, QUANTILES).tolist()
+            mean = float(recent.mean())
+        return {"count": self.count, "sum": self.total, "mean": mean,
+                **{q: v for q, v in zip(QUANTILES, quantiles)}}
+
+
+class MetricsRegistry:
+    """
+    Per-stage latency histograms and event counters, keyed by name and camera.
+
+    Stage names are dotted, e.g. "display.resize" or "detect". When disabled
+    every call returns immediately, so instrumented code pays next to nothing.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, histogram_size=METRICS_HISTOGRAM_SIZE):
+        self.enabled = enabled
+        self.histogram_size = histogram_size
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}  # (stage, camera) -> Histogram
+        self._counters = {}  # (name, camera) -> int
+
+    def observe(self, stage, seconds, camera=None):
+        """Records one latency sample of a stage, in seconds."""
+        if not self.enabled:
+            return
+        key = (stage, camera)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.histogram_size)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage, camera=None):
+        """Times the enclosed block as one sample of `stage`."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, camera)
+
+    def inc(self, name, amount=1, camera=None):
+        """Adds to a counter, e.g. "frames_captured" or "alerts"."""
+        if not self.enabled or not amount:
+            return
+        key = (name, camera)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def summary(self, stage, camera=None):
+        """
+        Returns:
+            dict: Histogram.summary() of the stage, or None if it has no samples
+        """
+        with self._lock:
+            histogram = self._histograms.get((stage, camera))
+            return histogram.summary() if histogram else None
+
+    def counter(self, name, camera=None):
+        with self._lock:
+            return self._counters.get((name, camera), 0)
+
+    def to_prometheus(self):
+        """
+        Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Stage latencies as one summary, counters as *_total series
+        """
+        with self._lock:
+            histograms = {key: h.summary() for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        def labels(**values):
+            pairs = [f'{k}="{_escape(v)}"' for k, v in values.items() if v is not None]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        name = f"{PREFIX}_stage_latency_seconds"
+        lines = [f"# HELP {name} Per-stage latency, quantiles over the most recent samples",
+                 f"# TYPE {name} summary"]
+        for (stage, camera), s in sorted(histograms.items(), key=_sort_key):
+            for q in QUANTILES:
+                lines.append(f"{name}{labels(stage=stage, camera=camera, quantile=q)} {s[q]:.6f}")
+            lines.append(f"{name}_sum{labels(stage=stage, camera=camera)} {s['sum']:.6f}")
+            lines.append(f"{name}_count{labels(stage=stage, camera=camera)} {s['count']}")
+
+        for counter in sorted({key[0] for key in counters}):
+            name = f"{PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            for (counter_name, camera), value in sorted(counters.items(), key=_sort_key):
+                if counter_name == counter:
+                    lines.append(f"{name}{labels(camera=camera)} {value}")
+
+        name = f"{PREFIX}_uptime_seconds"
+        lines += [f"# TYPE {name} gauge", f"{name} {time.time() - self.started:.0f}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sort_key(item):
+    (name, camera), _ = item
+    return name, "" if camera is None else str(camera)
+
+
+class MetricsExporter:
+    """
+    Publishes the registry periodically to a text file and/or serves it on a
+    localhost HTTP endpoint (GET /metrics) for Prometheus to scrape.
+    """
+
+    def __init__(self, registry, path=METRICS_FILE, port=METRICS_HTTP_PORT,
+                 interval=METRICS_DUMP_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.port:
+            registry = self.registry
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = registry.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # keep scrapes out of the console
+
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            except OSError as e:
+                print(f"Error: Could not serve metrics on port {self.port}: {e}")
+                self._server = None
+
+        if self.path:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        """Writes the metrics file atomically."""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.registry.to_prometheus())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error: Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self.dump()  # leave the final numbers behind
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics registry.
+    """
+    return _registry
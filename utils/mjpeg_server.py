@@ -0,0 +1,281 @@
+# mjpeg_server.py
+import html
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+import cv2
+from utils.metrics import get_metrics
+from config.settings import (MJPEG_HTTP_PORT, MJPEG_HOST, MJPEG_FPS, MJPEG_QUALITY, MJPEG_MAX_WIDTH,
+                             MJPEG_STREAM_LIMITS, MJPEG_MAX_CLIENTS, MJPEG_CLIENT_TIMEOUT)
+
+BOUNDARY = "frame"
+
+
+class MjpegStream:
+    """
+    One camera's annotated live view, encoded once for all of its clients.
+
+    An encoder thread pulls the newest annotated frame from `source` at most
+    `fps` times a second, and only while someone is watching, so the
+    detection path never waits for it. Each JPEG is published as a single
+    bytes object that every client sends as is. A client always takes the
+    newest JPEG when it is ready for the next one; whatever was encoded while
+    it was still sending is skipped, so a slow viewer lowers its own frame
+    rate and nobody else's.
+    """
+
+    def __init__(self, name, source, fps=MJPEG_FPS, quality=MJPEG_QUALITY, max_width=MJPEG_MAX_WIDTH):
+        """
+        Args:
+            name (str): Camera name, shown to viewers
+            source (callable): source(max_width) -> (seq, BGR frame); returns
+                a private frame the stream may keep, or None for no frame yet
+            fps (float): Most frames encoded per second
+            quality (int): JPEG quality
+            max_width (int): Frames wider than this are downscaled
+        """
+        self.name = name
+        self.source = source
+        self.fps = fps
+        self.quality = quality
+        self.max_width = max_width
+        self.metrics = get_metrics()
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._seq = 0  # number of JPEGs encoded
+        self._clients = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"mjpeg-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        interval = 1.0 / self.fps if self.fps and self.fps > 0 else 0
+        next_encode = time.monotonic()
+        source_seq = None
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._clients or self._closed)
+                if self._closed:
+                    return
+                delay = next_encode - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)  # close() cuts this short
+                    if self._closed:
+                        return
+            next_encode = max(next_encode + interval, time.monotonic())
+
+            try:
+                seq, frame = self.source(self.max_width)
+            except Exception as e:
+                print(f"Error: MJPEG stream {self.name} could not render a frame: {e}")
+                continue
+            if frame is None or seq == source_seq:
+                continue  # nothing new since the last JPEG
+            source_seq = seq
+
+            started = time.perf_counter()
+            ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)])
+            self.metrics.observe("mjpeg.encode", time.perf_counter() - started, self.name)
+            if not ok:
+                continue
+            jpeg = buffer.tobytes()
+            with self._cond:
+                self._jpeg = jpeg
+                self._seq += 1
+                self._cond.notify_all()
+
+    def wait_frame(self, after_seq, timeout=None):
+        """
+        Waits for a JPEG newer than after_seq.
+
+        Returns:
+            tuple: (seq, JPEG bytes); the same after_seq and None on timeout,
+                None and None once the stream is closed
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq or self._closed, timeout)
+            if self._closed:
+                return None, None
+            if self._seq <= after_seq:
+                return after_seq, None
+            return self._seq, self._jpeg
+
+    def add_client(self):
+        with self._cond:
+            self._clients += 1
+            self._cond.notify_all()
+
+    def remove_client(self):
+        with self._cond:
+            self._clients -= 1
+
+    @property
+    def clients(self):
+        return self._clients
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+class MjpegServer:
+    """
+    Serves the cameras' annotated live views as MJPEG over HTTP.
+
+    GET / lists the streams, /stream/<camera> is a multipart/x-mixed-replace
+    stream any browser or video player can show, and /snapshot/<camera>.jpg
+    is the newest single frame. Nothing runs without a port.
+    """
+
+    def __init__(self, host=MJPEG_HOST, port=MJPEG_HTTP_PORT, max_clients=MJPEG_MAX_CLIENTS,
+                 client_timeout=MJPEG_CLIENT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.max_clients = max_clients
+        self.client_timeout = client_timeout
+        self.streams = {}  # URL slug -> MjpegStream
+        self._server = None
+        self._clients = 0
+        self._lock = threading.Lock()
+
+    def add_stream(self, name, source, **limits):
+        """
+        Registers a camera; MJPEG_STREAM_LIMITS[name] and limits override
+        the default fps, quality and max_width.
+
+        Returns:
+            MjpegStream: The stream, started with the server
+        """
+        options = {**MJPEG_STREAM_LIMITS.get(name, {}), **limits}
+        stream = MjpegStream(name, source, **options)
+        slug = _slug(name)
+        while slug in self.streams:
+            slug += "_"
+        self.streams[slug] = stream
+        if self._server:
+            stream.start()
+        return stream
+
+    def start(self):
+        if not self.port:
+            return self
+        server = self
+        client_timeout = self.client_timeout
+
+        class Handler(BaseHTTPRequestHandler):
+            timeout = client_timeout  # a stalled client times out instead of hanging on
+
+            def do_GET(self):
+                path = self.path.split("?")[0].rstrip("/")
+                if path == "":
+                    server._index(self)
+                elif path.startswith("/stream/") and path[len("/stream/"):] in server.streams:
+                    server._serve(self, server.streams[path[len("/stream/"):]], single=False)
+                elif (path.startswith("/snapshot/") and path.endswith(".jpg")
+                      and path[len("/snapshot/"):-len(".jpg")] in server.streams):
+                    server._serve(self, server.streams[path[len("/snapshot/"):-len(".jpg")]], single=True)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass  # keep viewers out of the console
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"Error: Could not serve the live view on port {self.port}: {e}")
+            return self
+        self._server.daemon_threads = True
+        for stream in self.streams.values():
+            stream.start()
+        threading.Thread(target=self._server.serve_forever, name="mjpeg-server", daemon=True).start()
+        print(f"Live view at http://{self.host}:{self.port}/")
+        return self
+
+    def _index(self, handler):
+        items = "".join(
+            f'<h3>{html.escape(stream.name)}</h3><img src="/stream/{quote(slug)}" style="max-width:100%">'
+            for slug, stream in self.streams.items()
+        )
+        body = f"<!DOCTYPE html><html><head><title>Live View</title></head><body>{items}</body></html>"
+        body = body.encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _serve(self, handler, stream, single):
+        with self._lock:
+            if self._clients >= self.max_clients:
+                handler.send_error(503, "Too many viewers")
+                return
+            self._clients += 1
+        stream.add_client()
+        metrics = stream.metrics
+        try:
+            if single:
+                # Prefer a fresh frame; the last JPEG may be from before anyone watched
+                _, jpeg = stream.wait_frame(stream.seq, timeout=1.0)
+                if jpeg is None:
+                    _, jpeg = stream.wait_frame(0, timeout=self.client_timeout)
+                if jpeg is None:
+                    handler.send_error(503, "No frame yet")
+                    return
+                handler.send_response(200)
+                handler.send_header("Content-Type", "image/jpeg")
+                handler.send_header("Content-Length", str(len(jpeg)))
+                handler.send_header("Cache-Control", "no-store")
+                handler.end_headers()
+                handler.wfile.write(jpeg)
+                return
+
+            handler.send_response(200)
+            handler.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            handler.send_header("Cache-Control", "no-store")
+            handler.end_headers()
+            seq = 0
+            while True:
+                new_seq, jpeg = stream.wait_frame(seq, timeout=self.client_timeout)
+                if new_seq is None:
+                    return  # stream closed
+                if jpeg is None:
+                    continue  # no new frame, e.g. a frozen source
+                if seq and new_seq > seq + 1:
+                    metrics.inc("mjpeg_frames_skipped", new_seq - seq - 1, camera=stream.name)
+                seq = new_seq
+                handler.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n"
+                    .encode("ascii") + jpeg + b"\r\n"
+                )
+                metrics.inc("mjpeg_frames_sent", camera=stream.name)
+        except OSError:
+            pass  # viewer disconnected or stalled past the timeout
+        finally:
+            stream.remove_client()
+            with self._lock:
+                self._clients -= 1
+
+    def stop(self):
+        for stream in self.streams.values():
+            stream.close()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(name)).strip("_") or "camera"
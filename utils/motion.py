@@ -0,0 +1,113 @@
+# motion.py
+import time
+import cv2
+import numpy as np
+from utils.metrics import get_metrics
+
+
+class MotionGate:
+    """
+    Cheap pre-stage that decides whether a frame is worth running the model on.
+
+    Frames are downscaled to a small grayscale image and compared with the
+    frame the detector last ran on. Only the ROI (plus a margin) is measured,
+    so movement elsewhere in the view does not wake the model up. A keep-alive
+    forces a detection every few seconds even on a static scene. The
+    counters are also published as motion_gate_* metrics of the camera.
+    """
+
+    def __init__(self, threshold=0.005, pixel_threshold=25, keepalive=2.0,
+                 width=160, margin=0.15, camera=None):
+        self.threshold = threshold  # fraction of changed pixels that counts as motion
+        self.pixel_threshold = pixel_threshold  # gray-level difference per pixel
+        self.keepalive = keepalive  # seconds between forced detections
+        self.width = width  # width of the downscaled comparison image
+        self.margin = margin  # ROI margin as a fraction of the ROI size
+        self.camera = camera  # label for the metrics
+        self.metrics = get_metrics()
+
+        self.reference = None
+        self.last_detect_time = 0
+
+        self.hits = 0  # frames passed on because of motion
+        self.keepalives = 0  # frames passed on by the keep-alive
+        self.skips = 0  # frames where the model was skipped
+
+    def _downscale(self, frame):
+        h, w = frame.shape[:2]
+        scale = self.width / float(w)
+        small = cv2.resize(frame, (self.width, max(1, int(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0), scale
+
+    def _region(self, roi, scale, shape):
+        if not roi:
+            return slice(None), slice(None)
+        (x1, y1), (x2, y2) = roi
+        mx = (x2 - x1) * self.margin
+        my = (y2 - y1) * self.margin
+        h, w = shape
+        sx1 = int(max(0, (x1 - mx) * scale))
+        sy1 = int(max(0, (y1 - my) * scale))
+        sx2 = int(min(w, (x2 + mx) * scale + 1))
+        sy2 = int(min(h, (y2 + my) * scale + 1))
+        return slice(sy1, sy2), slice(sx1, sx2)
+
+    def should_detect(self, frame, roi=None, now=None):
+        """
+        Args:
+            frame (numpy.ndarray): BGR frame
+            roi (tuple, optional): ((x1, y1), (x2, y2)) in frame coordinates
+            now (float, optional): Current time, defaults to time.monotonic()
+
+        Returns:
+            bool: True if the detector should run on this frame
+        """
+        if now is None:
+            now = time.monotonic()
+        small, scale = self._downscale(frame)
+
+        if self.reference is None or self.reference.shape != small.shape:
+            self.reference = small
+            self.last_detect_time = now
+            self.hits += 1
+            self.metrics.inc("motion_gate_hits", camera=self.camera)
+            return True
+
+        rows, cols = self._region(roi, scale, small.shape)
+        diff = cv2.absdiff(small[rows, cols], self.reference[rows, cols])
+        changed = np.count_nonzero(diff > self.pixel_threshold) / max(1, diff.size)
+
+        if changed >= self.threshold:
+            self.hits += 1
+            self.metrics.inc("motion_gate_hits", camera=self.camera)
+        elif now - self.last_detect_time >= self.keepalive:
+            self.keepalives += 1
+            self.metrics.inc("motion_gate_keepalives", camera=self.camera)
+        else:
+            self.skips += 1
+            self.metrics.inc("motion_gate_skips", camera=self.camera)
+            return False
+
+        # Compare later frames against the one the detector last saw, so slow
+        # movement still adds up to a detection
+        self.reference = small
+        self.last_detect_time = now
+        return True
+
+    def reset(self):
+        self.reference = None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters of frames passed on and skipped
+        """
+        total = self.hits + self.keepalives + self.skips
+        return {
+            "hits": self.hits,
+            "keepalives": self.keepalives,
+            "skips": self.skips,
+            "skip_ratio": self.skips / total if total else 0.0,
+        }
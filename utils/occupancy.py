@@ -0,0 +1,336 @@
+# occupancy.py
+import os
+import re
+import threading
+import time
+from datetime import datetime
+import cv2
+import numpy as np
+from utils.geometry import box_centers
+from config.settings import (OCCUPANCY_ENABLED, OCCUPANCY_GRID_WIDTH, OCCUPANCY_MAX_GAP,
+                             OCCUPANCY_SAVE_INTERVAL)
+
+ANALYTICS_DIR = os.path.join("logs", "analytics")
+
+
+class ZoneDwell:
+    """Running dwell-time counters of one zone."""
+
+    def __init__(self, person_seconds=0.0, occupied_seconds=0.0, visits=0, longest=0.0):
+        self.person_seconds = person_seconds  # summed over everyone inside
+        self.occupied_seconds = occupied_seconds  # time with at least one person inside
+        self.visits = visits  # tracks that entered
+        self.longest = longest  # longest single stay, in seconds
+
+    def to_list(self):
+        return [self.person_seconds, self.occupied_seconds, self.visits, self.longest]
+
+
+class OccupancyMap:
+    """
+    Where and for how long people stand in front of one camera.
+
+    Every processed frame adds its duration to the heatmap cell under each
+    person's box center, so a cell holds person-seconds rather than a frame
+    count that depends on the detection rate. The grid is OCCUPANCY_GRID_WIDTH
+    cells wide with the frame's aspect ratio, and an update costs
+    O(people); nothing is ever recomputed from the event log. Gaps longer than
+    max_gap, e.g. while detection is stopped, are not counted.
+
+    Zone dwell times come from the zone membership the intrusion check
+    already computed. With tracked input a stay ends, and counts towards the
+    zone's longest stay, once its track is no longer inside.
+    """
+
+    def __init__(self, camera, grid_width=OCCUPANCY_GRID_WIDTH, max_gap=OCCUPANCY_MAX_GAP):
+        self.camera = camera
+        self.grid_width = grid_width
+        self.max_gap = max_gap
+        self.heatmap = None  # (rows, cols) float32 person-seconds, sized on the first frame
+        self.zones = {}  # zone name -> ZoneDwell
+        self.started = datetime.now()
+        self.version = 0  # bumped on every update, tells the saver what changed
+        self.heatmap_version = 0  # bumped when the heatmap changes, keys the display cache
+        self._lock = threading.Lock()
+        self._display_cache = {}  # (width, height) -> (heatmap_version, 1 - weight, colored * weight, colored)
+        self._last_update = None
+        self._stays = {}  # (track id, zone name) -> time the stay started
+
+    def update(self, people, frame_shape, membership, zone_names, now=None):
+        """
+        Adds one processed frame.
+
+        Args:
+            people (numpy.ndarray): (N, 6) tracks or (N, 5) detections in frame pixels
+            frame_shape (tuple): Shape of the frame the boxes belong to
+            membership (numpy.ndarray): (N, M) bool, person i inside zone j
+            zone_names (List[str]): Names of the M zones
+            now (float, optional): Current time, defaults to time.monotonic()
+        """
+        if now is None:
+            now = time.monotonic()
+        height, width = frame_shape[:2]
+        with self._lock:
+            previous, self._last_update = self._last_update, now
+            dt = 0.0 if previous is None else now - previous
+            if dt > self.max_gap:
+                dt = 0.0
+                self._end_stays(set(), previous)
+
+            if self.heatmap is None:
+                rows = max(1, int(round(self.grid_width * height / width)))
+                self.heatmap = np.zeros((rows, self.grid_width), dtype=np.float32)
+            if dt and len(people):
+                rows, cols = self.heatmap.shape
+                centers = box_centers(people)
+                x = np.clip((centers[:, 0] * cols / width).astype(np.intp), 0, cols - 1)
+                y = np.clip((centers[:, 1] * rows / height).astype(np.intp), 0, rows - 1)
+                np.add.at(self.heatmap, (y, x), dt)
+                self.heatmap_version += 1
+            self.version += 1
+
+            if membership.shape[1] != len(zone_names):
+                return  # zones changed since the check
+            inside = membership.sum(axis=0).tolist() if len(people) else [0] * len(zone_names)
+            for name, count in zip(zone_names, inside):
+                dwell = self.zones.get(name)
+                if dwell is None:
+                    dwell = self.zones[name] = ZoneDwell()
+                dwell.person_seconds += count * dt
+                if count:
+                    dwell.occupied_seconds += dt
+
+            current = set()
+            if len(people) and people.shape[1] >= 6:
+                for track_id, row in zip(people[:, 5].astype(int).tolist(), membership):
+                    for j in np.flatnonzero(row).tolist():
+                        key = (track_id, zone_names[j])
+                        current.add(key)
+                        if key not in self._stays:
+                            self._stays[key] = now
+                            self.zones[zone_names[j]].visits += 1
+            self._end_stays(current, now)
+
+    def _end_stays(self, current, now):
+        for key in [key for key in self._stays if key not in current]:
+            dwell = self.zones.get(key[1])
+            if dwell is not None:
+                dwell.longest = max(dwell.longest, now - self._stays[key])
+            del self._stays[key]
+
+    def pause(self):
+        """Ends all stays; the time until the next update is not counted."""
+        with self._lock:
+            self._end_stays(set(), time.monotonic())
+            self._last_update = None
+
+    def dwell(self):
+        """
+        Returns:
+            dict: zone name -> ZoneDwell copy, with stays in progress
+                counted towards the longest stay
+        """
+        now = time.monotonic()
+        with self._lock:
+            result = {name: ZoneDwell(*dwell.to_list()) for name, dwell in self.zones.items()}
+            for (_, name), since in self._stays.items():
+                if name in result:
+                    result[name].longest = max(result[name].longest, now - since)
+        return result
+
+    def heatmap_image(self, width, height, alpha=0.5, base=None):
+        """
+        Renders the heatmap for display.
+
+        The colored, resized heatmap is cached per output size until the
+        heatmap changes, so repaints and stream frames in between only blend.
+
+        Args:
+            width (int): Output width in pixels
+            height (int): Output height in pixels
+            alpha (float): Opacity of the hottest cells over base
+            base (numpy.ndarray, optional): BGR image of that size to blend into, in place
+
+        Returns:
+            numpy.ndarray: The BGR heatmap, or base with the heatmap blended in;
+                None before the first update
+        """
+        with self._lock:
+            if self.heatmap is None:
+                return base
+            version = self.heatmap_version
+            cached = self._display_cache.get((width, height))
+            heat = self.heatmap.copy() if cached is None or cached[0] != version else None
+        if heat is not None:
+            peak = float(heat.max())
+            if peak <= 0:
+                return base
+            # Log scale, so short visits still show next to where people stand all day
+            level = (np.log1p(heat) / np.log1p(peak)).astype(np.float32)
+            level = cv2.resize(level, (width, height), interpolation=cv2.INTER_LINEAR)
+            colored = cv2.applyColorMap((255 * level).astype(np.uint8), cv2.COLORMAP_JET)
+            weight = cv2.merge([np.float32(alpha) * level] * 3)
+            cached = (version, 1 - weight, colored * weight, colored)
+            with self._lock:
+                if len(self._display_cache) >= 4:
+                    self._display_cache.clear()  # the window was resized a few times
+                self._display_cache[(width, height)] = cached
+        _, keep, overlay, colored = cached
+        if base is None:
+            return colored
+        base[:] = cv2.add(cv2.multiply(base, keep, dtype=cv2.CV_32F), overlay).astype(np.uint8)
+        return base
+
+    def to_arrays(self):
+        """
+        Returns:
+            dict: The map as NumPy arrays, the layout of a saved snapshot
+        """
+        dwell = self.dwell()
+        with self._lock:
+            heatmap = self.heatmap.copy() if self.heatmap is not None else np.zeros((0, 0), np.float32)
+        return {
+            "camera": np.array(self.camera),
+            "started": np.array(self.started.isoformat(timespec="seconds")),
+            "saved": np.array(datetime.now().isoformat(timespec="seconds")),
+            "heatmap": heatmap,
+            "zone_names": np.array(list(dwell), dtype=str),
+            # person_seconds, occupied_seconds, visits, longest per zone
+            "zone_dwell": np.array([d.to_list() for d in dwell.values()], dtype=np.float64).reshape(-1, 4),
+        }
+
+    def save(self, path):
+        """Writes a compressed snapshot, replacing the previous one atomically."""
+        arrays = self.to_arrays()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """
+        Continues from a saved snapshot, if there is one for the same grid width.
+
+        Returns:
+            bool: Whether the snapshot was loaded
+        """
+        try:
+            with np.load(path) as data:
+                heatmap = data["heatmap"]
+                names = data["zone_names"].tolist()
+                dwell = data["zone_dwell"]
+                started = datetime.fromisoformat(str(data["started"]))
+        except FileNotFoundError:
+            return False
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error: Could not load occupancy snapshot {path}: {e}")
+            return False
+        if heatmap.ndim != 2 or heatmap.shape[1] != self.grid_width:
+            return False
+        with self._lock:
+            self.heatmap = heatmap.astype(np.float32)
+            self.zones = {name: ZoneDwell(float(row[0]), float(row[1]), int(row[2]), float(row[3]))
+                          for name, row in zip(names, dwell)}
+            self.started = started
+            self.version += 1
+            self.heatmap_version += 1
+        return True
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
+
+
+def snapshot_path(camera, directory=ANALYTICS_DIR):
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(camera)).strip("_") or "camera"
+    return os.path.join(directory, f"occupancy_{slug}.npz")
+
+
+class OccupancyStore:
+    """
+    The occupancy maps of all cameras, saved every save_interval seconds.
+
+    Each camera's map continues from its last snapshot in directory, so
+    the heatmap and dwell counters survive restarts.
+    """
+
+    def __init__(self, directory=ANALYTICS_DIR, save_interval=OCCUPANCY_SAVE_INTERVAL):
+        self.directory = directory
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._maps = {}  # camera -> OccupancyMap
+        self._saved_versions = {}  # camera -> version of the last snapshot
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="occupancy-saver", daemon=True)
+        self._thread.start()
+
+    def get(self, camera):
+        """
+        Returns:
+            OccupancyMap: The camera's map, loaded from its snapshot on first use
+        """
+        with self._lock:
+            occupancy = self._maps.get(camera)
+            if occupancy is None:
+                occupancy = self._maps[camera] = OccupancyMap(camera)
+                if occupancy.load(snapshot_path(camera, self.directory)):
+                    self._saved_versions[camera] = occupancy.version
+            return occupancy
+
+    def _run(self):
+        while not self._stop.wait(self.save_interval):
+            self.save_all()
+
+    def save_all(self):
+        """Writes a snapshot of every map that changed since the last one."""
+        with self._lock:
+            maps = list(self._maps.items())
+        for camera, occupancy in maps:
+            version = occupancy.version
+            if self._saved_versions.get(camera) == version:
+                continue
+            try:
+                occupancy.save(snapshot_path(camera, self.directory))
+                self._saved_versions[camera] = version
+            except OSError as e:
+                print(f"Error: Could not save occupancy snapshot for {camera}: {e}")
+
+    def close(self):
+        """Stops the saver thread after a final snapshot."""
+        self._stop.set()
+        self._thread.join()
+        self.save_all()
+
+
+_occupancy_store = None
+_occupancy_store_lock = threading.Lock()
+
+
+def get_occupancy(camera):
+    """
+    Returns a camera's occupancy map, or None with OCCUPANCY_ENABLED off.
+    """
+    global _occupancy_store
+    if not OCCUPANCY_ENABLED:
+        return None
+    with _occupancy_store_lock:
+        if _occupancy_store is None:
+            _occupancy_store = OccupancyStore()
+    return _occupancy_store.get(camera)
+
+
+def close_occupancy():
+    """Saves the final snapshots and stops the saver thread."""
+    global _occupancy_store
+    with _occupancy_store_lock:
+        store, _occupancy_store = _occupancy_store, None
+    if store is not None:
+        store.close()
@@ -0,0 +1,89 @@
+# pipeline.py
+import numpy as np
+from utils.motion import MotionGate
+from utils.tracker import ByteTracker
+from utils.roi_crop import roi_crop, full_frame
+from config.settings import (MOTION_GATE_ENABLED, MOTION_THRESHOLD, MOTION_KEEPALIVE,
+                             MOTION_ROI_MARGIN, TRACKER_ENABLED, DETECT_STRIDE,
+                             TRACK_HIGH_THRESHOLD, TRACK_MAX_AGE, ROI_INFERENCE_ENABLED,
+                             DETECTOR_INPUT_SIZE)
+
+DETECT = "detect"  # run the model on this frame
+PREDICT = "predict"  # let the tracker move the boxes along instead
+REUSE = "reuse"  # static scene: keep the previous result
+
+
+class SourcePipeline:
+    """
+    Per-camera state between the frame source and the zone check.
+
+    plan() decides what a frame needs (model run, tracker prediction, or
+    nothing) and apply() turns that into the current list of people. Neither
+    touches the model itself, so callers can batch the DETECT frames of many
+    cameras into one inference call.
+    """
+
+    def __init__(self, zones=None, motion_gate=MOTION_GATE_ENABLED,
+                 tracking=TRACKER_ENABLED, stride=DETECT_STRIDE, roi_inference=ROI_INFERENCE_ENABLED,
+                 input_size=DETECTOR_INPUT_SIZE, camera=None):
+        self.zones = zones
+        self.roi_inference = roi_inference
+        self.input_size = input_size  # the detector's full-frame input size
+        self.gate = MotionGate(threshold=MOTION_THRESHOLD, keepalive=MOTION_KEEPALIVE,
+                               margin=MOTION_ROI_MARGIN, camera=camera) if motion_gate else None
+        # Without a tracker there is nothing to interpolate with, so every frame is detected
+        self.stride = max(1, stride) if tracking else 1
+        self.tracker = ByteTracker(high_threshold=TRACK_HIGH_THRESHOLD, max_age=TRACK_MAX_AGE,
+                                   coast_frames=self.stride - 1) if tracking else None
+        self.frame_index = 0
+        self.last_result = np.zeros((0, 6 if tracking else 5), dtype=np.float32)
+
+    def plan(self, frame):
+        """
+        Returns:
+            str: DETECT, PREDICT or REUSE
+        """
+        roi = self.zones.bounding_rect(frame.shape) if self.zones else None
+        if self.gate and not self.gate.should_detect(frame, roi):
+            return REUSE
+        self.frame_index += 1
+        if (self.frame_index - 1) % self.stride:
+            return PREDICT
+        return DETECT
+
+    def detector_input(self, frame):
+        """
+        Returns:
+            RoiCrop: What the model should see of a DETECT frame - the zones'
+                region with ROI inference, else the whole frame. Detections
+                of the crop go through roi_crop.to_frame before apply().
+        """
+        if self.roi_inference:
+            return roi_crop(frame, self.zones, base_size=self.input_size)
+        return full_frame(frame)
+
+    def apply(self, action, detections=None):
+        """
+        Args:
+            action (str): What plan() returned for the frame
+            detections (numpy.ndarray, optional): (N, 5) model output for DETECT
+
+        Returns:
+            numpy.ndarray: (N, 6) tracked rows (x1, y1, x2, y2, score, track_id),
+                or (N, 5) detections when tracking is disabled
+        """
+        if action == DETECT:
+            self.last_result = self.tracker.update(detections) if self.tracker else detections
+        elif action == PREDICT and self.tracker:
+            self.last_result = self.tracker.predict()
+        return self.last_result
+
+    def reset(self):
+        if self.gate:
+            self.gate.reset()
+        if self.tracker:
+            self.tracker.reset()
+        self.frame_index = 0
+
+    def gate_stats(self):
+        return self.gate.stats() if self.gate else {}
@@ -0,0 +1,77 @@
+# roi_crop.py
+from collections import namedtuple
+import numpy as np
+from config.settings import (ROI_INFERENCE_MARGIN, ROI_INFERENCE_MAX_FRACTION, ROI_INFERENCE_MIN_SIZE,
+                             DETECTOR_INPUT_SIZE)
+
+# image:  what the detector runs on (a view into the frame)
+# offset: (x, y) of the image's top-left corner in the frame
+# imgsz:  model input size for the image, None for the detector's default
+RoiCrop = namedtuple("RoiCrop", ["image", "offset", "imgsz"])
+
+STRIDE = 32  # YOLO input sizes are multiples of this
+
+
+def full_frame(frame):
+    return RoiCrop(frame, (0, 0), None)
+
+
+def roi_crop(frame, zones, margin=ROI_INFERENCE_MARGIN, max_fraction=ROI_INFERENCE_MAX_FRACTION,
+             base_size=DETECTOR_INPUT_SIZE, min_size=ROI_INFERENCE_MIN_SIZE):
+    """
+    Picks the part of a frame the detector has to see for the zone check.
+
+    The region encloses every zone plus `margin` so people standing on a
+    zone's edge are not cut in half. Its input size keeps the pixel density
+    the full frame would get at base_size, so a small region also costs
+    less inference. When the region covers more than max_fraction of the
+    frame, e.g. with several zones spread over the view, the whole frame is
+    used instead.
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        zones (ZoneSet): Zones of the source; None or empty means full frame
+        margin (float): Added on each side, as a fraction of the frame size
+        max_fraction (float): Largest share of the frame area worth cropping to
+        base_size (int): Model input size used for full frames
+        min_size (int): Smallest model input size for a crop
+
+    Returns:
+        RoiCrop: The crop, or the full frame
+    """
+    rect = zones.bounding_rect(frame.shape) if zones else None
+    if rect is None:
+        return full_frame(frame)
+    height, width = frame.shape[:2]
+    (x1, y1), (x2, y2) = rect
+    mx, my = int(width * margin), int(height * margin)
+    x1, y1 = max(0, x1 - mx), max(0, y1 - my)
+    x2, y2 = min(width, x2 + mx), min(height, y2 + my)
+    if x2 <= x1 or y2 <= y1 or (x2 - x1) * (y2 - y1) > max_fraction * width * height:
+        return full_frame(frame)
+
+    # Same scale as the full frame letterboxed into base_size
+    needed = base_size * max(x2 - x1, y2 - y1) / max(width, height)
+    imgsz = int(np.ceil(needed / STRIDE)) * STRIDE
+    imgsz = min(base_size, max(min_size, imgsz))
+    return RoiCrop(frame[y1:y2, x1:x2], (x1, y1), imgsz)
+
+
+def to_frame(detections, crop):
+    """
+    Maps detections of a crop back to frame coordinates.
+
+    Args:
+        detections (numpy.ndarray): (N, 5) rows (x1, y1, x2, y2, conf) in crop pixels
+        crop (RoiCrop): The crop they were detected in
+
+    Returns:
+        numpy.ndarray: (N, 5) detections in frame pixels
+    """
+    x, y = crop.offset
+    if not x and not y:
+        return detections
+    detections = detections.copy()
+    detections[:, [0, 2]] += x
+    detections[:, [1, 3]] += y
+    return detections
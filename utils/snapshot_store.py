@@ -0,0 +1,333 @@
+# snapshot_store.py
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import cv2
+import numpy as np
+from utils.event_store import get_event_store
+from utils.snapshot_writer import get_snapshot_writer
+from utils.metrics import get_metrics
+from config.settings import (SNAPSHOT_CROP, SNAPSHOT_CROP_CONTEXT, SNAPSHOT_DEDUP_DISTANCE,
+                             SNAPSHOT_DEDUP_WINDOW, SNAPSHOT_MAX_MB, SNAPSHOT_MAX_AGE_DAYS,
+                             SNAPSHOT_CLEANUP_INTERVAL)
+
+LOG_DIR = "logs"
+IMAGES_DIR = os.path.join(LOG_DIR, "images")
+
+# What SnapshotStore.save did with a frame
+QUEUED = "queued"  # handed to the snapshot writer
+DUPLICATE = "duplicate"  # repeats the camera's previous snapshot, the event links to that one
+DROPPED = "dropped"  # the writer's queue was full, the event keeps no image
+
+
+def dhash(frame, size=8):
+    """
+    Difference hash of a frame: one bit per horizontally adjacent pixel pair
+    of a size x size grayscale thumbnail, so small changes in noise,
+    compression or lighting leave most bits unchanged.
+
+    Returns:
+        int: 64-bit hash for the default size
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def crop_with_context(frame, boxes, context=SNAPSHOT_CROP_CONTEXT, min_size=64):
+    """
+    Crops a frame to the union of boxes plus some surrounding context.
+
+    Args:
+        frame (numpy.ndarray): BGR frame
+        boxes (numpy.ndarray): (N, >=4) rows starting with x1, y1, x2, y2
+        context (float): Margin added on each side, as a fraction of the
+            union's width and height
+        min_size (int): Minimum crop width and height in pixels
+
+    Returns:
+        numpy.ndarray: View of the cropped region, or the frame if there are no boxes
+    """
+    if boxes is None or not len(boxes):
+        return frame
+    boxes = np.asarray(boxes, dtype=np.float32)
+    x1, y1 = boxes[:, 0].min(), boxes[:, 1].min()
+    x2, y2 = boxes[:, 2].max(), boxes[:, 3].max()
+    pad_x = max((x2 - x1) * context, (min_size - (x2 - x1)) / 2, 0)
+    pad_y = max((y2 - y1) * context, (min_size - (y2 - y1)) / 2, 0)
+    height, width = frame.shape[:2]
+    left, top = max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y))
+    right, bottom = min(width, int(np.ceil(x2 + pad_x))), min(height, int(np.ceil(y2 + pad_y)))
+    if right <= left or bottom <= top:
+        return frame
+    return frame[top:bottom, left:right]
+
+
+class _LastSnapshot:
+    """The latest snapshot of a camera, which near-duplicates are linked to."""
+
+    def __init__(self, image_hash, time, image_path):
+        self.hash = image_hash
+        self.time = time
+        self.image_path = image_path
+        self.written = False
+        self.waiting = []  # events linked once the file is on disk
+
+
+class SnapshotStore:
+    """
+    Saves event snapshots within a disk budget.
+
+    Snapshots can be cropped to the intruders plus some context instead of
+    the whole frame. A snapshot whose perceptual hash is within
+    dedup_distance bits of the camera's previous one, taken less than
+    dedup_window seconds later, is not written again; its event links to
+    the previous file instead. Files are sharded into images/YYYY/MM/DD/.
+
+    A background thread deletes the oldest snapshots while the directory is
+    larger than max_bytes or they are older than max_age_days, and unlinks
+    them from their events in the same pass, so the log never points at a
+    missing file.
+    """
+
+    def __init__(self, images_dir=IMAGES_DIR, crop=SNAPSHOT_CROP, context=SNAPSHOT_CROP_CONTEXT,
+                 dedup_distance=SNAPSHOT_DEDUP_DISTANCE, dedup_window=SNAPSHOT_DEDUP_WINDOW,
+                 max_bytes=SNAPSHOT_MAX_MB * 1024 * 1024 if SNAPSHOT_MAX_MB else None,
+                 max_age_days=SNAPSHOT_MAX_AGE_DAYS, cleanup_interval=SNAPSHOT_CLEANUP_INTERVAL,
+                 writer=None, store=None):
+        self.images_dir = images_dir
+        self.log_dir = os.path.dirname(images_dir)  # image paths are relative to it
+        self.crop = crop
+        self.context = context
+        self.dedup_distance = dedup_distance  # None disables duplicate suppression
+        self.dedup_window = dedup_window
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.cleanup_interval = cleanup_interval
+        self.writer = writer
+        self.store = store
+
+        self._lock = threading.Lock()
+        self._last = {}  # camera -> _LastSnapshot
+        self._total_bytes = None  # measured by the cleanup thread on start
+        self._scan_after_id = 0  # events up to here have no image left
+        self.saved = 0
+        self.skipped = 0
+        self.evicted = 0
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-cleanup", daemon=True)
+        self._thread.start()
+
+    def _event_store(self):
+        return self.store or get_event_store()
+
+    def save(self, event_id, frame, timestamp=None, camera=None, boxes=None):
+        """
+        Queues the snapshot of an event, unless it repeats the previous one.
+
+        Args:
+            event_id (int): Event the snapshot belongs to
+            frame (numpy.ndarray): BGR frame; must not be modified afterwards
+            timestamp (datetime, optional): Event time, picks the date directory
+            camera (str, optional): Duplicates are detected per camera
+            boxes (numpy.ndarray, optional): Intruder boxes to crop to
+
+        Returns:
+            str: QUEUED, DUPLICATE or DROPPED
+        """
+        timestamp = timestamp or datetime.now()
+        if self.crop:
+            frame = crop_with_context(frame, boxes, self.context)
+        now = time.monotonic()
+        image_hash = dhash(frame) if self.dedup_distance is not None else None
+
+        with self._lock:
+            last = self._last.get(camera)
+            if (last is not None and image_hash is not None and now - last.time < self.dedup_window
+                    and hamming(image_hash, last.hash) <= self.dedup_distance):
+                self.skipped += 1
+                get_metrics().inc("snapshots_deduplicated", camera=camera)
+                if not last.written:
+                    last.waiting.append(event_id)
+                    return DUPLICATE
+                image_path = last.image_path
+            else:
+                image_path = None
+                filename = f"intrusion_{event_id}_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg"
+                relative = os.path.join(os.path.basename(self.images_dir),
+                                        timestamp.strftime("%Y"), timestamp.strftime("%m"),
+                                        timestamp.strftime("%d"), filename)
+                last = _LastSnapshot(image_hash, now, relative.replace(os.sep, "/"))
+                last.waiting.append(event_id)
+                self._last[camera] = last
+
+        if image_path is not None:
+            self._event_store().set_image(event_id, image_path)
+            return DUPLICATE
+
+        writer = self.writer or get_snapshot_writer()
+        if not writer.submit(os.path.join(self.log_dir, last.image_path), frame,
+                             on_done=lambda path: self._written(last, path),
+                             on_error=lambda path: self._not_written(camera, last)):
+            self._not_written(camera, last)
+            return DROPPED
+        return QUEUED
+
+    def _written(self, last, path):
+        # Called from the encoder thread once the file is on disk
+        with self._lock:
+            last.written = True
+            event_ids, last.waiting = last.waiting, []
+            self.saved += 1
+            if self._total_bytes is not None:
+                try:
+                    self._total_bytes += os.path.getsize(path)
+                except OSError:
+                    pass
+            over_budget = self.max_bytes and (self._total_bytes or 0) > self.max_bytes
+        store = self._event_store()
+        for event_id in event_ids:
+            store.set_image(event_id, last.image_path)
+        if over_budget:
+            self._wakeup.set()
+
+    def _not_written(self, camera, last):
+        # The writer dropped the snapshot or failed to write it: the next
+        # snapshot of the camera must not be linked to a file that never
+        # appears. Events already linked to it keep no image.
+        with self._lock:
+            if self._last.get(camera) is last:
+                del self._last[camera]
+            last.waiting = []
+
+    def _run(self):
+        size = _directory_size(self.images_dir)
+        with self._lock:
+            self._total_bytes = size
+        while not self._stop.is_set():
+            try:
+                self.enforce_budget()
+            except Exception as e:
+                print(f"Error: Snapshot cleanup failed: {e}")
+            if not self._wakeup.wait(self.cleanup_interval):
+                # Periodic pass: rescan from the start, in case an older
+                # event got its image linked after the scan moved past it
+                self._scan_after_id = 0
+            self._wakeup.clear()
+
+    def enforce_budget(self):
+        """
+        Deletes the oldest snapshots beyond the size and age budget.
+
+        Returns:
+            int: Number of files deleted
+        """
+        deleted = 0
+        if self.max_age_days:
+            cutoff = datetime.now() - timedelta(days=self.max_age_days)
+            while True:
+                batch = self._event_store().oldest_images(after_id=self._scan_after_id, end=cutoff)
+                if not batch:
+                    break
+                deleted += self._evict(batch)
+        while self.max_bytes and self._total_bytes is not None and self._total_bytes > self.max_bytes:
+            batch = self._event_store().oldest_images(limit=20, after_id=self._scan_after_id)
+            if not batch:
+                break  # what is left is not referenced by any event
+            deleted += self._evict(batch)
+        return deleted
+
+    def _evict(self, batch):
+        paths = []
+        for event_id, image_path in batch:
+            if image_path in paths:
+                continue  # near-duplicates share a file
+            with self._lock:
+                if any(last.image_path == image_path for last in self._last.values()):
+                    self._last = {camera: last for camera, last in self._last.items()
+                                  if last.image_path != image_path}
+            paths.append(image_path)
+        freed = 0
+        for image_path in paths:
+            path = os.path.join(self.log_dir, image_path)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error: Could not delete snapshot {path}: {e}")
+                continue
+            _remove_empty_parents(path, self.images_dir)
+        # Events lose the link right after the files go, so readers are
+        # left pointing at a deleted file only briefly
+        self._event_store().clear_images(paths)
+        with self._lock:
+            self._scan_after_id = max(self._scan_after_id, batch[-1][0])
+            self._total_bytes = max(0, (self._total_bytes or 0) - freed)
+            self.evicted += len(paths)
+        get_metrics().inc("snapshots_evicted", len(paths))
+        return len(paths)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Snapshots saved, skipped as duplicates and evicted, and the
+                size of the images directory (None until measured)
+        """
+        with self._lock:
+            return {"saved": self.saved, "skipped": self.skipped, "evicted": self.evicted,
+                    "bytes": self._total_bytes}
+
+    def close(self):
+        """Stops the cleanup thread."""
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+
+
+def _directory_size(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _remove_empty_parents(path, top):
+    # Drops date directories left empty, but never top itself
+    directory = os.path.dirname(path)
+    top = os.path.abspath(top)
+    while os.path.abspath(directory) != top and os.path.abspath(directory).startswith(top):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return  # not empty
+        directory = os.path.dirname(directory)
+
+
+_snapshot_store = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """
+    Returns the process-wide snapshot store, starting its cleanup thread on first use.
+    """
+    global _snapshot_store
+    with _snapshot_store_lock:
+        if _snapshot_store is None:
+            _snapshot_store = SnapshotStore()
+        return _snapshot_store
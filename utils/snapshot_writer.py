@@ -0,0 +1,229 @@
+# snapshot_writer.py
+import os
+import queue
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+from utils.metrics import get_metrics
+from config.settings import (SNAPSHOT_WORKERS, SNAPSHOT_QUEUE_SIZE, SNAPSHOT_DROP_POLICY,
+                             SNAPSHOT_JPEG_QUALITY, SNAPSHOT_MAX_WIDTH)
+
+DROP_NEWEST = "drop_newest"  # reject the new snapshot when the queue is full
+DROP_OLDEST = "drop_oldest"  # evict the oldest queued snapshot to make room
+BLOCK = "block"  # wait for room (up to block_timeout), then drop the new one
+
+
+class SnapshotWriter:
+    """
+    Encodes and writes JPEG snapshots on a pool of background threads.
+
+    submit() only enqueues the frame, so callers on the video path never wait
+    for the encoder or the disk. OpenCV releases the GIL while encoding, so
+    several encoder threads do run in parallel.
+    """
+
+    def __init__(self, workers=SNAPSHOT_WORKERS, max_queue=SNAPSHOT_QUEUE_SIZE,
+                 policy=SNAPSHOT_DROP_POLICY, quality=SNAPSHOT_JPEG_QUALITY,
+                 max_width=SNAPSHOT_MAX_WIDTH, block_timeout=1.0):
+        if policy not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown snapshot drop policy: {policy}")
+        self.policy = policy
+        self.quality = quality
+        self.max_width = max_width  # downscale wider frames before encoding
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Held while drop_oldest evicts, so it never takes close()'s stop sentinels
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._encode_total = 0.0
+        self._encode_last = 0.0
+        self._encode_max = 0.0
+        self._encode_recent = deque(maxlen=1024)  # for percentiles over recent snapshots
+
+        self._threads = [threading.Thread(target=self._run, daemon=True)
+                         for _ in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path, frame, on_done=None, on_error=None):
+        """
+        Queues a frame to be written as JPEG.
+
+        Args:
+            path (str): Destination file
+            frame (numpy.ndarray): BGR frame; must not be modified afterwards
+            on_done (callable, optional): Called as on_done(path) from the
+                encoder thread once the file is on disk
+            on_error (callable, optional): Called as on_error(path) if the
+                snapshot is not written after all: evicted from the queue
+                by drop_oldest, or failed to encode or write. Not called
+                when submit() returns False.
+
+        Returns:
+            bool: False if the snapshot was dropped, e.g. after close()
+        """
+        if self._closed:
+            self._count_drop()
+            return False
+        job = (path, frame, on_done, on_error)
+        if self.policy == BLOCK:
+            try:
+                self._queue.put(job, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                self._count_drop()
+                return False
+
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            if self.policy == DROP_NEWEST:
+                self._count_drop()
+                return False
+
+        # DROP_OLDEST: make room by discarding the head of the queue
+        with self._submit_lock:
+            if self._closed:
+                self._count_drop()
+                return False
+            while True:
+                try:
+                    evicted = self._queue.get_nowait()
+                    self._queue.task_done()
+                except queue.Empty:
+                    evicted = None
+                if evicted is not None:
+                    self._count_drop()
+                    if evicted[3]:
+                        evicted[3](evicted[0])
+                try:
+                    self._queue.put_nowait(job)
+                    return True
+                except queue.Full:
+                    continue
+
+    def _count_drop(self):
+        with self._stats_lock:
+            self.dropped += 1
+        get_metrics().inc("snapshots_dropped")
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            path, frame, on_done, on_error = job
+            written = False
+            try:
+                started = time.perf_counter()
+                if self.max_width and frame.shape[1] > self.max_width:
+                    scale = self.max_width / frame.shape[1]
+                    frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)),
+                                       interpolation=cv2.INTER_AREA)
+                ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                elapsed = time.perf_counter() - started
+                if not ok:
+                    raise RuntimeError("JPEG encoding failed")
+
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data.tobytes())
+                os.replace(tmp_path, path)
+
+                with self._stats_lock:
+                    self.written += 1
+                    self._encode_total += elapsed
+                    self._encode_last = elapsed
+                    self._encode_max = max(self._encode_max, elapsed)
+                    self._encode_recent.append(elapsed)
+                get_metrics().observe("snapshot.encode", elapsed)
+                written = True
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += 1
+                print(f"Error: Could not write snapshot {path}: {e}")
+            try:
+                if written and on_done:
+                    on_done(path)
+                elif not written and on_error:
+                    on_error(path)
+            except Exception as e:
+                print(f"Error: Snapshot callback failed for {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Queue depth, drop/write counters and encode latency in ms;
+                the percentiles cover the last 1024 snapshots
+        """
+        with self._stats_lock:
+            recent = np.array(self._encode_recent) * 1000 if self._encode_recent else np.zeros(1)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "encode_ms_avg": 1000 * self._encode_total / self.written if self.written else 0.0,
+                "encode_ms_last": 1000 * self._encode_last,
+                "encode_ms_max": 1000 * self._encode_max,
+                "encode_ms_p50": float(np.percentile(recent, 50)),
+                "encode_ms_p95": float(np.percentile(recent, 95)),
+                "encode_ms_p99": float(np.percentile(recent, 99)),
+            }
+
+    def close(self, wait=True):
+        """
+        Stops the encoder threads after the queued snapshots are written.
+
+        Later submits are dropped. The stop sentinels go in only once no
+        drop_oldest eviction is running, so none of them can be evicted.
+        """
+        with self._submit_lock:
+            self._closed = True
+        if wait:
+            self._queue.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_snapshot_writer():
+    """
+    Returns the process-wide snapshot writer, starting it on first use.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SnapshotWriter()
+        return _writer
+
+
+def close_snapshot_writer():
+    """
+    Flushes and stops the process-wide writer, if it was started.
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer:
+        writer.close()
@@ -0,0 +1,58 @@
+# startup_profiler.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Importing this module first thing in main.py makes this the reference point
+_start = time.perf_counter()
+_enabled = os.environ.get("HTD_PROFILE_STARTUP") == "1"
+_lock = threading.Lock()
+_phases = []  # (name, thread name, start offset, duration) in seconds
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextmanager
+def phase(name):
+    """
+    Times an import or initialization step when startup profiling is on.
+    """
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        with _lock:
+            _phases.append((name, threading.current_thread().name, started - _start, ended - started))
+
+
+def mark(name):
+    """Records a point in time (e.g. "window shown") as a zero-length phase."""
+    if _enabled:
+        with _lock:
+            _phases.append((name, threading.current_thread().name, time.perf_counter() - _start, 0.0))
+
+
+def report():
+    """
+    Prints all recorded phases in start order.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        phases = sorted(_phases, key=lambda p: p[2])
+    print("Startup profile (seconds since launch):")
+    print(f"  {'phase':<28} {'thread':<14} {'start':>8} {'took':>8}")
+    for name, thread, offset, duration in phases:
+        print(f"  {name:<28} {thread:<14} {offset:>8.3f} {duration:>8.3f}")
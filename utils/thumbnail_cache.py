@@ -0,0 +1,142 @@
+# thumbnail_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+import cv2
+from utils.metrics import get_metrics
+from config.settings import THUMBNAIL_WIDTH, THUMBNAIL_CACHE_MB
+
+LOG_DIR = "logs"
+THUMBNAILS_DIR = os.path.join(LOG_DIR, "thumbnails")
+
+
+class ThumbnailCache:
+    """
+    On-disk cache of small JPEG thumbnails of event snapshots.
+
+    A thumbnail is generated the first time it is asked for and then served
+    from disk. The cache is bounded by total size: beyond max_bytes the least
+    recently used thumbnails are deleted. Recency survives restarts through
+    the files' modification times, which get() refreshes on every hit.
+    """
+
+    def __init__(self, cache_dir=THUMBNAILS_DIR, width=THUMBNAIL_WIDTH,
+                 max_bytes=THUMBNAIL_CACHE_MB * 1024 * 1024, log_dir=LOG_DIR):
+        self.cache_dir = cache_dir
+        self.width = width
+        self.max_bytes = max_bytes
+        self.log_dir = log_dir  # image paths are relative to it
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        files = []
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+    def _key(self, image_path):
+        # Snapshot names are unique per event, so the path identifies the image
+        digest = hashlib.sha1(f"{image_path}:{self.width}".encode("utf-8")).hexdigest()
+        return digest[:20] + ".jpg"
+
+    def get(self, image_path):
+        """
+        Returns the thumbnail of a snapshot, generating it on first use.
+
+        Safe to call from several threads; meant for background loaders, as
+        a miss reads and resizes the full snapshot.
+
+        Args:
+            image_path (str): Snapshot path relative to the logs directory
+
+        Returns:
+            str: Path of the thumbnail file, or None if the snapshot is missing
+        """
+        name = self._key(image_path)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                try:
+                    os.utime(path)
+                    return path
+                except OSError:
+                    # Deleted behind our back; generate it again
+                    self._total -= self._entries.pop(name)
+
+        started = time.perf_counter()
+        source = os.path.join(self.log_dir, image_path)
+        frame = cv2.imread(source) if os.path.exists(source) else None
+        if frame is None:
+            return None
+        if frame.shape[1] > self.width:
+            height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+            frame = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if not ok:
+            return None
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error: Could not write thumbnail {path}: {e}")
+            return None
+        get_metrics().observe("thumbnail.generate", time.perf_counter() - started)
+
+        with self._lock:
+            self.misses += 1
+            self._total += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._evict(keep=name)
+        return path
+
+    def _evict(self, keep=None):
+        while self._total > self.max_bytes and self._entries:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                break
+            del self._entries[name]
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Returns:
+            dict: Cached thumbnails, their total size in bytes, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total,
+                    "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """
+    Returns the process-wide thumbnail cache, opening it on first use.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
@@ -0,0 +1,204 @@
+# tracker.py
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Computes the IoU of every box in boxes_a with every box in boxes_b.
+
+    Args:
+        boxes_a (numpy.ndarray): (N, 4+) boxes x1, y1, x2, y2
+        boxes_b (numpy.ndarray): (M, 4+) boxes x1, y1, x2, y2
+
+    Returns:
+        numpy.ndarray: (N, M) IoU values
+    """
+    a = np.asarray(boxes_a, dtype=np.float32)[:, None, :4]
+    b = np.asarray(boxes_b, dtype=np.float32)[None, :, :4]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def greedy_match(iou, threshold):
+    """
+    Pairs rows and columns by descending IoU, each used at most once.
+
+    Returns:
+        tuple: (list of (row, col) matches, unmatched rows, unmatched cols)
+    """
+    matches = []
+    if iou.size:
+        rows, cols = np.nonzero(iou >= threshold)
+        order = np.argsort(-iou[rows, cols])
+        used_rows, used_cols = set(), set()
+        for k in order:
+            r, c = int(rows[k]), int(cols[k])
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            matches.append((r, c))
+    matched_rows = {r for r, _ in matches}
+    matched_cols = {c for _, c in matches}
+    return (matches,
+            [r for r in range(iou.shape[0]) if r not in matched_rows],
+            [c for c in range(iou.shape[1]) if c not in matched_cols])
+
+
+def _xyxy_to_cxcywh(box):
+    x1, y1, x2, y2 = box[:4]
+    return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+
+class KalmanBoxFilter:
+    """
+    Constant-velocity Kalman filter over (cx, cy, w, h), with noise scaled by
+    the box height as in SORT/ByteTrack.
+    """
+
+    _motion = np.eye(8)
+    _motion[:4, 4:] = np.eye(4)
+    _observe = np.eye(4, 8)
+    std_position = 1.0 / 20
+    std_velocity = 1.0 / 160
+
+    def __init__(self, box):
+        self.mean = np.concatenate((_xyxy_to_cxcywh(box), np.zeros(4)))
+        h = self.mean[3]
+        std = np.array([2 * self.std_position * h] * 4 + [10 * self.std_velocity * h] * 4)
+        self.covariance = np.diag(np.square(std))
+
+    def predict(self):
+        h = self.mean[3]
+        std = np.array([self.std_position * h] * 4 + [self.std_velocity * h] * 4)
+        self.mean = self._motion @ self.mean
+        self.mean[2:4] = np.maximum(self.mean[2:4], 1.0)
+        self.covariance = self._motion @ self.covariance @ self._motion.T + np.diag(np.square(std))
+
+    def update(self, box):
+        measurement = _xyxy_to_cxcywh(box)
+        h = self.mean[3]
+        noise = np.diag(np.square([self.std_position * h] * 4))
+        projected_cov = self._observe @ self.covariance @ self._observe.T + noise
+        gain = self.covariance @ self._observe.T @ np.linalg.inv(projected_cov)
+        self.mean = self.mean + gain @ (measurement - self._observe @ self.mean)
+        self.covariance = (np.eye(8) - gain @ self._observe) @ self.covariance
+
+    def box(self):
+        cx, cy, w, h = self.mean[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+class Track:
+    def __init__(self, track_id, detection):
+        self.id = track_id
+        self.filter = KalmanBoxFilter(detection)
+        self.score = float(detection[4])
+        self.hits = 1
+        self.frames_since_update = 0
+        self.confirmed = False
+
+
+class ByteTracker:
+    """
+    Lightweight ByteTrack-style multi-object tracker in pure NumPy.
+
+    High-confidence detections are matched to all tracks first, then the
+    leftover low-confidence detections get a second chance against tracks
+    that are still unmatched. Between detector runs, predict() moves the
+    tracks along their Kalman velocity so the detector can skip frames.
+    """
+
+    def __init__(self, high_threshold=0.5, match_iou=0.2, low_match_iou=0.5,
+                 min_hits=2, max_age=30, coast_frames=0):
+        self.high_threshold = high_threshold  # detections at or above start new tracks
+        self.match_iou = match_iou  # IoU needed to match a high-confidence detection
+        self.low_match_iou = low_match_iou  # IoU needed to match a low-confidence detection
+        self.min_hits = min_hits  # matches before a track is reported
+        self.max_age = max_age  # frames a track survives without a match
+        self.coast_frames = coast_frames  # frames an unmatched track is still reported
+        self.tracks = []
+        self._next_id = 1
+        self.updates = 0  # detector results seen since the last reset
+
+    def _output(self):
+        rows = [np.append(t.filter.box(), (t.score, t.id)) for t in self.tracks
+                if t.confirmed and t.frames_since_update <= self.coast_frames]
+        if not rows:
+            return np.zeros((0, 6), dtype=np.float32)
+        return np.asarray(rows, dtype=np.float32)
+
+    def predict(self):
+        """
+        Advances all tracks one frame without a detector result.
+
+        Returns:
+            numpy.ndarray: (K, 6) rows (x1, y1, x2, y2, score, track_id)
+        """
+        for track in self.tracks:
+            track.filter.predict()
+            track.frames_since_update += 1
+        self.tracks = [t for t in self.tracks if t.frames_since_update <= self.max_age]
+        return self._output()
+
+    def update(self, detections):
+        """
+        Advances all tracks one frame and matches them to new detections.
+
+        Args:
+            detections (numpy.ndarray): (N, 5) rows (x1, y1, x2, y2, conf)
+
+        Returns:
+            numpy.ndarray: (K, 6) rows (x1, y1, x2, y2, score, track_id)
+        """
+        for track in self.tracks:
+            track.filter.predict()
+            track.frames_since_update += 1
+
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+        high = detections[detections[:, 4] >= self.high_threshold]
+        low = detections[detections[:, 4] < self.high_threshold]
+
+        predicted = np.asarray([t.filter.box() for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+        matches, unmatched_tracks, unmatched_high = greedy_match(
+            iou_matrix(predicted, high), self.match_iou)
+        for t, d in matches:
+            self._apply(self.tracks[t], high[d])
+
+        # Second pass: low-confidence detections against still-unmatched tracks
+        remaining = [self.tracks[t] for t in unmatched_tracks]
+        if remaining and len(low):
+            boxes = np.asarray([t.filter.box() for t in remaining], dtype=np.float32)
+            low_matches, _, _ = greedy_match(iou_matrix(boxes, low), self.low_match_iou)
+            for t, d in low_matches:
+                self._apply(remaining[t], low[d])
+
+        # Only the very first result is trusted without min_hits, so people
+        # already in view show up at once; an empty scene later does not
+        # count, or one-frame false positives there would alert
+        self.updates += 1
+        first_frame = self.updates == 1
+        for d in unmatched_high:
+            track = Track(self._next_id, high[d])
+            track.confirmed = first_frame or self.min_hits <= 1
+            self._next_id += 1
+            self.tracks.append(track)
+
+        self.tracks = [t for t in self.tracks if t.frames_since_update <= self.max_age]
+        return self._output()
+
+    def _apply(self, track, detection):
+        track.filter.update(detection)
+        track.score = float(detection[4])
+        track.hits += 1
+        track.frames_since_update = 0
+        if track.hits >= self.min_hits:
+            track.confirmed = True
+
+    def reset(self):
+        self.tracks = []
+        self.updates = 0
@@ -0,0 +1,206 @@
+# zones.py
+import json
+import threading
+import cv2
+import numpy as np
+
+MAX_ZONES = 32  # one bit per zone in the label mask
+
+
+class Zone:
+    """
+    A restricted area with its own alert policy.
+
+    Points are polygon vertices in normalized (0..1) frame coordinates, so a
+    zone stays put when the frame or window size changes.
+    """
+
+    def __init__(self, name, points, alert=True, cooldown=1.0):
+        self.name = name
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.alert = alert  # False marks intruders without raising alerts
+        self.cooldown = cooldown  # minimum seconds between alerts for this zone
+
+    @classmethod
+    def from_rect(cls, name, p1, p2, **policy):
+        (x1, y1), (x2, y2) = p1, p2
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        return cls(name, [(x1, y1), (x2, y1), (x2, y2), (x1, y2)], **policy)
+
+    def pixel_points(self, width, height):
+        """
+        Returns:
+            numpy.ndarray: (K, 2) int32 vertices in pixel coordinates
+        """
+        points = np.asarray(self.points, dtype=np.float32) * (width, height)
+        return np.round(points).astype(np.int32)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "points": [list(p) for p in self.points],
+            "alert": self.alert,
+            "cooldown": self.cooldown,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["name"],
+            data["points"],
+            alert=data.get("alert", True),
+            cooldown=data.get("cooldown", 1.0),
+        )
+
+
+class ZoneSet:
+    """
+    The zones of one camera, backed by a rasterized label mask.
+
+    Zones are drawn into a uint32 mask (bit i set where zone i covers the
+    pixel) once per zone change or frame size; membership tests are then a
+    single pixel lookup per point, no polygon math per frame.
+    """
+
+    def __init__(self, zones=None):
+        self._lock = threading.Lock()
+        self._zones = list(zones or [])
+        self._mask = None
+        self._mask_key = None
+        self.version = 0
+
+    def __len__(self):
+        return len(self._zones)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._zones))
+
+    @property
+    def zones(self):
+        with self._lock:
+            return list(self._zones)
+
+    def add(self, zone):
+        with self._lock:
+            if len(self._zones) >= MAX_ZONES:
+                raise ValueError(f"At most {MAX_ZONES} zones per camera are supported")
+            self._zones.append(zone)
+            self._changed()
+
+    def remove(self, zone):
+        with self._lock:
+            self._zones.remove(zone)
+            self._changed()
+
+    def clear(self):
+        with self._lock:
+            self._zones = []
+            self._changed()
+
+    def replace(self, zones):
+        with self._lock:
+            if len(zones) > MAX_ZONES:
+                raise ValueError(f"At most {MAX_ZONES} zones per camera are supported")
+            self._zones = list(zones)
+            self._changed()
+
+    def _changed(self):
+        self._mask = None
+        self._mask_key = None
+        self.version += 1
+
+    def mask(self, shape):
+        """
+        Returns the label mask for frames of the given shape, rasterizing it
+        only if the zones or the frame size changed.
+
+        Args:
+            shape (tuple): Frame shape, (height, width, ...)
+
+        Returns:
+            numpy.ndarray: (height, width) uint32 bit mask
+        """
+        height, width = shape[:2]
+        with self._lock:
+            key = (height, width, self.version)
+            if self._mask_key != key:
+                mask = np.zeros((height, width), dtype=np.uint32)
+                layer = np.zeros((height, width), dtype=np.uint8)
+                for bit, zone in enumerate(self._zones):
+                    layer[:] = 0
+                    cv2.fillPoly(layer, [zone.pixel_points(width, height)], 1)
+                    mask |= layer.astype(np.uint32) << np.uint32(bit)
+                self._mask = mask
+                self._mask_key = key
+            return self._mask
+
+    def lookup(self, points, shape):
+        """
+        Returns the zone bits under each point.
+
+        Args:
+            points (numpy.ndarray): (N, 2) pixel coordinates (x, y)
+            shape (tuple): Frame shape the points belong to
+
+        Returns:
+            numpy.ndarray: (N,) uint32, bit i set if the point lies in zone i
+        """
+        mask = self.mask(shape)
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        height, width = mask.shape
+        xs = np.clip(points[:, 0].astype(np.intp), 0, width - 1)
+        ys = np.clip(points[:, 1].astype(np.intp), 0, height - 1)
+        return mask[ys, xs]
+
+    def membership(self, points, shape):
+        """
+        Returns:
+            numpy.ndarray: (N, M) boolean matrix, True where point i lies in zone j
+        """
+        bits = self.lookup(points, shape)
+        count = len(self._zones)
+        return ((bits[:, None] >> np.arange(count, dtype=np.uint32)) & 1).astype(bool)
+
+    def bounding_rect(self, shape, margin=0.0):
+        """
+        Returns the pixel rectangle enclosing all zones, grown by `margin`
+        (a fraction of its size) and clipped to the frame.
+
+        Returns:
+            tuple: ((x1, y1), (x2, y2)), or None if there are no zones
+        """
+        with self._lock:
+            if not self._zones:
+                return None
+            points = np.concatenate([np.asarray(z.points, dtype=np.float32) for z in self._zones])
+        height, width = shape[:2]
+        x1, y1 = points.min(axis=0)
+        x2, y2 = points.max(axis=0)
+        mx, my = (x2 - x1) * margin, (y2 - y1) * margin
+        x1, x2 = max(0.0, x1 - mx), min(1.0, x2 + mx)
+        y1, y2 = max(0.0, y1 - my), min(1.0, y2 + my)
+        return ((int(x1 * width), int(y1 * height)),
+                (int(np.ceil(x2 * width)), int(np.ceil(y2 * height))))
+
+
+def save_zones(zone_set, path):
+    """
+    Writes a zone set to a JSON file.
+    """
+    data = {"zones": [zone.to_dict() for zone in zone_set.zones]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+
+def load_zones(path):
+    """
+    Reads a zone set written by save_zones.
+
+    Returns:
+        ZoneSet: The loaded zones
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return ZoneSet([Zone.from_dict(z) for z in data.get("zones", [])])